@@ -8,8 +8,10 @@ from django.contrib.auth import get_user_model
 from django.core.management.base import BaseCommand, CommandParser
 from django.db import transaction
 from django.utils import timezone
+from django.utils.text import slugify
 
 from blog.models import BlogPost, Tag
+from hosting_backend.bulk_sync import sync_rows
 
 User = get_user_model()
 
@@ -191,6 +193,11 @@ class Command(BaseCommand):
             type=str,
             help="Email of the author user to assign. If missing, will use first superuser or create a content user.",
         )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report the changes that would be made, then roll everything back.",
+        )
 
     def get_author(self, email: str | None) -> User:
         if email:
@@ -229,45 +236,73 @@ class Command(BaseCommand):
 
         author = self.get_author(email)
         self.stdout.write(f"Using author: {author} ({getattr(author, 'email', '')})")
-
-        # Create tags first (case-insensitive uniqueness by name)
-        tag_cache: Dict[str, Tag] = {}
-        for post in POSTS:
-            for tag_name in post["tags"]:
-                key = tag_name.strip().lower()
-                if key not in tag_cache:
-                    tag_obj, _ = Tag.objects.get_or_create(name=tag_name.strip())
-                    tag_cache[key] = tag_obj
-
-        created_posts = 0
         now = timezone.now()
+        results = []
 
-        for p in POSTS:
-            bp, created = BlogPost.objects.get_or_create(
-                title=p["title"],
-                defaults={
+        # Tags: create missing ones (existing slugs are left alone)
+        tag_names = {t.strip().lower(): t.strip() for p in POSTS for t in p["tags"]}
+        results.append(sync_rows(
+            Tag.objects.all(),
+            [{"name": name, "slug": slugify(name)} for name in tag_names.values()],
+            key=("name",),
+            fill_fields=("slug",),
+        ))
+        tag_ids: Dict[str, int] = {
+            name.lower(): pk for name, pk in Tag.objects.filter(name__in=tag_names.values()).values_list("name", "id")
+        }
+
+        # Posts: keep an existing publish date, always refresh the content fields
+        post_result = sync_rows(
+            BlogPost.objects.all(),
+            [
+                {
+                    "title": p["title"],
+                    "slug": slugify(p["title"]),
                     "excerpt": p["excerpt"],
                     "content": p["content"],
                     "cover_image": p.get("cover_image"),
-                    "author": author,
+                    "author_id": author.pk,
                     "status": BlogPost.PUBLISHED,
                     "published_at": now - timedelta(days=int(p["days_ago"])),
-                },
-            )
-            # If existed, ensure it's published & has a date
-            if not created:
-                if bp.status != BlogPost.PUBLISHED:
-                    bp.status = BlogPost.PUBLISHED
-                if not bp.published_at:
-                    bp.published_at = now - timedelta(days=int(p["days_ago"]))
-                bp.excerpt = p["excerpt"]
-                bp.content = p["content"]
-                bp.cover_image = p.get("cover_image")
-                bp.author = author
-                bp.save()
+                }
+                for p in POSTS
+            ],
+            key=("title",),
+            fields=("excerpt", "content", "cover_image", "author_id", "status"),
+            fill_fields=("slug", "published_at"),
+            touch={"updated_at": now},  # bulk_update skips auto_now
+        )
+        results.append(post_result)
+        # Re-read ids: MySQL does not return them from bulk_create
+        post_ids: Dict[str, int] = dict(
+            BlogPost.objects.filter(title__in=[p["title"] for p in POSTS]).values_list("title", "id")
+        )
+
+        # M2M tags: same semantics as bp.tags.set() for the seeded posts
+        Through = BlogPost.tags.through
+        tag_result = sync_rows(
+            Through.objects.filter(blogpost_id__in=post_ids.values()),
+            [
+                {"blogpost_id": post_ids[p["title"]], "tag_id": tag_ids[t.strip().lower()]}
+                for p in POSTS
+                for t in p["tags"]
+            ],
+            key=("blogpost_id", "tag_id"),
+            delete_missing=True,
+        )
+        results.append(tag_result)
+        # Bulk M2M writes skip m2m_changed, so bump updated_at for the ETags ourselves
+        retagged = {row.blogpost_id for row in tag_result.create + tag_result.delete}
+        BlogPost.objects.filter(pk__in=retagged).update(updated_at=now)
 
-            # M2M tags
-            bp.tags.set([tag_cache[t.strip().lower()] for t in p["tags"]])
-            created_posts += int(created)
+        if options["dry_run"]:
+            for result in results:
+                for line in result.report():
+                    self.stdout.write(line)
+            transaction.set_rollback(True)
+            self.stdout.write(self.style.WARNING("Dry run: all changes rolled back."))
+            return
 
-        self.stdout.write(self.style.SUCCESS(f"Done. Tags: {Tag.objects.count()}, Posts created: {created_posts}, Total posts: {BlogPost.objects.count()}"))
+        for result in results:
+            self.stdout.write(result.summary(applied=True))
+        self.stdout.write(self.style.SUCCESS(f"Done. Tags: {Tag.objects.count()}, Posts created: {len(post_result.create)}, Total posts: {BlogPost.objects.count()}"))
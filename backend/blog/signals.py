@@ -0,0 +1,39 @@
+# hosting/backend/blog/signals.py
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import BlogPost, Tag
+
+
+def _touch(post_ids) -> None:
+    """Bump updated_at so list/detail ETags change with the post's tags and author."""
+    BlogPost.objects.filter(pk__in=post_ids).update(updated_at=timezone.now())
+
+
+@receiver(m2m_changed, sender=BlogPost.tags.through)
+def touch_on_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        _touch([instance.pk])
+    elif action == "pre_clear":
+        _touch(list(instance.posts.values_list("pk", flat=True)))
+    else:
+        _touch(pk_set or [])
+
+
+@receiver(post_save, sender=Tag)
+@receiver(pre_delete, sender=Tag)
+def touch_on_tag_changed(sender, instance, **kwargs):
+    if instance.pk:
+        _touch(list(instance.posts.values_list("pk", flat=True)))
+
+
+@receiver(post_save, sender=get_user_model())
+def touch_on_author_changed(sender, instance, created, update_fields=None, **kwargs):
+    # The detail view renders the author's name and email; logins only save last_login
+    if created or (update_fields is not None and set(update_fields) <= {"last_login"}):
+        return
+    _touch(list(instance.blog_posts.values_list("pk", flat=True)))
@@ -0,0 +1,58 @@
+# hosting/backend/blog/tests.py
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .models import BlogPost, Tag
+
+User = get_user_model()
+
+
+class BlogETagTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.author = User.objects.create_user("writer", "writer@example.com", "pw", first_name="Wren")
+        self.tag = Tag.objects.create(name="Hosting")
+        self.post = BlogPost.objects.create(
+            title="Pick a plan", content="...", author=self.author,
+            status=BlogPost.PUBLISHED, published_at=timezone.now(),
+        )
+        self.post.tags.add(self.tag)
+
+    def _etag(self, url: str) -> str:
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response["ETag"]
+
+    def _revalidates(self, url: str, etag: str) -> bool:
+        return self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    def test_unchanged_endpoints_answer_304(self):
+        for url in ("/api/blog/posts/", "/api/blog/posts/pick-a-plan/", "/api/blog/tags/"):
+            with self.subTest(url=url):
+                self.assertTrue(self._revalidates(url, self._etag(url)))
+        self.assertEqual(self.client.get("/api/blog/posts/missing/").status_code, 404)
+
+    def test_post_and_tag_edits_change_the_etags(self):
+        urls = ("/api/blog/posts/", "/api/blog/posts/pick-a-plan/", "/api/blog/tags/")
+        etags = [self._etag(url) for url in urls]
+        self.tag.name = "Web hosting"
+        self.tag.save()
+        self.assertEqual([self._revalidates(url, etag) for url, etag in zip(urls, etags)], [False, False, False])
+
+        etags = [self._etag(url) for url in urls]
+        self.post.tags.clear()
+        self.assertEqual([self._revalidates(url, etag) for url, etag in zip(urls, etags)], [False, False, False])
+
+    def test_author_edits_change_the_detail_etag_logins_do_not(self):
+        url = "/api/blog/posts/pick-a-plan/"
+        etag = self._etag(url)
+        self.author.last_login = timezone.now()
+        self.author.save(update_fields=["last_login"])
+        self.assertTrue(self._revalidates(url, etag))
+
+        self.author.first_name = "Ren"
+        self.author.save()
+        self.assertFalse(self._revalidates(url, etag))
+        self.assertEqual(self.client.get(url).data["author"]["full_name"], "Ren")
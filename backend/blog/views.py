@@ -1,6 +1,8 @@
 # hosting/backend/blog/views.py
-from typing import List
-from django.db.models import Count, Q
+from typing import List, Optional
+from django.db.models import Count, Max, Q
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
 from rest_framework import generics
 from rest_framework.response import Response
 from rest_framework.views import APIView
@@ -9,6 +11,34 @@ from .models import Tag, BlogPost
 from .serializers import TagSerializer, BlogPostListSerializer, BlogPostDetailSerializer
 
 
+# ---------- ETags ----------
+# Tag edits, M2M changes and author edits touch BlogPost.updated_at (see
+# blog/signals.py), so max(updated_at) plus the row count tracks every visible change.
+
+def _published_posts_etag(request, *args, **kwargs) -> str:
+    agg = BlogPost.objects.filter(status=BlogPost.PUBLISHED).aggregate(
+        last=Max("updated_at"), n=Count("id")
+    )
+    last = agg["last"].timestamp() if agg["last"] else 0
+    return f"posts-{agg['n']}-{last}"
+
+
+def _post_detail_etag(request, slug: str, *args, **kwargs) -> Optional[str]:
+    updated = (
+        BlogPost.objects.filter(status=BlogPost.PUBLISHED, slug=slug)
+        .values_list("updated_at", flat=True)
+        .first()
+    )
+    return f"post-{slug}-{updated.timestamp()}" if updated else None
+
+
+def _tags_etag(request, *args, **kwargs) -> str:
+    agg = Tag.objects.aggregate(last=Max("created_at"), n=Count("id"))
+    last = agg["last"].timestamp() if agg["last"] else 0
+    return f"tags-{agg['n']}-{last}-{_published_posts_etag(request)}"
+
+
+@method_decorator(condition(etag_func=_published_posts_etag), name="get")
 class BlogPostListAPI(generics.ListAPIView):
     serializer_class = BlogPostListSerializer
 
@@ -24,6 +54,7 @@ class BlogPostListAPI(generics.ListAPIView):
         return qs
 
 
+@method_decorator(condition(etag_func=_post_detail_etag), name="get")
 class BlogPostDetailAPI(generics.RetrieveAPIView):
     serializer_class = BlogPostDetailSerializer
     lookup_field = "slug"
@@ -34,6 +65,7 @@ class BlogPostDetailAPI(generics.RetrieveAPIView):
     )
 
 
+@method_decorator(condition(etag_func=_tags_etag), name="get")
 class TagListAPI(generics.ListAPIView):
     serializer_class = TagSerializer
 
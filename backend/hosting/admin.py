@@ -1,6 +1,6 @@
 # backend/hosting/admin.py
 from django.contrib import admin
-from .models import HostingPlan, PlanSpec, CustomerProfile
+from .models import HostingPlan, PlanSpec, CustomerProfile, DomainCheckJob, TldPrice
 from django.contrib import admin
 
 class PlanSpecInline(admin.TabularInline):
@@ -19,4 +19,16 @@ class HostingPlanAdmin(admin.ModelAdmin):
 @admin.register(CustomerProfile)
 class CustomerProfileAdmin(admin.ModelAdmin):
     list_display = ("user", "phone_country_code", "phone_number", "country", "created_at")
-    search_fields = ("user__email", "phone_number", "company", "city", "state", "country")
\ No newline at end of file
+    search_fields = ("user__email", "phone_number", "company", "city", "state", "country")
+
+@admin.register(TldPrice)
+class TldPriceAdmin(admin.ModelAdmin):
+    list_display = ("tld", "register_cents", "renew_cents", "transfer_cents", "updated_at")
+    search_fields = ("tld",)
+
+@admin.register(DomainCheckJob)
+class DomainCheckJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "name", "status", "checked", "total", "available", "errors", "created_at")
+    list_filter = ("status",)
+    search_fields = ("user__email", "name")
+    readonly_fields = ("claim", "heartbeat_at", "started_at", "finished_at")
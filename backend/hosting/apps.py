@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class HostingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'hosting'
+
+    def ready(self):
+        from . import checks, signals  # noqa: F401
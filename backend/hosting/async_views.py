@@ -0,0 +1,152 @@
+# backend/hosting/async_views.py
+"""
+Native async versions of the domain lookup views.
+
+Under an ASGI server (uvicorn, see hosting_backend/asgi.py) an in-flight Enom
+call is a suspended coroutine instead of a blocked worker thread, so one
+worker can hold hundreds of upstream waits. Same query parameters, response
+shapes and error messages as the DRF views in views.py; urls.py routes to
+these when DOMAIN_VIEWS_ASYNC is on.
+
+    DOMAIN_VIEWS_ASYNC=True uvicorn hosting_backend.asgi:application --workers 4
+
+Nothing here may block the event loop. The synchronous helpers these views
+call directly are non-blocking by design: searchlog.record() appends to an
+in-memory buffer that a thread writes out, taken.lookup() reads the mapped
+index without taking its lock (it keeps the old mapping while a writer holds
+it), and ratelimit.aacquire() only tries the limiter's flock (LOCK_NB) while
+queueing. Known-taken index writes, which do wait on a flock, run in a thread
+(domains.acheck()).
+"""
+import logging
+from typing import AsyncIterator, Mapping
+
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.http import require_GET
+
+from . import domains, pricing, searchlog
+from .renderers import EventStreamRenderer, NDJSONRenderer, ndjson_line, sse_event
+from .views import _check_query, _log_suggestion_search, _namespinner_query, _suggestions_query, _unified_query
+
+logger = logging.getLogger(__name__)
+
+
+@require_GET
+async def check_domain(request):
+    try:
+        sld, tld = _check_query(request.GET)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    searchlog.record("check", sld, tld)
+    try:
+        return JsonResponse(await domains.acheck(sld, tld))
+    except domains.UpstreamError as e:
+        return JsonResponse({"error": str(e)}, status=502)
+
+
+@require_GET
+async def namespinner_suggest(request):
+    try:
+        q, tld_list, params = _namespinner_query(request.GET)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    _log_suggestion_search(params)
+    try:
+        suggestions = await domains.anamespinner(params)
+    except domains.UpstreamError as e:
+        return JsonResponse({"error": str(e)}, status=502)
+    suggestions = pricing.with_prices(suggestions, await pricing.atld_prices())
+    return JsonResponse({"query": q, "tlds": tld_list, "suggestions": suggestions})
+
+
+@require_GET
+async def get_name_suggestions(request):
+    try:
+        search_term, tld_list, params = _suggestions_query(request.GET)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    _log_suggestion_search(params)
+    try:
+        sugs = await domains.aname_suggestions(params)
+    except domains.UpstreamError as e:
+        return JsonResponse({"error": str(e)}, status=502)
+    sugs = pricing.with_prices(sugs, await pricing.atld_prices())
+    return JsonResponse({"query": search_term, "tlds": tld_list, "count": len(sugs), "suggestions": sugs})
+
+
+@require_GET
+async def unified_suggest(request):
+    try:
+        q, tld_list, spin_params, name_params, limit = _unified_query(request.GET)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    _log_suggestion_search(spin_params)
+    try:
+        rows, errors = await domains.asuggestions(spin_params, name_params, limit)
+    except domains.UpstreamError as e:
+        return JsonResponse({"error": str(e)}, status=502)
+    if errors:
+        logger.info("Merged suggestions for %r without %s", q, ", ".join(f"{k} ({v})" for k, v in errors.items()))
+    rows = pricing.with_prices(rows, await pricing.atld_prices())
+    return JsonResponse({"query": q, "tlds": tld_list, "count": len(rows), "partial": bool(errors), "suggestions": rows})
+
+
+def _wants_sse(request) -> bool:
+    fmt = request.GET.get("format")
+    if fmt:
+        return fmt == EventStreamRenderer.format
+    return EventStreamRenderer.media_type in request.headers.get("Accept", "")
+
+
+async def _suggestion_lines(first: dict, rows: AsyncIterator[dict], sse: bool,
+                            prices: Mapping[str, int]) -> AsyncIterator[bytes]:
+    """Async views._suggestion_lines()."""
+    count = 0
+    try:
+        if first is not None:
+            count += 1
+            first = pricing.with_price(first, prices)
+            yield sse_event("suggestion", first) if sse else ndjson_line(first)
+            async for row in rows:
+                count += 1
+                row = pricing.with_price(row, prices)
+                yield sse_event("suggestion", row) if sse else ndjson_line(row)
+    except domains.UpstreamError as e:
+        yield sse_event("error", {"error": str(e)}) if sse else ndjson_line({"error": str(e)})
+        return
+    if sse:
+        yield sse_event("done", {"count": count})
+
+
+async def _suggestion_stream(request, rows: AsyncIterator[dict]):
+    try:
+        first = await anext(rows, None)
+    except domains.UpstreamError as e:
+        return JsonResponse({"error": str(e)}, status=502)
+    sse = _wants_sse(request)
+    renderer = EventStreamRenderer if sse else NDJSONRenderer
+    lines = _suggestion_lines(first, rows, sse, await pricing.atld_prices())
+    response = StreamingHttpResponse(lines, content_type=renderer.media_type)
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+@require_GET
+async def namespinner_suggest_stream(request):
+    try:
+        _, _, params = _namespinner_query(request.GET)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    _log_suggestion_search(params)
+    return await _suggestion_stream(request, domains.astream_namespinner(params))
+
+
+@require_GET
+async def get_name_suggestions_stream(request):
+    try:
+        _, _, params = _suggestions_query(request.GET)
+    except ValueError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+    _log_suggestion_search(params)
+    return await _suggestion_stream(request, domains.astream_name_suggestions(params))
@@ -0,0 +1,253 @@
+# backend/hosting/catalog.py
+"""
+In-process cache of the compiled plan catalog.
+
+The catalog (HostingPlan + PlanSpec) changes a few times a month but backs the
+busiest public routes. Each worker keeps one compiled snapshot in memory,
+tagged with a version token that lives in the shared Django cache
+(hosting/versions.py). Any save/delete of a plan or spec bumps the token (see
+hosting/signals.py), and the next read in every worker rebuilds the snapshot
+with two queries.
+
+A snapshot holds compact DTOs for internal callers and the ready-to-send JSON
+bytes of every plan endpoint, so steady-state reads only compare the token:
+no database rows, no DRF serializers, no json.dumps.
+"""
+from __future__ import annotations
+
+import json
+import threading
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import transaction
+
+from . import versions
+
+VERSION_CACHE_KEY = "hosting:catalog:version"
+
+_lock = threading.Lock()
+_snapshot: Optional["CatalogSnapshot"] = None
+
+
+# ---------- DTOs ----------
+
+class SpecDTO:
+    __slots__ = ("label", "value", "icon", "order")
+
+    def __init__(self, label: str, value: str, icon: str, order: int):
+        self.label = label
+        self.value = value
+        self.icon = icon
+        self.order = order
+
+    def as_dict(self) -> dict:
+        # Same shape as PlanSpecSerializer
+        return {"label": self.label, "value": self.value, "icon": self.icon, "order": self.order}
+
+
+class PlanDTO:
+    __slots__ = ("id", "name", "price", "billing_cycle", "category", "is_popular", "features", "specs")
+
+    def __init__(self, id: int, name: str, price: Decimal, billing_cycle: str, category: str,
+                 is_popular: bool, features: Tuple[str, ...], specs: Tuple[SpecDTO, ...] = ()):
+        self.id = id
+        self.name = name
+        self.price = price
+        self.billing_cycle = billing_cycle
+        self.category = category
+        self.is_popular = is_popular
+        self.features = features
+        self.specs = specs
+
+    @property
+    def price_str(self) -> str:
+        # DecimalField(decimal_places=2) representation, as DRF renders it
+        return f"{self.price:.2f}"
+
+    @property
+    def price_cents(self) -> int:
+        return int(self.price * 100)
+
+    def header(self) -> dict:
+        return {
+            "id": self.id,
+            "name": self.name,
+            "price": self.price_str,
+            "billing_cycle": self.billing_cycle,
+            "category": self.category,
+            "is_popular": self.is_popular,
+        }
+
+    def as_dict(self) -> dict:
+        # Same shape as HostingPlanSerializer
+        return {**self.header(), "feature_list": list(self.features)}
+
+    def as_dict_with_specs(self) -> dict:
+        # Same shape as HostingPlanWithSpecsSerializer
+        return {**self.header(), "specs": [s.as_dict() for s in self.specs]}
+
+
+# ---------- JSON ----------
+
+def dumps(data) -> bytes:
+    """Encode exactly like DRF's JSONRenderer (compact, UTF-8, JS-safe line separators)."""
+    text = json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":"))
+    return text.replace("\u2028", "\\u2028").replace("\u2029", "\\u2029").encode("utf-8")
+
+
+def _join(chunks: Iterable[bytes]) -> bytes:
+    return b"[" + b",".join(chunks) + b"]"
+
+
+def build_matrix(category: str, plans: Iterable[PlanDTO]) -> dict:
+    """
+    Pivot plans and their specs into a comparison grid.
+    labels: deduped across plans, ordered by their lowest 'order' (then first seen).
+    cells[i][j]: [icon, value] of plans[i] for labels[j], or None if the plan lacks that row.
+    """
+    plans = list(plans)
+    rank: Dict[str, tuple] = {}  # label -> (lowest order, first-seen index)
+    for plan in plans:
+        for spec in plan.specs:
+            if spec.label not in rank:
+                rank[spec.label] = (spec.order, len(rank))
+            elif spec.order < rank[spec.label][0]:
+                rank[spec.label] = (spec.order, rank[spec.label][1])
+    labels = sorted(rank, key=rank.__getitem__)
+    column = {label: j for j, label in enumerate(labels)}
+
+    cells = []
+    for plan in plans:
+        row = [None] * len(labels)
+        for spec in plan.specs:
+            row[column[spec.label]] = [spec.icon, spec.value]
+        cells.append(row)
+
+    return {
+        "category": category,
+        "labels": labels,
+        "plans": [
+            {
+                "id": p.id,
+                "name": p.name,
+                "price": p.price_str,
+                "billing_cycle": p.billing_cycle,
+                "is_popular": p.is_popular,
+            }
+            for p in plans
+        ],
+        "cells": cells,
+    }
+
+
+# ---------- Snapshot ----------
+
+class CatalogSnapshot:
+    """DTOs and pre-encoded JSON bodies for a single catalog version."""
+
+    def __init__(self, version: str, plans: List[PlanDTO]):
+        self.version = version
+        self.by_id: Dict[int, PlanDTO] = {p.id: p for p in plans}
+        grouped: Dict[str, List[PlanDTO]] = {"": plans}
+        for plan in plans:
+            grouped.setdefault(plan.category, []).append(plan)
+        self.by_category: Dict[str, Tuple[PlanDTO, ...]] = {k: tuple(v) for k, v in grouped.items()}
+        by_feature: Dict[str, set] = {}
+        for plan in plans:
+            for feature in plan.features:
+                by_feature.setdefault(feature.casefold(), set()).add(plan.id)
+        self.by_feature: Dict[str, frozenset] = {k: frozenset(v) for k, v in by_feature.items()}  # casefolded
+
+        self.plan_json: Dict[int, bytes] = {p.id: dumps(p.as_dict()) for p in plans}
+        spec_json = {p.id: dumps(p.as_dict_with_specs()) for p in plans}
+
+        self.plans_json: Dict[str, bytes] = {}
+        self.specs_json: Dict[str, bytes] = {}
+        self.matrix_json: Dict[str, bytes] = {}
+        for category, members in self.by_category.items():
+            self.plans_json[category] = _join(self.plan_json[p.id] for p in members)
+            self.specs_json[category] = _join(spec_json[p.id] for p in members)
+            self.matrix_json[category] = dumps(build_matrix(category, members))
+
+
+def get_version() -> str:
+    """Current catalog version token (created on first use)."""
+    return versions.get(VERSION_CACHE_KEY)
+
+
+def bump_version() -> None:
+    """Invalidate every worker's snapshot once the current transaction commits."""
+    versions.bump(VERSION_CACHE_KEY)
+
+
+def invalidate() -> None:
+    """Bump the version and, if enabled, rebuild the static snapshots after commit."""
+    bump_version()
+    if settings.CATALOG_SNAPSHOT_ROOT:
+        from . import snapshots  # snapshots imports this module
+
+        transaction.on_commit(snapshots.schedule_rebuild)
+
+
+def load_plans() -> List[PlanDTO]:
+    """Read the whole catalog with two flat queries."""
+    from .models import HostingPlan, PlanSpec
+
+    specs: Dict[int, List[SpecDTO]] = {}
+    rows = PlanSpec.objects.order_by("order", "label", "id").values_list("plan_id", "label", "value", "icon", "order")
+    for plan_id, label, value, icon, order in rows:
+        specs.setdefault(plan_id, []).append(SpecDTO(label, value, icon, order))
+
+    rows = HostingPlan.objects.order_by("id").values_list(
+        "id", "name", "price", "billing_cycle", "category", "is_popular", "feature_items"
+    )
+    return [
+        PlanDTO(pk, name, price, cycle, category, popular, tuple(features), tuple(specs.get(pk, ())))
+        for pk, name, price, cycle, category, popular, features in rows
+    ]
+
+
+def get_snapshot() -> CatalogSnapshot:
+    global _snapshot
+    version = get_version()
+    snap = _snapshot
+    if snap is not None and snap.version == version:
+        return snap
+    with _lock:
+        if _snapshot is None or _snapshot.version != version:
+            _snapshot = CatalogSnapshot(version, load_plans())
+        return _snapshot
+
+
+# ---------- Read API ----------
+
+def get_plans(category: Optional[str] = None) -> Tuple[PlanDTO, ...]:
+    return get_snapshot().by_category.get(category or "", ())
+
+
+def get_plan(plan_id: int) -> Optional[PlanDTO]:
+    return get_snapshot().by_id.get(plan_id)
+
+
+def plans_json(category: Optional[str] = None, feature: Optional[str] = None) -> bytes:
+    snap = get_snapshot()
+    if not feature:
+        return snap.plans_json.get(category or "", b"[]")
+    ids = snap.by_feature.get(feature.strip().casefold(), frozenset())
+    return _join(snap.plan_json[p.id] for p in snap.by_category.get(category or "", ()) if p.id in ids)
+
+
+def specs_json(category: Optional[str] = None) -> bytes:
+    return get_snapshot().specs_json.get(category or "", b"[]")
+
+
+def matrix_json(category: Optional[str] = None) -> bytes:
+    snap = get_snapshot()
+    body = snap.matrix_json.get(category or "")
+    return body if body is not None else dumps(build_matrix(category or "", ()))
+
+
+def plan_json(plan_id: int) -> Optional[bytes]:
+    return get_snapshot().plan_json.get(plan_id)
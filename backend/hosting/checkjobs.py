@@ -0,0 +1,241 @@
+# backend/hosting/checkjobs.py
+"""
+Bulk domain check jobs for reseller portfolios (thousands of names per list).
+
+create_job() reads the uploaded list line by line into DomainCheckResult rows,
+written in batches, so memory does not grow with the list. `manage.py
+run_check_jobs` claims jobs and checks their rows in list order,
+CHECK_JOB_CHUNK at a time, through domains.check_many(): known-taken index,
+results cache, the bounded fan-out pool and the shared Enom rate limit (at
+"background" priority). Each chunk is saved together with the job's progress
+in one transaction, so an interrupted job resumes at its first unchecked row;
+a job whose worker stopped heartbeating for CHECK_JOB_STALE_SECONDS is
+claimed again. Rows that failed only for the moment (Enom unreachable or 5xx,
+breaker open, no rate-limit token) are asked again with exponential backoff
+before their chunk is saved; after CHECK_JOB_MAX_ATTEMPTS the job fails and
+keeps everything checked before that chunk.
+
+results() yields finished rows in list order for the CSV/NDJSON results
+endpoint; on request it follows a running job for a short while (each
+follower holds a worker and a database connection while it waits).
+"""
+from __future__ import annotations
+
+import logging
+import time
+import uuid
+from datetime import timedelta
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from . import domains, ratelimit
+from .models import DomainCheckJob, DomainCheckResult
+
+logger = logging.getLogger(__name__)
+
+INSERT_BATCH = 1000
+PAGE_SIZE = 1000
+RESULT_FIELDS = ("position", "domain", "available", "code", "text", "error")
+CSV_COLUMNS = ("domain", "available", "code", "text", "error")
+FINISHED = ("done", "failed")
+
+
+class JobError(ValueError):
+    """The uploaded list cannot become a job (empty, too long…)."""
+
+
+# ---------- Upload ----------
+
+def _domains(lines: Iterable[Union[str, bytes]]) -> Iterator[str]:
+    """One name per line; for CSV files the first column. Blank lines, '#' comments and a 'domain' header are skipped."""
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", "replace")
+        value = line.split(",", 1)[0].strip().strip('"').lower()
+        if value and value != "domain" and not value.startswith("#"):
+            yield value[:255]
+
+
+def create_job(user, lines: Iterable[Union[str, bytes]], name: str = "") -> DomainCheckJob:
+    limit = settings.CHECK_JOB_MAX_DOMAINS
+    with transaction.atomic():
+        job = DomainCheckJob.objects.create(user=user, name=name[:255])
+        batch: List[DomainCheckResult] = []
+        total = 0
+        for domain in _domains(lines):
+            if total == limit:
+                raise JobError(f"At most {limit} domains per job")
+            batch.append(DomainCheckResult(job=job, position=total, domain=domain))
+            total += 1
+            if len(batch) == INSERT_BATCH:
+                DomainCheckResult.objects.bulk_create(batch)
+                batch = []
+        if not total:
+            raise JobError("No domains in the list")
+        DomainCheckResult.objects.bulk_create(batch)
+        job.total = total
+        job.save(update_fields=["total"])
+    return job
+
+
+# ---------- Worker ----------
+
+def claim(job_id: Optional[int] = None) -> Optional[DomainCheckJob]:
+    """
+    Take the oldest pending job, or a running one whose worker went quiet.
+    The conditional UPDATE makes the claim atomic on every database, so
+    several run_check_jobs processes can share the queue.
+    """
+    stale = timezone.now() - timedelta(seconds=settings.CHECK_JOB_STALE_SECONDS)
+    candidates = DomainCheckJob.objects.filter(Q(status="pending") | Q(status="running", heartbeat_at__lt=stale))
+    if job_id is not None:
+        candidates = candidates.filter(pk=job_id)
+    for job in candidates.order_by("created_at")[:10]:
+        now = timezone.now()
+        token = uuid.uuid4().hex
+        taken_over = DomainCheckJob.objects.filter(
+            pk=job.pk, status=job.status, claim=job.claim, heartbeat_at=job.heartbeat_at
+        ).update(status="running", claim=token, heartbeat_at=now, started_at=job.started_at or now)
+        if taken_over:
+            if job.status == "running":
+                logger.info("Check job #%s: resuming at row %d of %d", job.pk, job.checked, job.total)
+            job.status, job.claim, job.heartbeat_at, job.started_at = "running", token, now, job.started_at or now
+            return job
+    return None
+
+
+def _check_rows(rows: List[DomainCheckResult]) -> List[DomainCheckResult]:
+    """
+    Fill in the answer of every row in place, through domains.check_many().
+    Returns the rows that failed transiently; their error is only for logging.
+    """
+    parts = {row.position: domains.split_domain(row.domain) for row in rows}
+    answers = {result["domain"]: result for result in domains.check_many(p for p in parts.values() if p)}
+    retry = []
+    for row in rows:
+        sld_tld = parts[row.position]
+        result = answers.get(".".join(sld_tld)) if sld_tld else {"error": "Invalid domain format"}
+        if result is None:
+            result = {"error": "No answer from Enom", "retry": True}
+        if "error" in result:
+            row.available, row.code, row.text, row.error = None, "", "", result["error"][:255]
+            if result.get("retry"):
+                retry.append(row)
+        else:
+            row.available, row.code, row.text = result["available"], result["code"], result["text"][:255]
+            row.error = ""
+    return retry
+
+
+def _heartbeat(job: DomainCheckJob) -> bool:
+    """False if another worker has claimed the job."""
+    return bool(DomainCheckJob.objects.filter(pk=job.pk, claim=job.claim).update(heartbeat_at=timezone.now()))
+
+
+def _check_chunk(job: DomainCheckJob, rows: List[DomainCheckResult]) -> bool:
+    """
+    Answer every row of a chunk, asking again for transient failures with
+    exponential backoff. False if another worker claimed the job meanwhile;
+    raises UpstreamError once CHECK_JOB_MAX_ATTEMPTS are used up.
+    """
+    pending = rows
+    attempts = max(settings.CHECK_JOB_MAX_ATTEMPTS, 1)
+    for attempt in range(1, attempts + 1):
+        pending = _check_rows(pending)
+        if not pending:
+            return True
+        if attempt == attempts:
+            break
+        delay = settings.CHECK_JOB_RETRY_BACKOFF * 2 ** (attempt - 1)
+        logger.info("Check job #%s: %d rows failed for now (%s), asking again in %.0fs",
+                    job.pk, len(pending), pending[0].error, delay)
+        time.sleep(delay)
+        if not _heartbeat(job):
+            return False
+    raise domains.UpstreamError(
+        f"{len(pending)} domains still failing after {attempts} attempts ({pending[0].domain}: {pending[0].error})",
+        transient=True,
+    )
+
+
+def _save_chunk(job: DomainCheckJob, rows: List[DomainCheckResult]) -> bool:
+    """Store a checked chunk and advance the job; False if another worker has claimed the job meanwhile."""
+    available = sum(1 for row in rows if row.available)
+    errors = sum(1 for row in rows if row.error)
+    with transaction.atomic():
+        advanced = DomainCheckJob.objects.filter(pk=job.pk, claim=job.claim, checked=job.checked).update(
+            checked=F("checked") + len(rows),
+            available=F("available") + available,
+            errors=F("errors") + errors,
+            heartbeat_at=timezone.now(),
+        )
+        if not advanced:
+            return False
+        DomainCheckResult.objects.bulk_update(rows, ["available", "code", "text", "error"])
+    job.checked += len(rows)
+    job.available += available
+    job.errors += errors
+    return True
+
+
+def run(job: DomainCheckJob) -> DomainCheckJob:
+    """Check a claimed job's remaining rows; returns it done, or as it was when another worker took it over."""
+    with ratelimit.priority("background"):
+        while job.checked < job.total:
+            rows = list(job.results.filter(position__gte=job.checked).order_by("position")[:settings.CHECK_JOB_CHUNK])
+            if not _check_chunk(job, rows) or not _save_chunk(job, rows):
+                logger.warning("Check job #%s: claimed by another worker, stopping", job.pk)
+                return job
+    DomainCheckJob.objects.filter(pk=job.pk, claim=job.claim).update(status="done", finished_at=timezone.now())
+    job.status = "done"
+    return job
+
+
+def fail(job: DomainCheckJob, error: str) -> None:
+    DomainCheckJob.objects.filter(pk=job.pk, claim=job.claim).update(
+        status="failed", error=error, finished_at=timezone.now()
+    )
+
+
+# ---------- Results ----------
+
+def as_dict(row: Tuple) -> dict:
+    """A results() row shaped like a bulk check line (BulkDomainCheckLineSerializer)."""
+    _, domain, available, code, text, error = row
+    if error:
+        return {"domain": domain, "error": error}
+    return {"domain": domain, "available": available, "code": code, "text": text}
+
+
+def as_csv(row: Tuple) -> Tuple[str, ...]:
+    """A results() row as CSV_COLUMNS values."""
+    _, domain, available, code, text, error = row
+    return domain, "" if available is None else str(available).lower(), code, text, error
+
+
+def results(job: DomainCheckJob, follow: bool = False) -> Iterator[Tuple]:
+    """
+    (position, domain, available, code, text, error) for each finished row in
+    list order, a page at a time. With follow, waits for more rows until the
+    job finishes or CHECK_JOB_STREAM_TIMEOUT runs out.
+    """
+    position = 0
+    deadline = time.monotonic() + settings.CHECK_JOB_STREAM_TIMEOUT
+    while True:
+        job.refresh_from_db(fields=["status", "checked", "total"])
+        while position < job.checked:
+            page = list(
+                job.results.filter(position__gte=position, position__lt=job.checked)
+                .order_by("position").values_list(*RESULT_FIELDS)[:PAGE_SIZE]
+            )
+            if not page:
+                break
+            yield from page
+            position = page[-1][0] + 1
+        if not follow or job.status in FINISHED or time.monotonic() > deadline:
+            return
+        time.sleep(settings.CHECK_JOB_POLL_SECONDS)
@@ -0,0 +1,36 @@
+# backend/hosting/checks.py
+from django.conf import settings
+from django.core.checks import Error, Warning, register
+from django.core.exceptions import ImproperlyConfigured
+
+from . import ratelimit, versions
+
+MESSAGE = (
+    "CACHES['default'] uses {backend}, which is local to each process: catalog and TLD price updates "
+    "(admin edits, seed commands, refresh_tld_prices) only reach the process that made them."
+)
+HINT = "Set CACHE_BACKEND/CACHE_LOCATION to a file-based or Redis cache."
+
+
+@register()
+def shared_cache_check(app_configs, **kwargs):
+    # A warning, not an error: the test runner forces DEBUG off and runs on LocMem.
+    if versions.cache_is_shared():
+        return []
+    return [Warning(MESSAGE.format(backend=settings.CACHES["default"]["BACKEND"]), hint=HINT, id="hosting.W001")]
+
+
+@register(deploy=True)
+def shared_cache_deploy_check(app_configs, **kwargs):
+    if versions.cache_is_shared():
+        return []
+    return [Error(MESSAGE.format(backend=settings.CACHES["default"]["BACKEND"]), hint=HINT, id="hosting.E001")]
+
+
+@register()
+def rate_limit_check(app_configs, **kwargs):
+    try:
+        ratelimit.limits()
+    except ImproperlyConfigured as e:
+        return [Error(str(e), hint="Give every command budget a rate above 0.", id="hosting.E002")]
+    return []
@@ -0,0 +1,687 @@
+# backend/hosting/domains.py
+"""
+Domain lookups on top of the Enom client: parsing plus a shared results cache.
+
+Results are cached in the Django cache (shared by all workers when it points
+at a file/Redis backend), keyed by the normalized command parameters:
+
+- availability answers: short TTL when available, long TTL when taken
+- upstream/parse errors: cached briefly (negative caching); calls refused
+  locally (breaker open, no rate-limit token) are not cached
+- after the fresh TTL an entry is served stale for ENOM_CACHE_STALE_TTL more
+  seconds while one background refresh runs (stale-while-revalidate)
+
+Check results Enom reports as taken are also kept in the known-taken index
+(hosting/taken.py), which answers check()/check_many() before the cache is
+consulted; entries past TAKEN_INDEX_RECHECK_AGE are re-asked in the background.
+
+The stream_* functions yield suggestions one by one while the upstream body is
+still arriving (incremental parsers in hosting/enom_parse.py), for the
+streaming endpoints.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import hashlib
+import heapq
+import logging
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import aiohttp
+import requests
+from django.conf import settings
+from django.core.cache import cache
+
+from . import enom, enom_parse, ratelimit, taken
+
+logger = logging.getLogger(__name__)
+
+DOMAIN_RE = re.compile(r"^(?P<sld>[a-z0-9-]{1,63})\.(?P<tld>[a-z0-9.-]{2,63})$", re.I)
+
+CACHE_PREFIX = "enom:result:"
+
+_refresh_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="enom-refresh")
+_refresh_tasks: Set[asyncio.Task] = set()
+_fanout_lock = threading.Lock()
+_fanout_pool: Optional[ThreadPoolExecutor] = None
+_suggest_pool: Optional[ThreadPoolExecutor] = None
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "stale_hits": 0, "negative_hits": 0, "misses": 0, "refreshes": 0}
+
+
+class UpstreamError(Exception):
+    """
+    Enom could not answer; the message is safe to return to the client (502).
+    transient: Enom was not reached or failed (transport error, 5xx, open
+    breaker, no rate-limit token), so the same call may succeed later; False
+    for an error Enom answered with.
+    """
+
+    def __init__(self, message: str, transient: bool = False):
+        super().__init__(message)
+        self.transient = transient
+
+
+def split_domain(domain: str) -> Optional[Tuple[str, str]]:
+    """'Example.com.my' -> ('example', 'com.my'); None if it does not look like a domain."""
+    m = DOMAIN_RE.match((domain or "").strip().lower())
+    return (m.group("sld"), m.group("tld")) if m else None
+
+
+# ---------- Results cache ----------
+
+def _count(name: str) -> None:
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def cache_stats() -> dict:
+    with _stats_lock:
+        return dict(_stats)
+
+
+def cache_key(params: dict) -> str:
+    """Case/whitespace-insensitive key; comma lists (TLD lists) are order-insensitive."""
+    norm = []
+    for k, v in params.items():
+        value = str(v).strip().lower()
+        if "," in value:
+            value = ",".join(sorted({p.strip() for p in value.split(",") if p.strip()}))
+        norm.append((k.lower(), value))
+    return CACHE_PREFIX + hashlib.sha1(repr(sorted(norm)).encode()).hexdigest()
+
+
+def _put(key: str, value: Any, ttl: int) -> None:
+    cache.set(key, {"value": value, "error": None, "fresh_until": time.time() + ttl},
+              ttl + settings.ENOM_CACHE_STALE_TTL)
+
+
+def _error_entry(e: UpstreamError) -> dict:
+    return {"value": None, "error": str(e), "transient": e.transient,
+            "fresh_until": time.time() + settings.ENOM_CACHE_ERROR_TTL}
+
+
+def _put_error(key: str, e: UpstreamError) -> None:
+    cache.set(key, _error_entry(e), settings.ENOM_CACHE_ERROR_TTL)
+
+
+def _cacheable(e: UpstreamError) -> bool:
+    """Negative caching is for Enom's answers, not for calls that were never sent."""
+    return not isinstance(e.__cause__, (enom.CircuitOpenError, enom.RateLimitedError))
+
+
+def _store(key: str, fetch: Callable[[], Any], fresh_ttl: Callable[[Any], int]) -> Any:
+    try:
+        value = fetch()
+    except UpstreamError as e:
+        if _cacheable(e):
+            _put_error(key, e)
+        raise
+    _put(key, value, fresh_ttl(value))
+    return value
+
+
+def _refresh(key: str, fetch: Callable[[], Any], fresh_ttl: Callable[[Any], int]) -> None:
+    try:
+        with ratelimit.priority("background"):
+            _store(key, fetch, fresh_ttl)
+    except UpstreamError as e:
+        logger.info("Background Enom refresh failed for %s: %s", key, e)
+    finally:
+        cache.delete(key + ":refresh")
+
+
+def _lookup(entry: Optional[dict]) -> str:
+    """Classify a cache entry: "miss", "error", "fresh" or "stale" (and count it)."""
+    if entry is None:
+        state = "miss"
+    elif entry["error"] is not None:
+        state = "error"
+    elif time.time() < entry["fresh_until"]:
+        state = "fresh"
+    else:
+        state = "stale"
+    _count({"miss": "misses", "error": "negative_hits", "fresh": "hits", "stale": "stale_hits"}[state])
+    return state
+
+
+def cached(params: dict, fetch: Callable[[], Any], fresh_ttl: Callable[[Any], int]) -> Any:
+    """Return fetch() through the shared results cache (see module docstring)."""
+    key = cache_key(params)
+    entry = cache.get(key)
+    state = _lookup(entry)
+    if state == "miss":
+        return _store(key, fetch, fresh_ttl)
+    if state == "error":
+        raise UpstreamError(entry["error"], entry.get("transient", False))
+    # Only one worker refreshes a given key at a time
+    if state == "stale" and cache.add(key + ":refresh", 1, timeout=settings.ENOM_TIMEOUT * 2):
+        _count("refreshes")
+        _refresh_pool.submit(_refresh, key, fetch, fresh_ttl)
+    return entry["value"]
+
+
+async def _astore(key: str, fetch: Callable[[], Awaitable[Any]], fresh_ttl: Callable[[Any], int]) -> Any:
+    try:
+        value = await fetch()
+    except UpstreamError as e:
+        if _cacheable(e):
+            await cache.aset(key, _error_entry(e), settings.ENOM_CACHE_ERROR_TTL)
+        raise
+    ttl = fresh_ttl(value)
+    await cache.aset(key, {"value": value, "error": None, "fresh_until": time.time() + ttl},
+                     ttl + settings.ENOM_CACHE_STALE_TTL)
+    return value
+
+
+async def _arefresh(key: str, fetch: Callable[[], Awaitable[Any]], fresh_ttl: Callable[[Any], int]) -> None:
+    try:
+        with ratelimit.priority("background"):
+            await _astore(key, fetch, fresh_ttl)
+    except UpstreamError as e:
+        logger.info("Background Enom refresh failed for %s: %s", key, e)
+    finally:
+        await cache.adelete(key + ":refresh")
+
+
+async def acached(params: dict, fetch: Callable[[], Awaitable[Any]], fresh_ttl: Callable[[Any], int]) -> Any:
+    """Async cached(): same entries and rules, refreshes run as tasks on the current loop."""
+    key = cache_key(params)
+    entry = await cache.aget(key)
+    state = _lookup(entry)
+    if state == "miss":
+        return await _astore(key, fetch, fresh_ttl)
+    if state == "error":
+        raise UpstreamError(entry["error"], entry.get("transient", False))
+    if state == "stale" and await cache.aadd(key + ":refresh", 1, timeout=settings.ENOM_TIMEOUT * 2):
+        _count("refreshes")
+        task = asyncio.get_running_loop().create_task(_arefresh(key, fetch, fresh_ttl))
+        _refresh_tasks.add(task)  # keep a reference until it finishes
+        task.add_done_callback(_refresh_tasks.discard)
+    return entry["value"]
+
+
+# ---------- Upstream + parsing ----------
+
+def _upstream(params: dict, response_type: str, error_prefix: str) -> str:
+    try:
+        return enom.request(params, response_type=response_type)
+    except requests.RequestException as e:
+        raise UpstreamError(f"{error_prefix}: {e}", transient=True) from e
+
+
+async def _aupstream(params: dict, response_type: str, error_prefix: str) -> str:
+    try:
+        return await enom.arequest(params, response_type=response_type)
+    except (aiohttp.ClientError, enom.CircuitOpenError, enom.RateLimitedError) as e:
+        raise UpstreamError(f"{error_prefix}: {e}", transient=True) from e
+
+
+@contextmanager
+def _parsing():
+    try:
+        yield
+    except enom_parse.EnomResponseError as e:
+        raise UpstreamError(str(e)) from None
+
+
+def _record(results: List[enom_parse.CheckResult]) -> None:
+    """Keep the known-taken index in step with what Enom just said."""
+    taken.remember(r.domain for r in results if r.code == enom_parse.RRP_TAKEN)
+    taken.forget(r.domain for r in results if r.available)
+
+
+def _parse_check(params: dict, body: str) -> dict:
+    with _parsing():
+        result = enom_parse.check(body, f"{params['SLD']}.{params['TLD']}")
+    _record([result])
+    return result.as_dict()
+
+
+def _fetch_check_many(domains: List[Tuple[str, str]]) -> Dict[str, dict]:
+    """One multi-domain check (DomainList); {"sld.tld": result} for every domain Enom answered."""
+    params = {"command": "check", "DomainList": ",".join(f"{sld}.{tld}" for sld, tld in domains), "Version": "1"}
+    body = _upstream(params, "xml", "Upstream error contacting Enom")
+    with _parsing():
+        results = enom_parse.check_many(body)
+    _record(results)
+    return {r.domain: r.as_dict() for r in results}
+
+
+def _parse_namespinner(params: dict, body: str) -> List[dict]:
+    with _parsing():
+        return [s.as_dict() for s in enom_parse.namespinner(body, params["TLDList"])]
+
+
+def _parse_name_suggestions(body: str) -> List[dict]:
+    with _parsing():
+        return [s.as_dict() for s in enom_parse.name_suggestions(body)]
+
+
+def _sort_namespinner(rows: List[dict]) -> List[dict]:
+    rows.sort(key=lambda x: x["score"], reverse=True)
+    return rows
+
+
+def _fetch_check(params: dict) -> dict:
+    return _parse_check(params, _upstream(params, "xml", "Upstream error contacting Enom"))
+
+
+def _fetch_namespinner(params: dict) -> List[dict]:
+    return _parse_namespinner(params, _upstream(params, "xml", "Upstream error contacting Enom"))
+
+
+def _fetch_name_suggestions(params: dict) -> List[dict]:
+    return _parse_name_suggestions(_upstream(params, "text", "Enom GetNameSuggestions error"))
+
+
+# ---------- Public API used by the views ----------
+
+def check(sld: str, tld: str) -> Dict[str, Any]:
+    """{"domain", "available", "code", "text"} for one domain."""
+    known = _known_taken(sld, tld)
+    if known is not None:
+        result, due = known
+        if due and cache.add(_recheck_key(sld, tld), 1, timeout=settings.ENOM_TIMEOUT * 2):
+            _refresh_pool.submit(_recheck_one, sld, tld)
+        return result
+    params = _check_params(sld, tld)
+    return cached(params, lambda: _fetch_check(params), _check_ttl)
+
+
+def _known_taken(sld: str, tld: str) -> Optional[Tuple[dict, bool]]:
+    """(check result, due for a recheck) if the known-taken index has the domain."""
+    confirmed = taken.lookup(f"{sld}.{tld}")
+    if confirmed is None:
+        return None
+    result = {"domain": f"{sld}.{tld}", "available": False, "code": enom_parse.RRP_TAKEN,
+              "text": "Domain not available"}
+    return result, time.time() - confirmed > settings.TAKEN_INDEX_RECHECK_AGE
+
+
+def _recheck_key(sld: str, tld: str) -> str:
+    return f"{CACHE_PREFIX}taken-recheck:{sld}.{tld}"
+
+
+def _recheck_one(sld: str, tld: str) -> None:
+    try:
+        with ratelimit.priority("background"):
+            results = _recheck_batch([(sld, tld)])
+        for result in results:
+            if "error" in result:
+                logger.info("Background known-taken recheck failed for %s: %s", result["domain"], result["error"])
+    finally:
+        cache.delete(_recheck_key(sld, tld))
+
+
+def freshness(sld: str, tld: str) -> float:
+    """Seconds the cached check() answer for a domain stays fresh; <= 0 if stale, an error or missing."""
+    entry = cache.get(cache_key(_check_params(sld, tld)))
+    if entry is None or entry["error"] is not None:
+        return 0.0
+    return entry["fresh_until"] - time.time()
+
+
+def _check_params(sld: str, tld: str) -> dict:
+    return {"command": "check", "SLD": sld, "TLD": tld, "Version": "1"}
+
+
+def _check_ttl(result: dict) -> int:
+    return settings.ENOM_CACHE_TTL_AVAILABLE if result["available"] else settings.ENOM_CACHE_TTL_TAKEN
+
+
+def _get_fanout_pool() -> ThreadPoolExecutor:
+    """Per-process pool shared by all bulk requests, so total Enom concurrency stays bounded."""
+    global _fanout_pool
+    with _fanout_lock:
+        if _fanout_pool is None:
+            _fanout_pool = ThreadPoolExecutor(max_workers=settings.ENOM_BULK_WORKERS,
+                                              thread_name_prefix="enom-bulk")
+        return _fanout_pool
+
+
+def _get_suggest_pool() -> ThreadPoolExecutor:
+    """Per-process pool for suggestions(), apart from the bulk one so a bulk check never queues a search."""
+    global _suggest_pool
+    with _fanout_lock:
+        if _suggest_pool is None:
+            _suggest_pool = ThreadPoolExecutor(max_workers=settings.ENOM_SUGGEST_WORKERS,
+                                               thread_name_prefix="enom-suggest")
+        return _suggest_pool
+
+
+def _submit(pool: ThreadPoolExecutor, fn: Callable, *args) -> Future:
+    """pool.submit() in a copy of the caller's context, so the rate-limit priority class carries over."""
+    return pool.submit(contextvars.copy_context().run, fn, *args)
+
+
+def _error_row(domain: str, e: UpstreamError) -> dict:
+    """A check_many() line for a failed domain; "retry" marks failures worth asking again later."""
+    return {"domain": domain, "error": str(e), "retry": True} if e.transient else {"domain": domain, "error": str(e)}
+
+
+def _check_one(sld: str, tld: str) -> List[dict]:
+    try:
+        return [check(sld, tld)]
+    except UpstreamError as e:
+        return [_error_row(f"{sld}.{tld}", e)]
+
+
+def _check_batch(batch: List[Tuple[str, str]]) -> List[dict]:
+    """Multi-domain check; whatever Enom leaves unanswered falls back to single checks."""
+    try:
+        answered = _fetch_check_many(batch)
+    except UpstreamError as e:
+        logger.info("Enom multi-domain check failed, falling back to single checks: %s", e)
+        answered = {}
+    out = []
+    for sld, tld in batch:
+        result = answered.get(f"{sld}.{tld}")
+        if result is None:
+            out += _check_one(sld, tld)
+            continue
+        _put(cache_key(_check_params(sld, tld)), result, _check_ttl(result))
+        out.append(result)
+    return out
+
+
+def check_many(names: Iterable[Tuple[str, str]]) -> Iterator[dict]:
+    """
+    Check many (sld, tld) pairs, yielding one result per domain as soon as it is known:
+    a check() dict, or {"domain", "error"} if Enom failed for it, plus "retry": True
+    when the failure was transient (see UpstreamError).
+
+    Known-taken and cached domains (fresh, stale or negative) are answered first
+    without waiting on Enom. The rest are sent as multi-domain checks of up to ENOM_CHECK_BATCH domains
+    (single checks if ENOM_CHECK_BATCH <= 1), run concurrently on the bounded bulk pool.
+    """
+    misses: List[Tuple[str, str]] = []
+    for sld, tld in dict.fromkeys(names):
+        if taken.lookup(f"{sld}.{tld}") is not None or cache.get(cache_key(_check_params(sld, tld))) is not None:
+            yield from _check_one(sld, tld)
+        else:
+            misses.append((sld, tld))
+    if not misses:
+        return
+
+    size = max(settings.ENOM_CHECK_BATCH, 1)
+    pool = _get_fanout_pool()
+    futures = []
+    for i in range(0, len(misses), size):
+        batch = misses[i:i + size]
+        if len(batch) == 1:
+            futures.append(_submit(pool, _check_one, *batch[0]))
+        else:
+            futures.append(_submit(pool, _check_batch, batch))
+    for future in as_completed(futures):
+        yield from future.result()
+
+
+def _recheck_batch(batch: List[Tuple[str, str]]) -> List[dict]:
+    """Ask Enom directly (no index, no cache), then refresh the cache entries."""
+    try:
+        if len(batch) == 1:
+            sld, tld = batch[0]
+            answered = {f"{sld}.{tld}": _fetch_check(_check_params(sld, tld))}
+        else:
+            answered = _fetch_check_many(batch)
+    except UpstreamError as e:
+        return [_error_row(f"{sld}.{tld}", e) for sld, tld in batch]
+    out = []
+    for sld, tld in batch:
+        result = answered.get(f"{sld}.{tld}")
+        if result is None:
+            out.append({"domain": f"{sld}.{tld}", "error": "No answer from Enom", "retry": True})
+            continue
+        _put(cache_key(_check_params(sld, tld)), result, _check_ttl(result))
+        out.append(result)
+    return out
+
+
+def recheck(names: Iterable[Tuple[str, str]]) -> Iterator[dict]:
+    """
+    check_many() straight from Enom, bypassing the known-taken index and the
+    results cache; both are updated with the answers. For `recheck_taken`.
+    """
+    names = list(dict.fromkeys(names))
+    size = max(settings.ENOM_CHECK_BATCH, 1)
+    pool = _get_fanout_pool()
+    futures = [_submit(pool, _recheck_batch, names[i:i + size]) for i in range(0, len(names), size)]
+    for future in as_completed(futures):
+        yield from future.result()
+
+
+def retail_prices(tlds: List[str]) -> List[enom_parse.RetailPrice]:
+    """Current Enom retail prices for one batch of TLDs, uncached; for `refresh_tld_prices`."""
+    params = {"command": "PE_GetRetailPricing", "TLDList": ",".join(tlds)}
+    body = _upstream(params, "xml", "Upstream error contacting Enom")
+    with _parsing():
+        return enom_parse.retail_prices(body)
+
+
+def _suggestions_ttl(result: List[dict]) -> int:
+    return settings.ENOM_CACHE_TTL_SUGGESTIONS
+
+
+def namespinner(params: dict) -> List[dict]:
+    """NameSpinner suggestions (sorted by score) for a full Enom params dict."""
+    return cached(params, lambda: _fetch_namespinner(params), _suggestions_ttl)
+
+
+def name_suggestions(params: dict) -> List[dict]:
+    """GetNameSuggestions results for a full Enom params dict."""
+    return cached(params, lambda: _fetch_name_suggestions(params), _suggestions_ttl)
+
+
+def _merge_suggestions(spins: List[dict], names: List[dict], limit: int) -> List[dict]:
+    """
+    One ranking out of NameSpinner (integer relevance) and GetNameSuggestions
+    (0-1) rows. Each list is scaled to 0-1 by its own best score and weighted
+    by ENOM_MERGE_SPINNER_WEIGHT (the rest goes to GetNameSuggestions); a
+    domain both return gets both contributions. NameSpinner's availability
+    flag is kept.
+    """
+    weights = {"namespinner": settings.ENOM_MERGE_SPINNER_WEIGHT,
+               "getnamesuggestions": 1 - settings.ENOM_MERGE_SPINNER_WEIGHT}
+    merged: Dict[str, dict] = {}
+    for source, rows in (("namespinner", spins), ("getnamesuggestions", names)):
+        top = max((row["score"] for row in rows), default=0) or 1
+        for row in rows:
+            score = weights[source] * row["score"] / top
+            seen = merged.get(row["domain"])
+            if seen is None:
+                merged[row["domain"]] = {**row, "score": score, "source": source}
+            else:
+                seen["score"] += score
+                seen["source"] = "both"
+                if "available" in row:
+                    seen["available"] = row["available"]
+    for row in merged.values():
+        row["score"] = round(row["score"], 4)
+    return heapq.nlargest(limit, merged.values(), key=lambda row: (row["score"], -len(row["domain"])))
+
+
+def suggestions(spin_params: dict, name_params: dict, limit: int) -> Tuple[List[dict], Dict[str, str]]:
+    """
+    NameSpinner and GetNameSuggestions at the same time (the latency of the
+    slower one, not the sum), merged by _merge_suggestions(). Returns
+    (rows, {command: error}) for a command that failed; raises UpstreamError
+    only if both did.
+    """
+    spinner = _submit(_get_suggest_pool(), namespinner, spin_params)
+    results: Dict[str, List[dict]] = {}
+    errors: Dict[str, str] = {}
+    try:
+        results["getnamesuggestions"] = name_suggestions(name_params)
+    except UpstreamError as e:
+        errors["getnamesuggestions"] = str(e)
+    try:
+        results["namespinner"] = spinner.result()
+    except UpstreamError as e:
+        errors["namespinner"] = str(e)
+    if not results:
+        raise UpstreamError(errors["namespinner"])
+    return _merge_suggestions(results.get("namespinner", []), results.get("getnamesuggestions", []), limit), errors
+
+
+def _stream(params: dict, response_type: str, error_prefix: str, parser, finish: Callable[[List[dict]], List[dict]],
+            fetch: Callable[[], List[dict]]) -> Iterator[dict]:
+    """
+    Yield suggestions as they are parsed from the upstream body. A cached answer
+    (including stale and negative entries) is replayed instead; a complete
+    streamed answer is cached like the non-streaming one, unless it has more
+    than ENOM_STREAM_CACHE_MAX_RESULTS rows.
+    """
+    key = cache_key(params)
+    if cache.get(key) is not None:
+        yield from cached(params, fetch, _suggestions_ttl)
+        return
+
+    _count("misses")
+    kept: Optional[List[dict]] = []
+    try:
+        with _parsing():
+            try:
+                for chunk in enom.stream(params, response_type):
+                    for record in parser.feed(chunk):
+                        row = record.as_dict()
+                        kept = _keep(kept, row)
+                        yield row
+            except requests.RequestException as e:
+                raise UpstreamError(f"{error_prefix}: {e}", transient=True) from e
+            for record in parser.close():
+                row = record.as_dict()
+                kept = _keep(kept, row)
+                yield row
+    except UpstreamError as e:
+        if _cacheable(e):
+            _put_error(key, e)
+        raise
+    if kept is not None:
+        _put(key, finish(kept), settings.ENOM_CACHE_TTL_SUGGESTIONS)
+
+
+def _keep(kept: Optional[List[dict]], row: dict) -> Optional[List[dict]]:
+    if kept is None or len(kept) >= settings.ENOM_STREAM_CACHE_MAX_RESULTS:
+        return None  # too big to cache; stop holding on to rows
+    kept.append(row)
+    return kept
+
+
+def stream_namespinner(params: dict) -> Iterator[dict]:
+    """namespinner() one row at a time, in upstream order rather than sorted by score."""
+    return _stream(params, "xml", "Upstream error contacting Enom", enom_parse.NameSpinnerParser(params["TLDList"]),
+                   _sort_namespinner, lambda: _fetch_namespinner(params))
+
+
+def stream_name_suggestions(params: dict) -> Iterator[dict]:
+    """name_suggestions() one row at a time."""
+    return _stream(params, "text", "Enom GetNameSuggestions error", enom_parse.NameSuggestionsParser(),
+                   lambda rows: rows, lambda: _fetch_name_suggestions(params))
+
+
+# ---------- Async API (ASGI views) ----------
+
+async def acheck(sld: str, tld: str) -> Dict[str, Any]:
+    known = _known_taken(sld, tld)
+    if known is not None:
+        result, due = known
+        if due and await cache.aadd(_recheck_key(sld, tld), 1, timeout=settings.ENOM_TIMEOUT * 2):
+            _refresh_pool.submit(_recheck_one, sld, tld)
+        return result
+    params = _check_params(sld, tld)
+
+    async def fetch():
+        body = await _aupstream(params, "xml", "Upstream error contacting Enom")
+        return await asyncio.to_thread(_parse_check, params, body)  # writes the known-taken index under its flock
+
+    return await acached(params, fetch, _check_ttl)
+
+
+async def anamespinner(params: dict) -> List[dict]:
+    async def fetch():
+        return _parse_namespinner(params, await _aupstream(params, "xml", "Upstream error contacting Enom"))
+
+    return await acached(params, fetch, _suggestions_ttl)
+
+
+async def aname_suggestions(params: dict) -> List[dict]:
+    async def fetch():
+        return _parse_name_suggestions(await _aupstream(params, "text", "Enom GetNameSuggestions error"))
+
+    return await acached(params, fetch, _suggestions_ttl)
+
+
+async def _astream(params: dict, response_type: str, error_prefix: str, parser,
+                   finish: Callable[[List[dict]], List[dict]],
+                   fetch: Callable[[], Awaitable[List[dict]]]) -> AsyncIterator[dict]:
+    """Async _stream()."""
+    key = cache_key(params)
+    if await cache.aget(key) is not None:
+        for row in await acached(params, fetch, _suggestions_ttl):
+            yield row
+        return
+
+    _count("misses")
+    kept: Optional[List[dict]] = []
+    try:
+        with _parsing():
+            try:
+                async for chunk in enom.astream(params, response_type):
+                    for record in parser.feed(chunk):
+                        row = record.as_dict()
+                        kept = _keep(kept, row)
+                        yield row
+            except (aiohttp.ClientError, enom.CircuitOpenError, enom.RateLimitedError) as e:
+                raise UpstreamError(f"{error_prefix}: {e}", transient=True) from e
+            for record in parser.close():
+                row = record.as_dict()
+                kept = _keep(kept, row)
+                yield row
+    except UpstreamError as e:
+        if _cacheable(e):
+            await cache.aset(key, _error_entry(e), settings.ENOM_CACHE_ERROR_TTL)
+        raise
+    if kept is not None:
+        ttl = settings.ENOM_CACHE_TTL_SUGGESTIONS
+        await cache.aset(key, {"value": finish(kept), "error": None, "fresh_until": time.time() + ttl},
+                         ttl + settings.ENOM_CACHE_STALE_TTL)
+
+
+async def asuggestions(spin_params: dict, name_params: dict, limit: int) -> Tuple[List[dict], Dict[str, str]]:
+    """Async suggestions()."""
+    outcomes = await asyncio.gather(anamespinner(spin_params), aname_suggestions(name_params), return_exceptions=True)
+    results: Dict[str, List[dict]] = {}
+    errors: Dict[str, str] = {}
+    for command, outcome in zip(("namespinner", "getnamesuggestions"), outcomes):
+        if isinstance(outcome, UpstreamError):
+            errors[command] = str(outcome)
+        elif isinstance(outcome, BaseException):
+            raise outcome
+        else:
+            results[command] = outcome
+    if not results:
+        raise UpstreamError(errors["namespinner"])
+    return _merge_suggestions(results.get("namespinner", []), results.get("getnamesuggestions", []), limit), errors
+
+
+def astream_namespinner(params: dict) -> AsyncIterator[dict]:
+    async def fetch():
+        return _parse_namespinner(params, await _aupstream(params, "xml", "Upstream error contacting Enom"))
+
+    return _astream(params, "xml", "Upstream error contacting Enom", enom_parse.NameSpinnerParser(params["TLDList"]),
+                    _sort_namespinner, fetch)
+
+
+def astream_name_suggestions(params: dict) -> AsyncIterator[dict]:
+    async def fetch():
+        return _parse_name_suggestions(await _aupstream(params, "text", "Enom GetNameSuggestions error"))
+
+    return _astream(params, "text", "Enom GetNameSuggestions error", enom_parse.NameSuggestionsParser(),
+                    lambda rows: rows, fetch)
@@ -0,0 +1,489 @@
+# backend/hosting/enom.py
+"""
+Enom reseller API client (interface.asp).
+
+One keep-alive requests.Session per worker process, so domain lookups reuse
+TCP+TLS connections instead of paying a handshake per call. Read-only
+commands get bounded retries with exponential backoff; everything else is
+sent exactly once.
+
+Every call takes a token from the host-wide rate limiter
+(hosting/ratelimit.py), then goes through a circuit breaker (hosting/resilience.py) that fails
+fast with CircuitOpenError while Enom is erroring or slow. With ENOM_HEDGE on,
+a read-only call still running after the ENOM_HEDGE_PERCENTILE latency gets a
+second identical call and the first answer wins.
+
+arequest() is the asyncio twin used by the ASGI views: one pooled
+aiohttp.ClientSession per event loop, same retry policy and counters.
+
+stream()/astream() yield a read-only command's body chunk by chunk as it
+arrives, for parsers that emit results before the response is complete.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import hashlib
+import os
+import random
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from typing import AsyncIterator, Dict, Iterator, Optional, Tuple
+from urllib.parse import urlencode
+
+import aiohttp
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as Urllib3Error
+
+from . import ratelimit
+from .ratelimit import RateLimitedError
+from .resilience import CLOSED, CircuitBreaker, CircuitOpenError, LatencyTracker
+from .singleflight import AsyncSingleFlight, SingleFlight
+
+# Safe to repeat: they only read registry/pricing data. Compared case-insensitively.
+READ_ONLY_COMMANDS = frozenset({
+    "check",
+    "namespinner",
+    "getnamesuggestions",
+    "pe_getproductprice",
+    "pe_getretailpricing",
+})
+
+STREAM_CHUNK_SIZE = 8192
+
+_session_lock = threading.Lock()
+_session: Optional[requests.Session] = None
+_session_pid: Optional[int] = None
+
+_async_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = weakref.WeakKeyDictionary()
+
+breaker = CircuitBreaker("Enom")
+latency = LatencyTracker()
+_hedge_lock = threading.Lock()
+_hedge_pool: Optional[Tuple[ThreadPoolExecutor, threading.BoundedSemaphore]] = None
+
+_stats_lock = threading.Lock()
+_stats: Dict[str, float] = {
+    "requests": 0,
+    "errors": 0,
+    "retries": 0,
+    "coalesced_local": 0,  # callers that shared another thread/task's call
+    "coalesced_shared": 0,  # callers that got another worker's result via the cache
+    "hedges": 0,  # second calls fired for slow read-only commands
+    "hedge_wins": 0,  # ...that answered first
+    "latency_ms_total": 0.0,
+}
+
+
+def _incr(**deltas) -> None:
+    with _stats_lock:
+        for name, delta in deltas.items():
+            _stats[name] = _stats.get(name, 0) + delta
+
+
+def get_session() -> requests.Session:
+    """The worker's pooled session (recreated after fork, never shared across processes)."""
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is not None and _session_pid == pid:
+        return _session
+    with _session_lock:
+        if _session is None or _session_pid != pid:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=1,  # a single upstream host
+                pool_maxsize=settings.ENOM_POOL_SIZE,
+                max_retries=0,  # retries are handled in request() per command
+            )
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session, _session_pid = session, pid
+        return _session
+
+
+def get_async_session() -> aiohttp.ClientSession:
+    """Pooled aiohttp session for the running event loop (sessions cannot cross loops)."""
+    loop = asyncio.get_running_loop()
+    session = _async_sessions.get(loop)
+    if session is None or session.closed:
+        session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=settings.ENOM_ASYNC_POOL_SIZE, keepalive_timeout=30),
+            timeout=aiohttp.ClientTimeout(sock_connect=settings.ENOM_CONNECT_TIMEOUT, sock_read=settings.ENOM_TIMEOUT),
+            raise_for_status=True,
+        )
+        _async_sessions[loop] = session
+    return session
+
+
+def build_url(params: dict, response_type: str = "xml") -> str:
+    base = settings.ENOM_BASE_URL.rstrip("/")
+    p = {
+        **params,
+        "uid": settings.ENOM_UID,
+        "pw": settings.ENOM_TOKEN,
+        "responsetype": response_type,
+    }
+    return f"{base}/interface.asp?{urlencode(p)}"
+
+
+def is_read_only(params: dict) -> bool:
+    return str(params.get("command", "")).lower() in READ_ONLY_COMMANDS
+
+
+def flight_key(params: dict, response_type: str) -> str:
+    """Identity of a command for coalescing (credentials are not part of params)."""
+    items = sorted((str(k).lower(), str(v).strip()) for k, v in params.items())
+    return "enom:flight:" + hashlib.sha1(repr((response_type, items)).encode()).hexdigest()
+
+
+def _max_call_seconds() -> float:
+    """Worst case for one request() including retries; bounds how long followers wait."""
+    per_try = settings.ENOM_CONNECT_TIMEOUT + settings.ENOM_TIMEOUT
+    backoff = sum(settings.ENOM_RETRY_BACKOFF * 1.5 * 2 ** i for i in range(settings.ENOM_RETRIES))
+    return per_try * (settings.ENOM_RETRIES + 1) + backoff
+
+
+def _count_coalesced(kind: str) -> None:
+    _incr(**{f"coalesced_{kind}": 1})
+
+
+_flights = SingleFlight(_max_call_seconds, _count_coalesced)
+_aflights = AsyncSingleFlight(_max_call_seconds, _count_coalesced)
+
+
+def request(params: dict, response_type: str = "xml") -> str:
+    """
+    Send one Enom command and return the response body.
+    Raises requests.RequestException on transport errors and non-2xx replies.
+
+    Identical read-only commands in flight at the same time share one upstream
+    call (hosting/singleflight.py).
+    """
+    if settings.ENOM_COALESCE and is_read_only(params):
+        return _flights.do(flight_key(params, response_type), lambda: _send(params, response_type))
+    return _send(params, response_type)
+
+
+def _failed(status: Optional[int]) -> bool:
+    return status is None or status >= 500  # transport error or upstream 5xx
+
+
+def _command(params: dict) -> str:
+    return str(params.get("command", "")).lower()
+
+
+def _admit(command: str, block: bool = True) -> bool:
+    """Breaker permission, then a rate-limit token; returns the breaker probe flag."""
+    probe = breaker.acquire()
+    try:
+        ratelimit.acquire(command, block)
+    except BaseException:
+        breaker.abandon(probe)
+        raise
+    return probe
+
+
+async def _aadmit(command: str, block: bool = True) -> bool:
+    probe = breaker.acquire()
+    try:
+        if block:
+            await ratelimit.aacquire(command)
+        else:
+            ratelimit.acquire(command, block=False)
+    except BaseException:
+        breaker.abandon(probe)
+        raise
+    return probe
+
+
+def _get(url: str, command: str, block: bool = True) -> str:
+    """One HTTP call, accounted in the limiter, the breaker, the counters and the latency tracker."""
+    probe = _admit(command, block)
+    started = time.monotonic()
+    try:
+        r = get_session().get(url, timeout=(settings.ENOM_CONNECT_TIMEOUT, settings.ENOM_TIMEOUT))
+        r.raise_for_status()
+    except requests.RequestException as e:
+        elapsed = time.monotonic() - started
+        _incr(requests=1, errors=1, latency_ms_total=elapsed * 1000)
+        breaker.release(probe, _failed(getattr(e.response, "status_code", None)), elapsed)
+        raise
+    except BaseException:
+        breaker.release(probe, True, time.monotonic() - started)  # any other error still frees the breaker slot
+        raise
+    elapsed = time.monotonic() - started
+    _incr(requests=1, latency_ms_total=elapsed * 1000)
+    breaker.release(probe, False, elapsed)
+    latency.add(elapsed)
+    return r.text
+
+
+def hedge_delay() -> Optional[float]:
+    """Seconds after which a read-only call gets a hedge; None while hedging is off or warming up."""
+    if not settings.ENOM_HEDGE:
+        return None
+    p = latency.percentile(settings.ENOM_HEDGE_PERCENTILE)
+    return None if p is None else max(p, settings.ENOM_HEDGE_MIN_DELAY)
+
+
+def _get_hedge_pool() -> Tuple[ThreadPoolExecutor, threading.BoundedSemaphore]:
+    global _hedge_pool
+    with _hedge_lock:
+        if _hedge_pool is None:
+            pairs = settings.ENOM_HEDGE_MAX_INFLIGHT
+            _hedge_pool = (
+                ThreadPoolExecutor(max_workers=pairs * 2, thread_name_prefix="enom-hedge"),
+                threading.BoundedSemaphore(pairs),
+            )
+        return _hedge_pool
+
+
+def _get_hedged(url: str, command: str) -> str:
+    """
+    _get(), plus a second identical call if the first is still running after
+    hedge_delay(); the first success wins. Bounded by ENOM_HEDGE_MAX_INFLIGHT
+    pairs per worker, beyond that calls are simply not hedged. The hedge never
+    queues for a rate-limit token: without one at hand it fails at once.
+    """
+    delay = hedge_delay()
+    if delay is None:
+        return _get(url, command)
+    pool, slots = _get_hedge_pool()
+    if not slots.acquire(blocking=False):
+        return _get(url, command)
+
+    # Copied contexts keep the caller's rate-limit priority class in the pool threads
+    futures = [pool.submit(contextvars.copy_context().run, _get, url, command)]
+    if not wait(futures, timeout=delay).done and breaker.state == CLOSED:
+        futures.append(pool.submit(contextvars.copy_context().run, _get, url, command, False))
+        _incr(hedges=1)
+
+    remaining = [len(futures)]  # the slot frees up once both calls have finished
+    remaining_lock = threading.Lock()
+
+    def finished(_future) -> None:
+        with remaining_lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            slots.release()
+
+    for future in futures:
+        future.add_done_callback(finished)
+
+    for future in as_completed(futures):
+        if future.exception() is None:
+            if future is not futures[0]:
+                _incr(hedge_wins=1)
+            return future.result()
+    raise futures[0].exception()
+
+
+def _send(params: dict, response_type: str) -> str:
+    url = build_url(params, response_type)
+    read_only = is_read_only(params)
+    retries = settings.ENOM_RETRIES if read_only else 0
+    get = _get_hedged if read_only else _get
+
+    attempt = 0
+    while True:
+        try:
+            return get(url, _command(params))
+        except (CircuitOpenError, RateLimitedError):
+            raise
+        except requests.RequestException as e:
+            if attempt >= retries or not _failed(getattr(e.response, "status_code", None)):
+                raise
+        attempt += 1
+        _incr(retries=1)
+        delay = settings.ENOM_RETRY_BACKOFF * (2 ** (attempt - 1))
+        time.sleep(delay + random.uniform(0, delay / 2))
+
+
+def stream(params: dict, response_type: str = "xml") -> Iterator[bytes]:
+    """
+    Send one read-only command and yield the response body as it arrives.
+    Raises requests.RequestException like request(), possibly mid-stream.
+
+    Goes through the rate limiter, breaker and counters, but is never retried,
+    hedged or coalesced: all of those need the complete body before answering.
+    """
+    probe = _admit(_command(params))
+    started = time.monotonic()
+    try:
+        with get_session().get(build_url(params, response_type), stream=True,
+                               timeout=(settings.ENOM_CONNECT_TIMEOUT, settings.ENOM_TIMEOUT)) as r:
+            r.raise_for_status()
+            r.raw.decode_content = True
+            while True:
+                chunk = r.raw.read1(STREAM_CHUNK_SIZE)  # whatever has arrived, not a full chunk
+                if not chunk:
+                    break
+                yield chunk
+    except requests.RequestException as e:
+        elapsed = time.monotonic() - started
+        _incr(requests=1, errors=1, latency_ms_total=elapsed * 1000)
+        breaker.release(probe, _failed(getattr(e.response, "status_code", None)), elapsed)
+        raise
+    except GeneratorExit:
+        breaker.abandon(probe)  # the consumer stopped reading
+        raise
+    except Urllib3Error as e:  # raw reads are not wrapped by requests
+        elapsed = time.monotonic() - started
+        _incr(requests=1, errors=1, latency_ms_total=elapsed * 1000)
+        breaker.release(probe, True, elapsed)
+        raise requests.ConnectionError(e)
+    except BaseException:
+        breaker.release(probe, True, time.monotonic() - started)  # any other error still frees the breaker slot
+        raise
+    elapsed = time.monotonic() - started
+    _incr(requests=1, latency_ms_total=elapsed * 1000)
+    breaker.release(probe, False, elapsed)
+    latency.add(elapsed)
+
+
+async def arequest(params: dict, response_type: str = "xml") -> str:
+    """
+    Async request(): same retry policy, coalescing, limiter and counters.
+    Raises aiohttp.ClientError on transport errors, timeouts and non-2xx replies,
+    CircuitOpenError / RateLimitedError when the call was not attempted.
+    """
+    if settings.ENOM_COALESCE and is_read_only(params):
+        return await _aflights.do(flight_key(params, response_type), lambda: _asend(params, response_type))
+    return await _asend(params, response_type)
+
+
+async def _aget(url: str, command: str, block: bool = True) -> str:
+    """Async _get()."""
+    probe = await _aadmit(command, block)
+    started = time.monotonic()
+    try:
+        async with get_async_session().get(url) as r:
+            body = await r.text()
+    except aiohttp.ClientError as e:
+        elapsed = time.monotonic() - started
+        _incr(requests=1, errors=1, latency_ms_total=elapsed * 1000)
+        breaker.release(probe, _failed(e.status if isinstance(e, aiohttp.ClientResponseError) else None), elapsed)
+        raise
+    except asyncio.CancelledError:
+        breaker.abandon(probe)  # lost a hedge race or the client went away
+        raise
+    except BaseException:
+        breaker.release(probe, True, time.monotonic() - started)  # any other error still frees the breaker slot
+        raise
+    elapsed = time.monotonic() - started
+    _incr(requests=1, latency_ms_total=elapsed * 1000)
+    breaker.release(probe, False, elapsed)
+    latency.add(elapsed)
+    return body
+
+
+async def _aget_hedged(url: str, command: str) -> str:
+    """Async _get_hedged(); the losing call is cancelled."""
+    delay = hedge_delay()
+    if delay is None:
+        return await _aget(url, command)
+
+    primary = asyncio.ensure_future(_aget(url, command))
+    pending = {primary}
+    try:
+        done, pending = await asyncio.wait(pending, timeout=delay)
+        if done:
+            return primary.result()
+        if breaker.state != CLOSED:
+            return await primary
+        hedge = asyncio.ensure_future(_aget(url, command, block=False))
+        pending.add(hedge)
+        _incr(hedges=1)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge:
+                        _incr(hedge_wins=1)
+                    return task.result()
+        raise primary.exception()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _asend(params: dict, response_type: str) -> str:
+    url = build_url(params, response_type)
+    read_only = is_read_only(params)
+    retries = settings.ENOM_RETRIES if read_only else 0
+    get = _aget_hedged if read_only else _aget
+
+    attempt = 0
+    while True:
+        try:
+            return await get(url, _command(params))
+        except aiohttp.ClientError as e:
+            status = e.status if isinstance(e, aiohttp.ClientResponseError) else None
+            if attempt >= retries or not _failed(status):
+                raise
+        attempt += 1
+        _incr(retries=1)
+        delay = settings.ENOM_RETRY_BACKOFF * (2 ** (attempt - 1))
+        await asyncio.sleep(delay + random.uniform(0, delay / 2))
+
+
+async def astream(params: dict, response_type: str = "xml") -> AsyncIterator[bytes]:
+    """Async stream(); raises aiohttp.ClientError, or CircuitOpenError / RateLimitedError before sending."""
+    probe = await _aadmit(_command(params))
+    started = time.monotonic()
+    try:
+        async with get_async_session().get(build_url(params, response_type)) as r:
+            async for chunk in r.content.iter_any():
+                yield chunk
+    except aiohttp.ClientError as e:
+        elapsed = time.monotonic() - started
+        _incr(requests=1, errors=1, latency_ms_total=elapsed * 1000)
+        breaker.release(probe, _failed(e.status if isinstance(e, aiohttp.ClientResponseError) else None), elapsed)
+        raise
+    except (asyncio.CancelledError, GeneratorExit):
+        breaker.abandon(probe)
+        raise
+    except BaseException:
+        breaker.release(probe, True, time.monotonic() - started)  # any other error still frees the breaker slot
+        raise
+    elapsed = time.monotonic() - started
+    _incr(requests=1, latency_ms_total=elapsed * 1000)
+    breaker.release(probe, False, elapsed)
+    latency.add(elapsed)
+
+
+def metrics() -> dict:
+    """Counters for this worker plus connection-pool, breaker and rate-limiter state."""
+    with _stats_lock:
+        out = dict(_stats)
+    out["latency_ms_avg"] = round(out["latency_ms_total"] / out["requests"], 1) if out["requests"] else None
+
+    pools = []
+    session = _session if _session_pid == os.getpid() else None
+    if session is not None:
+        adapter = session.get_adapter(settings.ENOM_BASE_URL)
+        for key in adapter.poolmanager.pools.keys():
+            pool = adapter.poolmanager.pools[key]
+            pools.append({
+                "host": pool.host,
+                "maxsize": pool.pool.maxsize if pool.pool is not None else 0,
+                "idle": pool.pool.qsize() if pool.pool is not None else 0,
+                "connections_opened": pool.num_connections,
+                "requests": pool.num_requests,
+            })
+    out["pid"] = os.getpid()
+    out["pool"] = pools
+    out["async_sessions"] = len(_async_sessions)
+    out["breaker"] = breaker.snapshot()
+    out["rate_limit"] = ratelimit.snapshot()
+    p50, p95 = latency.percentile(50), latency.percentile(95)
+    out["latency_ms_p50"] = round(p50 * 1000, 1) if p50 is not None else None
+    out["latency_ms_p95"] = round(p95 * 1000, 1) if p95 is not None else None
+    delay = hedge_delay()
+    out["hedge_delay_ms"] = round(delay * 1000, 1) if delay is not None else None
+    return out
@@ -0,0 +1,291 @@
+# backend/hosting/enom_parse.py
+"""
+Parsers for Enom interface.asp responses: one pass over the body, compact
+typed records out.
+
+    check(body, "example.com")        -> CheckResult         command=check, SLD/TLD
+    check_many(body)                  -> List[CheckResult]   command=check, DomainList
+    namespinner(body, ["com", "io"])  -> List[Suggestion]    NameSpinner (xml), any TLDs
+    name_suggestions(body)            -> List[Suggestion]    GetNameSuggestions (text)
+    retail_prices(body)               -> List[RetailPrice]   PE_GetRetailPricing, TLDList
+
+NameSpinnerParser and NameSuggestionsParser take the body in chunks (feed()
+then close()) and return records as soon as they are complete, for streaming.
+ErrCount > 0 and malformed bodies raise EnomResponseError with Enom's message.
+
+Recorded payloads for `manage.py bench_enom_parse` are in hosting/enom_payloads/.
+"""
+from __future__ import annotations
+
+import xml.etree.ElementTree as ET
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+RRP_AVAILABLE = "210"
+RRP_TAKEN = "211"
+
+Body = Union[str, bytes]
+
+
+class EnomResponseError(Exception):
+    """Enom answered, but with an error or something unparseable."""
+
+
+class CheckResult(NamedTuple):
+    domain: str
+    available: bool
+    code: str
+    text: str
+
+    def as_dict(self) -> dict:
+        return self._asdict()
+
+
+class Suggestion(NamedTuple):
+    sld: str
+    tld: str
+    domain: str
+    score: float  # NameSpinner: integer relevance; GetNameSuggestions: 0-1
+    available: Optional[bool] = None  # NameSpinner only
+
+    def as_dict(self) -> dict:
+        row = {"sld": self.sld, "tld": self.tld, "domain": self.domain}
+        if self.available is not None:
+            row["available"] = self.available
+        row["score"] = self.score
+        return row
+
+
+class RetailPrice(NamedTuple):
+    tld: str
+    register_cents: int
+    renew_cents: int
+    transfer_cents: int
+
+
+def _tld_tuple(tlds: Optional[Iterable[str]]) -> Optional[Tuple[str, ...]]:
+    """Normalized TLDs in request order, without duplicates; None means every TLD."""
+    if tlds is None:
+        return None
+    if isinstance(tlds, str):
+        tlds = tlds.split(",")
+    return tuple(dict.fromkeys(t.strip().lower().lstrip(".") for t in tlds if t.strip()))
+
+
+def _int(value: Optional[str]) -> int:
+    try:
+        return int(value or "0")
+    except ValueError:
+        return 0
+
+
+# ---------- XML documents (check) ----------
+
+def _fields(body: Body) -> Dict[str, str]:
+    """Leaf elements of a flat Enom XML document, tag -> text, in one walk (first occurrence wins)."""
+    try:
+        root = ET.fromstring(body)
+    except ET.ParseError:
+        raise EnomResponseError("Failed to parse Enom XML response")
+    fields: Dict[str, str] = {}
+    for el in root.iter():
+        if len(el) == 0 and el.tag not in fields:
+            fields[el.tag] = (el.text or "").strip()
+    return fields
+
+
+def _raise_for_errors(fields: Dict[str, str], default: str) -> None:
+    if _int(fields.get("ErrCount")) > 0:
+        raise EnomResponseError(fields.get("Err1") or default)
+
+
+def check(body: Body, domain: str) -> CheckResult:
+    fields = _fields(body)
+    _raise_for_errors(fields, "Check failed")
+    code = fields.get("RRPCode", "")
+    return CheckResult(domain, code == RRP_AVAILABLE, code, fields.get("RRPText", ""))
+
+
+def check_many(body: Body) -> List[CheckResult]:
+    """Every domain Enom answered in a DomainList check, in response order."""
+    fields = _fields(body)
+    _raise_for_errors(fields, "Check failed")
+    results = []
+    for i in range(1, _int(fields.get("DomainCount")) + 1):
+        name = fields.get(f"Domain{i}", "").lower()
+        code = fields.get(f"RRPCode{i}", "")
+        if name and code:
+            results.append(CheckResult(name, code == RRP_AVAILABLE, code, fields.get(f"RRPText{i}", "")))
+    return results
+
+
+def _cents(value: Optional[str]) -> Optional[int]:
+    """'12.99' -> 1299; None if missing or not a price."""
+    try:
+        cents = Decimal(value) * 100 if value else None
+    except InvalidOperation:
+        return None
+    return int(cents) if cents is not None and cents.is_finite() and cents >= 0 else None
+
+
+def retail_prices(body: Body) -> List[RetailPrice]:
+    """Yearly prices for every TLD Enom priced (TLDn, RegisterPricen, RenewPricen, TransferPricen), in response order."""
+    fields = _fields(body)
+    _raise_for_errors(fields, "PE_GetRetailPricing failed")
+    prices = []
+    for i in range(1, _int(fields.get("TLDCount")) + 1):
+        tld = fields.get(f"TLD{i}", "").lower().lstrip(".")
+        cents = [_cents(fields.get(f"{kind}Price{i}")) for kind in ("Register", "Renew", "Transfer")]
+        if tld and None not in cents:
+            prices.append(RetailPrice(tld, *cents))
+    return prices
+
+
+# ---------- NameSpinner (xml) ----------
+
+class NameSpinnerParser:
+    """Incremental NameSpinner parser; suggestions are limited to `tlds` if given."""
+
+    def __init__(self, tlds: Optional[Iterable[str]] = None):
+        self._wanted = _tld_tuple(tlds)
+        self._parser = ET.XMLPullParser(events=("end",))
+        self._err_count = 0
+        self._err: Optional[str] = None
+
+    def feed(self, chunk: Body) -> List[Suggestion]:
+        try:
+            self._parser.feed(chunk)
+        except ET.ParseError:
+            raise EnomResponseError("Failed to parse Enom XML response")
+        return self._drain()
+
+    def close(self) -> List[Suggestion]:
+        try:
+            self._parser.close()
+        except ET.ParseError:
+            raise EnomResponseError("Failed to parse Enom XML response")
+        rows = self._drain()
+        if self._err_count > 0:
+            raise EnomResponseError(self._err or "NameSpinner failed")
+        return rows
+
+    def _drain(self) -> List[Suggestion]:
+        rows: List[Suggestion] = []
+        for _, el in self._parser.read_events():
+            tag = el.tag
+            if tag == "domain":
+                _domain_rows(el.attrib, self._wanted, rows)
+                el.clear()  # keep memory flat for large MaxResults
+            elif tag == "ErrCount":
+                self._err_count = _int(el.text)
+            elif tag == "Err1" and self._err is None:
+                self._err = el.text
+        return rows
+
+
+def _domain_rows(attrs: Dict[str, str], wanted: Optional[Tuple[str, ...]], rows: List[Suggestion]) -> None:
+    """<domain name="x" com="y" comscore="912" ...> -> one Suggestion per TLD attribute."""
+    name = attrs.get("name", "").lower()
+    make = Suggestion._make
+    if wanted is None:
+        wanted = tuple(k for k in attrs if k != "name" and not k.endswith("score"))
+    for tld in wanted:
+        flag = attrs.get(tld)
+        if flag is not None:
+            rows.append(make((name, tld, f"{name}.{tld}", _int(attrs.get(tld + "score")), flag.lower() == "y")))
+
+
+def namespinner(body: Body, tlds: Optional[Iterable[str]] = None) -> List[Suggestion]:
+    """All suggestions, best score first (a complete body: no pull-parser events needed)."""
+    try:
+        root = ET.fromstring(body)
+    except ET.ParseError:
+        raise EnomResponseError("Failed to parse Enom XML response")
+    if _int(root.findtext("ErrCount")) > 0:
+        raise EnomResponseError(root.findtext(".//Err1") or "NameSpinner failed")
+    wanted = _tld_tuple(tlds)
+    rows: List[Suggestion] = []
+    for el in root.iter("domain"):
+        _domain_rows(el.attrib, wanted, rows)
+    rows.sort(key=lambda s: s.score, reverse=True)
+    return rows
+
+
+# ---------- GetNameSuggestions (text) ----------
+
+class NameSuggestionsParser:
+    """
+    Incremental GetNameSuggestions parser for `SldN=`, `TldN=`, `ScoreN=`
+    lines; a Suggestion is returned once all three lines of its N were seen.
+    """
+
+    _FIELDS = {b"Sld": 0, b"Tld": 1, b"Score": 2}
+
+    def __init__(self):
+        self._tail = b""
+        self._pending: Dict[bytes, List[Optional[str]]] = {}
+        self._err_count = 0
+        self._err: Optional[str] = None
+
+    def feed(self, chunk: Body) -> List[Suggestion]:
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        *lines, self._tail = (self._tail + chunk).split(b"\n")
+        return self._lines(lines)
+
+    def close(self) -> List[Suggestion]:
+        """The last line, then suggestions that never got a Score (scored 0)."""
+        rows = self._lines([self._tail])
+        self._tail = b""
+        if self._err_count > 0:
+            raise EnomResponseError(self._err or "GetNameSuggestions failed")
+        for i in sorted(self._pending, key=int):
+            sld, tld, score = self._pending[i]
+            if sld is not None and tld is not None:
+                rows.append(_suggestion(sld, tld, score))
+        self._pending.clear()
+        return rows
+
+    def _lines(self, lines: List[bytes]) -> List[Suggestion]:
+        rows: List[Suggestion] = []
+        slots, pending = self._FIELDS, self._pending
+        for line in lines:
+            key, sep, value = line.partition(b"=")
+            if not sep:
+                continue
+            key = key.strip()
+            name = key.rstrip(b"0123456789")
+            slot = slots.get(name)
+            if slot is None:
+                if key == b"ErrCount":
+                    self._err_count = _int(value.strip().decode("ascii", "replace"))
+                elif key == b"Err1":
+                    self._err = value.strip().decode("utf-8", "replace")
+                continue
+            index = key[len(name):]
+            if not index:
+                continue
+            fields = pending.get(index)
+            if fields is None:
+                fields = pending[index] = [None, None, None]
+            fields[slot] = value.strip().decode("utf-8", "replace")
+            if None not in fields:
+                del pending[index]
+                rows.append(_suggestion(*fields))
+        return rows
+
+
+def _suggestion(sld: str, tld: Optional[str], score: Optional[str]) -> Suggestion:
+    sld = sld.lower()
+    tld = (tld or "").lower().lstrip(".")
+    try:
+        value = float(score or "0")
+    except ValueError:
+        value = 0.0
+    return Suggestion._make((sld, tld, f"{sld}.{tld}", value, None))
+
+
+def name_suggestions(body: Body) -> List[Suggestion]:
+    """All suggestions, in Enom's order."""
+    parser = NameSuggestionsParser()
+    return parser.feed(body) + parser.close()
@@ -0,0 +1,244 @@
+# backend/hosting/enom_sim.py
+"""
+Local Enom simulator speaking interface.asp, for load tests and benchmarks.
+
+Supports `check` (SLD/TLD or DomainList), `NameSpinner`,
+`GetNameSuggestions` and `PE_GetRetailPricing` (TLDList), each with
+responsetype=xml or text. Answers are
+deterministic per name (about a third of domains are available), so cached
+and uncached runs see the same data.
+
+Latency is drawn per request from a distribution spec:
+
+    fixed:0.2               always 200 ms
+    uniform:0.05:0.4        between 50 and 400 ms
+    lognormal:0.15:0.6      median 150 ms, sigma 0.6 (long right tail)
+
+plus optional faults: HTTP 503s, Enom-level errors (ErrCount=1) and hangs
+(no reply until the client gives up).
+
+    sim = Simulator(SimConfig(latency="lognormal:0.15:0.6", http_error_rate=0.01))
+    base_url = sim.start_in_thread()   # or: asyncio.run(sim.serve_forever(host, port))
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import random
+import threading
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+from xml.sax.saxutils import escape
+
+SPIN_SUFFIXES = ("hq", "app", "online", "hub", "now", "labs", "pro", "site", "cloud", "zone", "works", "studio")
+SPIN_PREFIXES = ("get", "my", "try", "go", "the", "hey", "use", "join")
+SPIN_TLDS = ("com", "net", "tv", "cc")
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Distribution spec -> sampler returning seconds (see module docstring)."""
+    kind, _, args = spec.partition(":")
+    try:
+        values = [float(v) for v in args.split(":")] if args else []
+        if kind == "fixed" and len(values) == 1:
+            return lambda rnd: values[0]
+        if kind == "uniform" and len(values) == 2:
+            return lambda rnd: rnd.uniform(values[0], values[1])
+        if kind == "lognormal" and len(values) == 2:
+            mu = math.log(values[0])
+            return lambda rnd: rnd.lognormvariate(mu, values[1])
+    except ValueError:
+        pass
+    raise ValueError(f"Bad latency spec {spec!r}: use fixed:S, uniform:MIN:MAX or lognormal:MEDIAN:SIGMA")
+
+
+def is_available(domain: str) -> bool:
+    return zlib.crc32(domain.lower().encode()) % 3 == 0
+
+
+def _score(name: str, base: int) -> int:
+    return base - zlib.crc32(name.encode()) % 100
+
+
+@dataclass
+class SimConfig:
+    latency: str = "fixed:0.1"
+    http_error_rate: float = 0.0  # HTTP 503
+    enom_error_rate: float = 0.0  # 200 with ErrCount=1
+    hang_rate: float = 0.0  # never answers (until hang_seconds)
+    hang_seconds: float = 60.0
+    seed: int = 0
+
+
+class Simulator:
+    def __init__(self, config: SimConfig):
+        self.config = config
+        self.sample_latency = parse_latency(config.latency)
+        self.rnd = random.Random(config.seed or None)
+        self.stats: Counter = Counter()
+
+    # ---------- Protocol ----------
+
+    def respond(self, query: Dict[str, str]) -> Tuple[int, str, str]:
+        """(status, content type, body) for one interface.asp query (lower-cased keys)."""
+        cfg = self.config
+        command = query.get("command", "").lower()
+        text = query.get("responsetype", "xml").lower() == "text"
+        self.stats[command or "?"] += 1
+
+        roll = self.rnd.random()
+        if roll < cfg.http_error_rate:
+            self.stats["http_errors"] += 1
+            return 503, "text/plain", "Service Unavailable"
+        if roll < cfg.http_error_rate + cfg.enom_error_rate:
+            self.stats["enom_errors"] += 1
+            return self._render(text, [("ErrCount", "1"), ("Err1", "Simulated Enom error")], "errors")
+
+        if command == "check":
+            pairs = self._check(query)
+        elif command == "namespinner":
+            return self._namespinner(query, text)
+        elif command == "getnamesuggestions":
+            pairs = self._name_suggestions(query)
+        elif command == "pe_getretailpricing":
+            pairs = self._retail_pricing(query)
+        else:
+            return self._render(text, [("ErrCount", "1"), ("Err1", f"Unknown command {command!r}")], "errors")
+        return self._render(text, pairs + [("ErrCount", "0")])
+
+    def _render(self, text: bool, pairs: List[Tuple[str, str]], error_block: str = "") -> Tuple[int, str, str]:
+        if text:
+            return 200, "text/plain", "\r\n".join(f"{k}={v}" for k, v in pairs) + "\r\n"
+        parts = []
+        for k, v in pairs:
+            if error_block and k.startswith("Err") and k != "ErrCount":
+                parts.append(f"<errors><{k}>{escape(v)}</{k}></errors>")
+            else:
+                parts.append(f"<{k}>{escape(v)}</{k}>")
+        return 200, "text/xml", f'<?xml version="1.0"?><interface-response>{"".join(parts)}</interface-response>'
+
+    def _check(self, query: Dict[str, str]) -> List[Tuple[str, str]]:
+        if "domainlist" in query:
+            names = [n.strip().lower() for n in query["domainlist"].split(",") if n.strip()]
+            pairs = []
+            for i, name in enumerate(names, 1):
+                ok = is_available(name)
+                pairs += [
+                    (f"Domain{i}", name),
+                    (f"RRPCode{i}", "210" if ok else "211"),
+                    (f"RRPText{i}", "Domain available" if ok else "Domain not available"),
+                ]
+            return pairs + [("DomainCount", str(len(names)))]
+        name = f"{query.get('sld', '')}.{query.get('tld', '')}".lower()
+        ok = is_available(name)
+        return [("DomainName", name), ("RRPCode", "210" if ok else "211"),
+                ("RRPText", "Domain available" if ok else "Domain not available")]
+
+    def _spins(self, sld: str, count: int) -> List[str]:
+        names = [f"{sld}{suffix}" for suffix in SPIN_SUFFIXES]
+        names += [f"{prefix}{sld}" for prefix in SPIN_PREFIXES]
+        names += [f"{prefix}{sld}{suffix}" for prefix in SPIN_PREFIXES for suffix in SPIN_SUFFIXES]
+        return names[:count]
+
+    def _namespinner(self, query: Dict[str, str], text: bool) -> Tuple[int, str, str]:
+        sld = query.get("sld", "example").lower()
+        names = self._spins(sld, int(query.get("maxresults", "20") or 20))
+        tlds = [t.strip() for t in query.get("tldlist", "").lower().split(",") if t.strip()] or SPIN_TLDS
+        if text:
+            pairs = [("DomainCount", str(len(names)))]
+            for i, name in enumerate(names, 1):
+                pairs.append((f"Domain{i}", name))
+                for tld in tlds:
+                    pairs += [(f"{tld.capitalize()}{i}", "y" if is_available(f"{name}.{tld}") else "n"),
+                              (f"{tld.capitalize()}Score{i}", str(_score(f"{name}.{tld}", 900)))]
+            return self._render(True, pairs + [("ErrCount", "0")])
+        rows = []
+        for name in names:
+            attrs = " ".join(
+                f'{tld}="{"y" if is_available(f"{name}.{tld}") else "n"}" {tld}score="{_score(f"{name}.{tld}", 900)}"'
+                for tld in tlds
+            )
+            rows.append(f'<domain name="{escape(name)}" {attrs}/>')
+        body = (
+            '<?xml version="1.0"?><interface-response><namespin>'
+            f'<spincount>{len(names)}</spincount><domains>{"".join(rows)}</domains></namespin>'
+            "<ErrCount>0</ErrCount></interface-response>"
+        )
+        return 200, "text/xml", body
+
+    def _name_suggestions(self, query: Dict[str, str]) -> List[Tuple[str, str]]:
+        term = query.get("searchterm", "example").lower()
+        tlds = [t.strip().lstrip(".") for t in query.get("tldlist", "com").split(",") if t.strip()] or ["com"]
+        limit = int(query.get("maxresult", "40") or 40)
+        pairs, i = [], 0
+        for name in [term] + self._spins(term, limit):
+            for tld in tlds:
+                if i >= limit:
+                    break
+                i += 1
+                score = _score(f"{name}.{tld}", 1000) / 1000
+                pairs += [(f"Sld{i}", name), (f"Tld{i}", tld), (f"Score{i}", f"{score:.3f}")]
+        return [("SuggestionCount", str(i))] + pairs
+
+    def _retail_pricing(self, query: Dict[str, str]) -> List[Tuple[str, str]]:
+        tlds = [t.strip().lstrip(".") for t in query.get("tldlist", "com").lower().split(",") if t.strip()]
+        pairs = []
+        for i, tld in enumerate(tlds, 1):
+            register = 2.99 + zlib.crc32(tld.encode()) % 60  # a stable x.99 price per TLD
+            pairs += [(f"TLD{i}", tld), (f"RegisterPrice{i}", f"{register:.2f}"),
+                      (f"RenewPrice{i}", f"{register + 2:.2f}"), (f"TransferPrice{i}", f"{register:.2f}")]
+        return [("TLDCount", str(len(tlds)))] + pairs
+
+    # ---------- HTTP ----------
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:  # keep-alive
+                head = await reader.readuntil(b"\r\n\r\n")
+                target = head.split(b" ", 2)[1].decode("latin-1")
+                query = {k.lower(): v[0] for k, v in parse_qs(urlsplit(target).query).items()}
+
+                if self.rnd.random() < self.config.hang_rate:
+                    self.stats["hangs"] += 1
+                    await asyncio.sleep(self.config.hang_seconds)
+                    break
+                await asyncio.sleep(max(0.0, self.sample_latency(self.rnd)))
+
+                status, content_type, body = self.respond(query)
+                data = body.encode()
+                reason = "OK" if status == 200 else "Service Unavailable"
+                writer.write(
+                    f"HTTP/1.1 {status} {reason}\r\nContent-Type: {content_type}\r\n"
+                    f"Content-Length: {len(data)}\r\n\r\n".encode() + data
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError, IndexError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve_forever(self, host: str = "127.0.0.1", port: int = 8081, ready: Optional[Callable[[int], None]] = None):
+        server = await asyncio.start_server(self.handle, host, port, backlog=1024)
+        if ready is not None:
+            ready(server.sockets[0].getsockname()[1])
+        async with server:
+            await server.serve_forever()
+
+    def start_in_thread(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Serve from a daemon thread; returns the base URL (an ephemeral port by default)."""
+        bound = threading.Event()
+        found: List[int] = []
+
+        def ready(p: int) -> None:
+            found.append(p)
+            bound.set()
+
+        threading.Thread(
+            target=lambda: asyncio.run(self.serve_forever(host, port, ready)), name="enom-sim", daemon=True
+        ).start()
+        if not bound.wait(5):
+            raise RuntimeError("Enom simulator did not start")
+        return f"http://{host}:{found[0]}"
@@ -0,0 +1,12 @@
+# backend/hosting/management/bench.py
+"""Helpers shared by the benchmark and load-test commands."""
+from __future__ import annotations
+
+from typing import Sequence
+
+
+def percentile(sorted_values: Sequence[float], p: float) -> float:
+    """p in 0-1 of already sorted values; 0.0 when there are none."""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p))]
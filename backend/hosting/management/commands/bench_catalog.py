@@ -0,0 +1,61 @@
+# backend/hosting/management/commands/bench_catalog.py
+from __future__ import annotations
+
+import time
+from typing import Callable
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from hosting import catalog
+from hosting.models import HostingPlan
+from hosting.serializers import HostingPlanSerializer, HostingPlanWithSpecsSerializer
+
+
+class Command(BaseCommand):
+    help = "Benchmark the plan endpoints: DRF serializer path vs. pre-encoded catalog snapshot."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=2000, help="Calls per case (default: 2000).")
+        parser.add_argument("--category", default="", help="Limit to one category (default: all plans).")
+
+    def handle(self, *args, **opts):
+        n = opts["iterations"]
+        category = opts["category"]
+        known = [value for value, _ in HostingPlan.CATEGORY_CHOICES]
+        if category and category not in known:
+            raise CommandError(f"Unknown category {category!r}; expected one of {', '.join(known)}")
+
+        qs = HostingPlan.objects.order_by("id")
+        if category:
+            qs = qs.filter(category=category)
+        plans = list(qs.prefetch_related("specs"))
+        renderer = JSONRenderer()
+        catalog.get_snapshot()  # warm
+
+        cases: list[tuple[str, Callable[[], bytes], int]] = [
+            ("serializer: query + serialize + render (old path)",
+             lambda: renderer.render(HostingPlanSerializer(qs.all(), many=True).data), n // 10 or 1),
+            ("serializer: serialize + render (rows preloaded)",
+             lambda: renderer.render(HostingPlanSerializer(plans, many=True).data), n),
+            ("serializer: specs serialize + render (rows preloaded)",
+             lambda: renderer.render(HostingPlanWithSpecsSerializer(plans, many=True).data), n),
+            ("snapshot: compile from database",
+             lambda: catalog.CatalogSnapshot("bench", catalog.load_plans()).plans_json.get(category, b"[]"),
+             n // 10 or 1),
+            ("snapshot: plans_json (hot path)", lambda: catalog.plans_json(category), n),
+            ("snapshot: specs_json (hot path)", lambda: catalog.specs_json(category), n),
+        ]
+
+        self.stdout.write(f"{len(plans)} plans, {n} iterations\n")
+        for label, fn, iterations in cases:
+            body = fn()
+            start = time.perf_counter()
+            for _ in range(iterations):
+                fn()
+            per_call = (time.perf_counter() - start) / iterations * 1e6
+            self.stdout.write(f"{label:<55} {per_call:>10.1f} µs/call  {len(body):>7} bytes")
+
+        same = renderer.render(HostingPlanSerializer(plans, many=True).data) == catalog.plans_json(category)
+        style = self.style.SUCCESS if same else self.style.WARNING
+        self.stdout.write(style(f"Snapshot body identical to serializer output: {same}"))
@@ -0,0 +1,178 @@
+# backend/hosting/management/commands/bench_domain.py
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, Client, override_settings
+
+from hosting import domains, enom, taken
+from hosting.management.bench import percentile
+
+from .enom_simulator import add_simulator_arguments, simulator_from_options
+
+BULK_SIZE = 20
+
+
+def _route_requests(route: str, i: int, repeat: bool) -> Tuple[str, str, dict]:
+    """(method, path, data) for request number i of a route."""
+    name = "bench" if repeat else f"bench{i}"
+    if route == "check":
+        return "get", "/api/domain/check/", {"q": f"{name}.com"}
+    if route == "suggest":
+        return "get", "/api/domain/suggest/", {"q": f"{name}.com"}
+    if route == "suggest2":
+        return "get", "/api/domain/suggest2/", {"q": name}
+    if route == "suggestions":
+        return "get", "/api/domain/suggestions/", {"q": name}
+    return "post", "/api/domain/check/bulk/", {"domains": [f"{name}-{n}.com" for n in range(BULK_SIZE)]}
+
+
+ROUTES = ("check", "suggest", "suggest2", "suggestions", "bulk")
+ASYNC_ROUTES = ("check", "suggest", "suggest2", "suggestions")  # switched by DOMAIN_VIEWS_ASYNC; bulk is always sync
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the domain endpoints in-process against the local Enom simulator: "
+        "throughput and p50/p95/p99 per route. Run before and after changes to the domain path. "
+        "Uses its own in-memory cache, scratch known-taken index and rate-limit state, and no search log, "
+        "so the simulator's answers never reach the deployment's shared state."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--routes", default=",".join(ROUTES), help=f"Comma list of {', '.join(ROUTES)}.")
+        parser.add_argument("--concurrency", type=int, default=16, help="Client threads (default: 16).")
+        parser.add_argument("--requests", type=int, default=400, help="Requests per route (default: 400).")
+        parser.add_argument("--repeat", action="store_true",
+                            help="Ask for the same name every time (results cache / coalescing path).")
+        parser.add_argument("--keep-cache", action="store_true",
+                            help="Do not clear the (benchmark's own) cache before each route.")
+        add_simulator_arguments(parser)
+
+    def handle(self, *args, **opts):
+        routes = [r.strip() for r in opts["routes"].split(",") if r.strip()]
+        unknown = set(routes) - set(ROUTES)
+        if unknown:
+            raise CommandError(f"Unknown routes: {', '.join(sorted(unknown))}")
+        with tempfile.TemporaryDirectory(prefix="bench-domain-") as scratch, override_settings(
+            CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+                                "LOCATION": "bench-domain"}},
+            TAKEN_INDEX_PATH=os.path.join(scratch, "taken") if settings.TAKEN_INDEX_PATH else "",
+            ENOM_RATE_STATE_PATH=os.path.join(scratch, "ratelimit"),
+            SEARCH_LOG=False,
+        ):
+            self._bench(routes, opts)
+
+    def _bench(self, routes: List[str], opts) -> None:
+        sim = simulator_from_options(opts)
+        settings.ENOM_BASE_URL = sim.start_in_thread()
+        if "testserver" not in settings.ALLOWED_HOSTS:
+            settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, "testserver"]
+
+        self.stdout.write(
+            f"Enom simulator {settings.ENOM_BASE_URL} (latency {opts['latency']}), "
+            f"{'async' if settings.DOMAIN_VIEWS_ASYNC else 'sync'} views, "
+            f"concurrency {opts['concurrency']}, {opts['requests']} requests per route"
+            f"{', repeated name' if opts['repeat'] else ''}\n"
+        )
+        self.stdout.write(f"{'route':<11} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  status")
+        for route in routes:
+            if not opts["keep_cache"]:
+                cache.clear()
+            if settings.DOMAIN_VIEWS_ASYNC and route in ASYNC_ROUTES:
+                latencies, statuses, elapsed = asyncio.run(self._arun(route, opts))
+            else:
+                latencies, statuses, elapsed = self._run(route, opts)
+            latencies.sort()
+            self.stdout.write(
+                f"{route:<11} {len(latencies) / elapsed:>8.1f} "
+                + " ".join(f"{percentile(latencies, p) * 1000:>8.1f}" for p in (0.50, 0.95, 0.99))
+                + "  " + ", ".join(f"{k}: {v}" for k, v in sorted(statuses.items(), key=str))
+            )
+
+        self.stdout.write("\nsimulator   " + ", ".join(f"{k}: {v}" for k, v in sorted(sim.stats.items())))
+        m = enom.metrics()
+        self.stdout.write(
+            "enom client " + ", ".join(f"{k}: {m[k]}" for k in ("requests", "errors", "retries", "coalesced_local"))
+        )
+        self.stdout.write("cache       " + ", ".join(f"{k}: {v}" for k, v in domains.cache_stats().items()))
+        limiter = m["rate_limit"]
+        if limiter["enabled"]:
+            waits = ", ".join(
+                f"{name} {c['acquired']} ok/{c['rejected']} rejected, wait p95 {c['wait_ms_p95']} ms"
+                for name, c in limiter["classes"].items() if c["acquired"] or c["rejected"]
+            )
+            self.stdout.write(f"rate limit  {waits}")
+        if settings.TAKEN_INDEX_PATH:
+            self.stdout.write("taken index " + ", ".join(f"{k}: {v}" for k, v in taken.stats().items()))
+
+    def _run(self, route: str, opts) -> Tuple[List[float], Counter, float]:
+        counter = iter(range(opts["requests"]))
+        counter_lock = threading.Lock()
+        latencies: List[float] = []
+        statuses: Counter = Counter()
+
+        def worker():
+            client = Client()
+            calls: Dict[str, Callable] = {
+                "get": client.get,
+                "post": lambda path, data: client.post(path, json.dumps(data), content_type="application/json"),
+            }
+            while True:
+                with counter_lock:
+                    i = next(counter, None)
+                if i is None:
+                    return
+                method, path, data = _route_requests(route, i, opts["repeat"])
+                started = time.perf_counter()
+                response = calls[method](path, data)
+                if response.streaming:
+                    b"".join(response.streaming_content)
+                took = time.perf_counter() - started
+                with counter_lock:
+                    latencies.append(took)
+                    statuses[response.status_code] += 1
+
+        threads = [threading.Thread(target=worker) for _ in range(opts["concurrency"])]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return latencies, statuses, time.perf_counter() - started
+
+    async def _arun(self, route: str, opts) -> Tuple[List[float], Counter, float]:
+        # Async views need one long-lived event loop (as under uvicorn), or every
+        # request would get a fresh loop and a fresh Enom connection pool.
+        counter = iter(range(opts["requests"]))
+        latencies: List[float] = []
+        statuses: Counter = Counter()
+        client = AsyncClient()
+
+        async def worker():
+            for i in counter:
+                method, path, data = _route_requests(route, i, opts["repeat"])
+                started = time.perf_counter()
+                if method == "get":
+                    response = await client.get(path, data)
+                else:
+                    response = await client.post(path, json.dumps(data), content_type="application/json")
+                latencies.append(time.perf_counter() - started)
+                statuses[response.status_code] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(opts["concurrency"])))
+        elapsed = time.perf_counter() - started
+        for session in list(enom._async_sessions.values()):
+            await session.close()
+        return latencies, statuses, elapsed
@@ -0,0 +1,125 @@
+# backend/hosting/management/commands/bench_enom_parse.py
+from __future__ import annotations
+
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from django.core.management.base import BaseCommand
+
+from hosting import enom_parse
+
+PAYLOADS = Path(enom_parse.__file__).resolve().parent / "enom_payloads"
+CHUNK = 4096
+
+
+# ---------- Previous implementations, kept as baselines ----------
+
+def legacy_check_many(body: str) -> list:
+    root = ET.fromstring(body)
+    results = []
+    for i in range(1, int(root.findtext("DomainCount") or "0") + 1):
+        name = (root.findtext(f"Domain{i}") or "").strip().lower()
+        code = (root.findtext(f"RRPCode{i}") or "").strip()
+        if name and code:
+            results.append({"domain": name, "available": code == "210", "code": code,
+                            "text": (root.findtext(f"RRPText{i}") or "").strip()})
+    return results
+
+
+def legacy_namespinner(body: str, tld_list: str) -> list:
+    root = ET.fromstring(body)
+    suggestions = []
+    for d in root.findall(".//namespin/domains/domain"):
+        name = (d.get("name") or "").lower()
+        for k in ["com", "net", "tv", "cc"]:
+            if k not in tld_list.replace(" ", "").split(","):
+                continue
+            suggestions.append({"sld": name, "tld": k, "domain": f"{name}.{k}",
+                                "available": (d.get(k) or "").lower() == "y", "score": int(d.get(f"{k}score") or "0")})
+    suggestions.sort(key=lambda x: x["score"], reverse=True)
+    return suggestions
+
+
+def legacy_name_suggestions(body: str) -> list:
+    pairs = {}
+    for line in body.splitlines():
+        if "=" in line:
+            k, v = line.split("=", 1)
+            pairs[k.strip()] = v.strip()
+
+    def collect(prefix):
+        return {int(k[len(prefix):]): v for k, v in pairs.items() if k.startswith(prefix) and k[len(prefix):].isdigit()}
+
+    slds, tlds, scores = collect("Sld"), collect("Tld"), collect("Score")
+    return [{"sld": slds[i].lower(), "tld": tlds[i].lower(), "score": float(scores.get(i, "0") or "0")}
+            for i in sorted(set(slds) & set(tlds))]
+
+
+def _chunked(parser_factory: Callable, body: bytes) -> Callable[[], list]:
+    def run():
+        parser = parser_factory()
+        rows = []
+        for i in range(0, len(body), CHUNK):
+            rows += parser.feed(body[i:i + CHUNK])
+        return rows + parser.close()
+    return run
+
+
+class Command(BaseCommand):
+    help = "Benchmark the Enom response parsers (hosting/enom_parse.py) on the recorded payloads."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=500, help="Calls per case (default: 500).")
+
+    def handle(self, *args, **opts):
+        n = opts["iterations"]
+        cases: List[Tuple[str, Callable[[], list]]] = []
+        for path in sorted(PAYLOADS.iterdir()):
+            body = path.read_text()
+            raw = body.encode()
+            name = path.name
+            if name.startswith("check_domainlist"):
+                cases += [
+                    (f"{name}: legacy findtext", lambda b=body: legacy_check_many(b)),
+                    (f"{name}: enom_parse.check_many", lambda b=raw: enom_parse.check_many(b)),
+                ]
+            elif name.startswith("check"):
+                cases.append((f"{name}: enom_parse.check", lambda b=raw: [enom_parse.check(b, "example.com")]))
+            elif name.startswith("namespinner"):
+                tlds = "com,net,tv,cc"  # all the legacy parser knew
+                cases += [
+                    (f"{name}: legacy findall", lambda b=body: legacy_namespinner(b, tlds)),
+                    (f"{name}: enom_parse.namespinner", lambda b=raw: enom_parse.namespinner(b, tlds)),
+                    (f"{name}: enom_parse.namespinner, every TLD", lambda b=raw: enom_parse.namespinner(b)),
+                    (f"{name}: NameSpinnerParser, {CHUNK}B chunks",
+                     _chunked(lambda: enom_parse.NameSpinnerParser(tlds), raw)),
+                ]
+            elif name.startswith("getnamesuggestions"):
+                cases += [
+                    (f"{name}: legacy pairs + collect()", lambda b=body: legacy_name_suggestions(b)),
+                    (f"{name}: enom_parse.name_suggestions", lambda b=raw: enom_parse.name_suggestions(b)),
+                    (f"{name}: NameSuggestionsParser, {CHUNK}B chunks",
+                     _chunked(enom_parse.NameSuggestionsParser, raw)),
+                ]
+
+        self.stdout.write(f"{n} iterations per case\n")
+        self.stdout.write(f"{'case':<72} {'µs/call':>10} {'rows':>6} {'peak KiB':>9}")
+        for label, fn in cases:
+            rows = fn()
+            tracemalloc.start()
+            fn()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            start = time.perf_counter()
+            for _ in range(n):
+                fn()
+            per_call = (time.perf_counter() - start) / n * 1e6
+            self.stdout.write(f"{label:<72} {per_call:>10.1f} {len(rows):>6} {peak / 1024:>9.1f}")
+
+        try:
+            enom_parse.namespinner((PAYLOADS / "error.xml").read_bytes())
+        except enom_parse.EnomResponseError as e:
+            self.stdout.write(self.style.SUCCESS(f"error.xml raises EnomResponseError: {e}"))
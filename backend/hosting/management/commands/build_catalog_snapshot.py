@@ -0,0 +1,28 @@
+# backend/hosting/management/commands/build_catalog_snapshot.py
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from hosting import snapshots
+
+
+class Command(BaseCommand):
+    help = "Render the plan catalog to versioned static JSON and atomically switch 'current' to it (for Nginx)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--root",
+            default=settings.CATALOG_SNAPSHOT_ROOT,
+            help="Output directory (default: settings.CATALOG_SNAPSHOT_ROOT).",
+        )
+        parser.add_argument(
+            "--keep",
+            type=int,
+            default=settings.CATALOG_SNAPSHOT_KEEP,
+            help="Number of versions to keep on disk, including the current one.",
+        )
+
+    def handle(self, *args, **opts):
+        if not opts["root"]:
+            raise CommandError("No output directory: pass --root or set CATALOG_SNAPSHOT_ROOT.")
+        path = snapshots.build(opts["root"], keep=opts["keep"])
+        self.stdout.write(self.style.SUCCESS(f"Catalog snapshot ready: {path}"))
@@ -0,0 +1,51 @@
+# backend/hosting/management/commands/build_suggest_index.py
+import json
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from hosting import suggest
+
+
+class Command(BaseCommand):
+    help = (
+        "Compile a word list into the local suggestion index (hosting/suggest.py). "
+        "Words file: one word per line, most common first, optionally 'word: related1 related2'."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("words", help="Word list file.")
+        parser.add_argument("--out", default=settings.SUGGEST_INDEX_PATH,
+                            help="Output path (default: settings.SUGGEST_INDEX_PATH).")
+        parser.add_argument("--no-builtin", action="store_true",
+                            help="Do not include the built-in vocabulary and related words.")
+
+    def handle(self, *args, **opts):
+        if not opts["out"]:
+            raise CommandError("No output path: pass --out or set SUGGEST_INDEX_PATH.")
+        words, related = [], {} if opts["no_builtin"] else dict(suggest.RELATED)
+        try:
+            with open(opts["words"], encoding="utf-8") as fh:
+                for line in fh:
+                    word, _, rest = line.partition(":")
+                    word = word.strip().lower()
+                    if not word or word.startswith("#"):
+                        continue
+                    words.append(word)
+                    if rest.strip():
+                        related[word] = rest.lower().split()
+        except OSError as e:
+            raise CommandError(str(e))
+        if not opts["no_builtin"]:
+            words += suggest.WORDS  # after the file's words, so the file's ranking wins
+
+        index = suggest.WordIndex.build(words, related)
+        out_dir = os.path.dirname(os.path.abspath(opts["out"]))
+        with tempfile.NamedTemporaryFile("w", dir=out_dir, suffix=".tmp", delete=False, encoding="utf-8") as tmp:
+            json.dump(index.as_dict(), tmp, separators=(",", ":"))
+        os.replace(tmp.name, opts["out"])  # atomic: running workers never see a half-written file
+        self.stdout.write(self.style.SUCCESS(
+            f"Suggest index ready: {opts['out']} ({len(index.costs)} words, {len(index.related)} related entries)"
+        ))
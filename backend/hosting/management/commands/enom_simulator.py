@@ -0,0 +1,50 @@
+# backend/hosting/management/commands/enom_simulator.py
+import asyncio
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hosting.enom_sim import SimConfig, Simulator, parse_latency
+
+
+def add_simulator_arguments(parser) -> None:
+    """Options shared with bench_domain."""
+    parser.add_argument("--latency", default="fixed:0.1",
+                        help="fixed:S, uniform:MIN:MAX or lognormal:MEDIAN:SIGMA (seconds, default: fixed:0.1).")
+    parser.add_argument("--http-error-rate", type=float, default=0.0, help="Share of HTTP 503 replies.")
+    parser.add_argument("--enom-error-rate", type=float, default=0.0, help="Share of ErrCount=1 replies.")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="Share of requests never answered.")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed (default: random).")
+
+
+def simulator_from_options(opts) -> Simulator:
+    try:
+        parse_latency(opts["latency"])
+    except ValueError as e:
+        raise CommandError(str(e))
+    return Simulator(SimConfig(
+        latency=opts["latency"],
+        http_error_rate=opts["http_error_rate"],
+        enom_error_rate=opts["enom_error_rate"],
+        hang_rate=opts["hang_rate"],
+        seed=opts["seed"],
+    ))
+
+
+class Command(BaseCommand):
+    help = "Run the local Enom simulator (interface.asp). Point ENOM_BASE_URL at it for load tests."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8081)
+        add_simulator_arguments(parser)
+
+    def handle(self, *args, **opts):
+        sim = simulator_from_options(opts)
+
+        def ready(port):
+            self.stdout.write(f"Enom simulator on http://{opts['host']}:{port} (latency {opts['latency']})")
+
+        try:
+            asyncio.run(sim.serve_forever(opts["host"], opts["port"], ready))
+        except KeyboardInterrupt:
+            self.stdout.write(", ".join(f"{k}: {v}" for k, v in sorted(sim.stats.items())))
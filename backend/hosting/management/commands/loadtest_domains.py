@@ -0,0 +1,89 @@
+# backend/hosting/management/commands/loadtest_domains.py
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import Counter
+from urllib.parse import urlencode, urlsplit
+
+from django.core.management.base import BaseCommand, CommandError
+
+from hosting.management.bench import percentile
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test a running server's domain check endpoint with many concurrent keep-alive clients. "
+        "Compare e.g. gunicorn (sync views) with uvicorn + DOMAIN_VIEWS_ASYNC=True, "
+        "both with ENOM_BASE_URL pointing at `manage.py enom_simulator`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000/api/domain/check/")
+        parser.add_argument("--concurrency", type=int, default=200)
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--repeat", action="store_true",
+                            help="Query the same domain every time (exercises the results cache).")
+
+    def handle(self, *args, **opts):
+        url = urlsplit(opts["url"])
+        if url.scheme != "http":
+            raise CommandError("Only plain http:// targets are supported.")
+        latencies, statuses, elapsed = asyncio.run(self._run(url, opts))
+        latencies.sort()
+        total = len(latencies)
+        self.stdout.write(f"{total} requests, concurrency {opts['concurrency']}, {elapsed:.2f}s")
+        self.stdout.write(f"throughput  {total / elapsed:>8.1f} req/s")
+        for label, p in (("p50", 0.50), ("p95", 0.95), ("p99", 0.99)):
+            self.stdout.write(f"{label:<11} {percentile(latencies, p) * 1000:>8.1f} ms")
+        self.stdout.write("status      " + ", ".join(f"{k}: {v}" for k, v in sorted(statuses.items(), key=str)))
+
+    async def _run(self, url, opts):
+        # Bare asyncio HTTP/1.1 so the client itself stays cheap at high concurrency
+        queue: asyncio.Queue[int] = asyncio.Queue()
+        for i in range(opts["requests"]):
+            queue.put_nowait(i)
+        latencies: list[float] = []
+        statuses: Counter = Counter()
+        host, port = url.hostname, url.port or 80
+
+        async def worker():
+            reader = writer = None
+            while not queue.empty():
+                i = queue.get_nowait()
+                q = "loadtest.com" if opts["repeat"] else f"loadtest{i}.com"
+                started = time.perf_counter()
+                try:
+                    if writer is None:
+                        reader, writer = await asyncio.open_connection(host, port)
+                    writer.write(
+                        f"GET {url.path}?{urlencode({'q': q})} HTTP/1.1\r\nHost: {url.netloc}\r\n\r\n".encode()
+                    )
+                    await writer.drain()
+                    head = await reader.readuntil(b"\r\n\r\n")
+                    lines = head.decode("latin-1").split("\r\n")
+                    headers = {k.strip().lower(): v.strip() for k, _, v in (h.partition(":") for h in lines[1:] if h)}
+                    if headers.get("transfer-encoding", "").lower() == "chunked":
+                        while True:
+                            size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                            await reader.readexactly(size + 2)
+                            if size == 0:
+                                break
+                    else:
+                        await reader.readexactly(int(headers.get("content-length", "0")))
+                    statuses[int(lines[0].split()[1])] += 1
+                    if headers.get("connection", "").lower() == "close":
+                        writer.close()
+                        writer = None
+                except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+                    statuses[type(e).__name__] += 1
+                    if writer is not None:
+                        writer.close()
+                    writer = None
+                latencies.append(time.perf_counter() - started)
+            if writer is not None:
+                writer.close()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(opts["concurrency"])))
+        return latencies, statuses, time.perf_counter() - started
@@ -0,0 +1,62 @@
+# backend/hosting/management/commands/prewarm_domains.py
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from hosting import domains, ratelimit, searchlog, taken
+from hosting.views import _namespinner_query
+
+
+class Command(BaseCommand):
+    help = (
+        "Refresh availability of the most searched names (search log, hosting/searchlog.py) across "
+        "the common TLDs, so visitors hit a warm results cache. Meant for cron, e.g. every 5 minutes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=float, default=24, help="Look back this many hours (default: 24).")
+        parser.add_argument("--top", type=int, default=50, help="Names to pre-warm (default: 50).")
+        parser.add_argument("--tlds", default=settings.PREWARM_TLDS,
+                            help="Comma list of TLDs to check each name in (default: PREWARM_TLDS).")
+        parser.add_argument("--ahead", type=int, default=300,
+                            help="Refresh answers that go stale within this many seconds (default: 300).")
+        parser.add_argument("--suggestions", action="store_true",
+                            help="Also warm NameSpinner suggestions (default parameters) for each name.")
+        parser.add_argument("--prune", action="store_true",
+                            help="Delete log rows older than SEARCH_LOG_RETENTION_DAYS afterwards.")
+
+    def handle(self, *args, **opts):
+        searchlog.flush()  # rows this process buffered, if any
+        seeds = searchlog.trending(opts["hours"], opts["top"])
+        tlds = [t.strip().lstrip(".") for t in opts["tlds"].lower().split(",") if t.strip()]
+
+        names, skipped = [], 0
+        for sld, _ in seeds:
+            for tld in tlds:
+                if taken.lookup(f"{sld}.{tld}") is not None or domains.freshness(sld, tld) > opts["ahead"]:
+                    skipped += 1  # answered locally, or still warm for a while
+                else:
+                    names.append((sld, tld))
+
+        errors = 0
+        with ratelimit.priority("background"):
+            for result in domains.recheck(names):
+                errors += "error" in result
+            warmed = 0
+            if opts["suggestions"]:
+                for sld, _ in seeds:
+                    _, _, params = _namespinner_query({"q": f"{sld}.{tlds[0] if tlds else 'com'}"})
+                    try:
+                        domains.namespinner(params)
+                        warmed += 1
+                    except domains.UpstreamError as e:
+                        self.stderr.write(f"NameSpinner for {sld}: {e}")
+
+        top = ", ".join(f"{sld} ({n})" for sld, n in seeds[:10])
+        self.stdout.write(f"Trending over {opts['hours']:g}h: {len(seeds)} names{': ' + top if top else ''}")
+        self.stdout.write(
+            f"Checked {len(names)} domains ({errors} errors), skipped {skipped} already warm or known taken"
+            + (f", warmed suggestions for {warmed} names" if opts["suggestions"] else "")
+        )
+        if opts["prune"]:
+            deleted = searchlog.prune(settings.SEARCH_LOG_RETENTION_DAYS)
+            self.stdout.write(f"Pruned {deleted} search log rows older than {settings.SEARCH_LOG_RETENTION_DAYS} days")
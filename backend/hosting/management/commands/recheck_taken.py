@@ -0,0 +1,49 @@
+# backend/hosting/management/commands/recheck_taken.py
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from hosting import domains, ratelimit, taken
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-ask Enom about the oldest entries of the known-taken index (hosting/taken.py) and drop "
+        "the ones that became available; with --compact, also rewrite the file without removed and "
+        "expired entries. Meant for cron, e.g. hourly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--older-than", type=int, default=settings.TAKEN_INDEX_RECHECK_AGE,
+                            help="Recheck entries last confirmed this many seconds ago (default: "
+                                 "TAKEN_INDEX_RECHECK_AGE).")
+        parser.add_argument("--limit", type=int, default=1000, help="Domains to recheck per run (default: 1000).")
+        parser.add_argument("--compact", action="store_true", help="Compact the index file afterwards.")
+        parser.add_argument("--capacity", type=int, default=None,
+                            help="Slots for the compacted file (default: TAKEN_INDEX_CAPACITY, or more if needed).")
+
+    def handle(self, *args, **opts):
+        if not settings.TAKEN_INDEX_PATH:
+            raise CommandError("TAKEN_INDEX_PATH is not set.")
+
+        names = []
+        for domain in taken.due_for_recheck(opts["older_than"], opts["limit"]):
+            parts = domains.split_domain(domain)
+            if parts is not None:
+                names.append(parts)
+        outcome = Counter()
+        with ratelimit.priority("background"):
+            for result in domains.recheck(names):
+                outcome["error" if "error" in result else "available" if result["available"] else "taken"] += 1
+        self.stdout.write(
+            f"Rechecked {len(names)} domains: {outcome['taken']} still taken, "
+            f"{outcome['available']} available (dropped), {outcome['error']} errors"
+        )
+
+        if opts["compact"]:
+            kept, dropped = taken.compact(opts["capacity"])
+            self.stdout.write(f"Compacted: {kept} entries kept, {dropped} slots freed")
+        self.stdout.write(self.style.SUCCESS(
+            "Known-taken index: " + ", ".join(f"{k}: {v}" for k, v in taken.stats().items())
+        ))
@@ -0,0 +1,78 @@
+# backend/hosting/management/commands/refresh_tld_prices.py
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, List
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from hosting import domains, enom_parse, pricing, ratelimit
+from hosting.models import TldPrice
+
+from .enom_simulator import add_simulator_arguments, simulator_from_options
+
+
+class Command(BaseCommand):
+    help = (
+        "Refresh the TLD price table (TldPrice) from Enom retail pricing, a batch of TLDs per call with "
+        "several calls in flight. Web workers pick the new prices up without a restart through the shared "
+        "cache (hosting/versions.py). Meant for a nightly cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tlds", default="",
+                            help="Comma list of TLDs (default: every TLD in the table or in DOMAIN_PRICES_CENTS).")
+        parser.add_argument("--batch", type=int, default=25, help="TLDs per Enom call (default: 25).")
+        parser.add_argument("--workers", type=int, default=4, help="Enom calls in flight (default: 4).")
+        parser.add_argument("--simulate", action="store_true",
+                            help="Ask the local Enom simulator instead of ENOM_BASE_URL (see enom_simulator).")
+        add_simulator_arguments(parser)
+
+    def handle(self, *args, **opts):
+        if opts["simulate"]:
+            settings.ENOM_BASE_URL = simulator_from_options(opts).start_in_thread()
+        if opts["tlds"]:
+            tlds = [t.strip().lstrip(".") for t in opts["tlds"].lower().split(",") if t.strip()]
+        else:
+            tlds = sorted({*TldPrice.objects.values_list("tld", flat=True), *settings.DOMAIN_PRICES_CENTS})
+        tlds = list(dict.fromkeys(tlds))
+        if not tlds:
+            raise CommandError("No TLDs to refresh")
+        size = max(opts["batch"], 1)
+        batches = [tlds[i:i + size] for i in range(0, len(tlds), size)]
+
+        def fetch(batch: List[str]) -> List[enom_parse.RetailPrice]:
+            with ratelimit.priority("background"):
+                return domains.retail_prices(batch)
+
+        prices: Dict[str, enom_parse.RetailPrice] = {}
+        failed: List[str] = []
+        with ThreadPoolExecutor(max_workers=max(min(opts["workers"], len(batches)), 1)) as pool:
+            futures = {pool.submit(fetch, batch): batch for batch in batches}
+            for future in as_completed(futures):
+                try:
+                    prices.update((p.tld, p) for p in future.result())
+                except domains.UpstreamError as e:
+                    failed += futures[future]
+                    self.stderr.write(f"{', '.join(futures[future])}: {e}")
+
+        now = timezone.now()
+        with transaction.atomic():
+            TldPrice.objects.bulk_create(
+                [TldPrice(tld=p.tld, register_cents=p.register_cents, renew_cents=p.renew_cents,
+                          transfer_cents=p.transfer_cents, updated_at=now) for p in prices.values()],
+                update_conflicts=True,
+                unique_fields=["tld"],
+                update_fields=["register_cents", "renew_cents", "transfer_cents", "updated_at"],
+                batch_size=500,
+            )
+            pricing.invalidate_tld_prices()
+
+        unpriced = [t for t in tlds if t not in prices and t not in failed]
+        self.stdout.write(
+            f"Refreshed {len(prices)} of {len(tlds)} TLDs in {len(batches)} calls"
+            + (f"; Enom has no price for {', '.join(unpriced)}" if unpriced else "")
+        )
+        if failed:
+            raise CommandError(f"{len(failed)} TLDs not refreshed (kept their previous prices): {', '.join(failed)}")
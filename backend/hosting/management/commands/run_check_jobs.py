@@ -0,0 +1,52 @@
+# backend/hosting/management/commands/run_check_jobs.py
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from hosting import checkjobs
+
+from .enom_simulator import add_simulator_arguments, simulator_from_options
+
+
+class Command(BaseCommand):
+    help = (
+        "Work the bulk domain check queue (hosting/checkjobs.py): claim a job, check its rows in chunks, "
+        "repeat. Safe to run several at once; an interrupted job is resumed where it stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Exit when no job is waiting instead of polling.")
+        parser.add_argument("--job", type=int, help="Only this job id (implies --once).")
+        parser.add_argument("--simulate", action="store_true",
+                            help="Ask the local Enom simulator instead of ENOM_BASE_URL (see enom_simulator).")
+        add_simulator_arguments(parser)
+
+    def handle(self, *args, **opts):
+        if opts["simulate"]:
+            settings.ENOM_BASE_URL = simulator_from_options(opts).start_in_thread()
+        once = opts["once"] or opts["job"] is not None
+        while True:
+            close_old_connections()
+            job = checkjobs.claim(opts["job"])
+            if job is None:
+                if once:
+                    return
+                time.sleep(settings.CHECK_JOB_POLL_SECONDS)
+                continue
+            self.stdout.write(f"Job #{job.pk}: {job.total} domains, starting at row {job.checked}")
+            started = time.monotonic()
+            try:
+                job = checkjobs.run(job)
+            except Exception as e:
+                checkjobs.fail(job, str(e))
+                self.stderr.write(f"Job #{job.pk} failed: {e}")
+                continue
+            took = time.monotonic() - started
+            self.stdout.write(
+                f"Job #{job.pk}: {job.status}, {job.checked}/{job.total} checked in {took:.1f}s, "
+                f"{job.available} available, {job.errors} errors"
+            )
+            if opts["job"] is not None:
+                return
@@ -1,5 +1,8 @@
 from django.core.management.base import BaseCommand
-from hosting.models import HostingPlan
+from django.db import transaction
+from hosting import catalog
+from hosting.models import HostingPlan, normalize_features
+from hosting_backend.bulk_sync import sync_rows
 
 PLANS = [
     {
@@ -77,24 +80,44 @@ class Command(BaseCommand):
     help = "Seed Email Hosting plans (names & benefits) to mirror Hosting Malaysia’s structure."
 
     def add_arguments(self, parser):
-        parser.add_argument("--reset", action="store_true", help="Delete existing 'email' plans before seeding")
+        parser.add_argument("--reset", action="store_true", help="Delete 'email' plans that are not in the seed data")
+        parser.add_argument("--dry-run", action="store_true", help="Only report the changes that would be made")
 
+    @transaction.atomic
     def handle(self, *args, **opts):
-        if opts.get("reset"):
-            n = HostingPlan.objects.filter(category="email").delete()[0]
-            self.stdout.write(self.style.WARNING(f"Deleted {n} existing email plans."))
+        rows = [
+            {
+                "category": "email",
+                "name": payload["name"],
+                "price": payload.get("price"),
+                "billing_cycle": payload.get("billing_cycle", "monthly"),
+                "features": payload.get("features", ""),
+                # bulk writes skip HostingPlan.save(), which normally derives this
+                "feature_items": normalize_features(payload.get("features", "")),
+            }
+            for payload in PLANS
+        ]
+        result = sync_rows(
+            HostingPlan.objects.filter(category="email"),
+            rows,
+            key=("category", "name"),
+            fields=("price", "billing_cycle", "features", "feature_items"),
+            delete_missing=bool(opts.get("reset")),
+            dry_run=opts["dry_run"],
+        )
 
-        for payload in PLANS:
-            obj, created = HostingPlan.objects.update_or_create(
-                category="email",
-                name=payload["name"],
-                defaults={
-                    "price": payload.get("price"),
-                    "billing_cycle": payload.get("billing_cycle", "monthly"),
-                    "features": payload.get("features", ""),
-                },
-            )
-            status = "CREATED" if created else "UPDATED"
-            self.stdout.write(self.style.SUCCESS(f"{status}: {obj.name}"))
+        if opts["dry_run"]:
+            for line in result.report():
+                self.stdout.write(line)
+            self.stdout.write(self.style.WARNING("Dry run: nothing written."))
+            return
 
-        self.stdout.write(self.style.SUCCESS("Email plans seeding complete."))
+        catalog.invalidate()
+        for obj in result.delete:
+            self.stdout.write(self.style.WARNING(f"DELETED: {obj.name}"))
+        for status, objs in (("CREATED", result.create), ("UPDATED", result.update)):
+            for obj in objs:
+                self.stdout.write(self.style.SUCCESS(f"{status}: {obj.name}"))
+        self.stdout.write(self.style.SUCCESS(
+            f"Email plans seeding complete ({result.unchanged} unchanged)."
+        ))
@@ -5,7 +5,9 @@ from typing import Dict, List, Tuple, Literal
 from django.core.management.base import BaseCommand
 from django.db import transaction
 
+from hosting import catalog
 from hosting.models import HostingPlan, PlanSpec  # PlanSpec = FK to HostingPlan
+from hosting_backend.bulk_sync import sync_rows
 
 Icon = Literal["text", "check", "times"]
 
@@ -173,7 +175,12 @@ class Command(BaseCommand):
         parser.add_argument(
             "--reset",
             action="store_true",
-            help="Delete existing PlanSpec rows for affected plans before seeding.",
+            help="Delete PlanSpec rows of affected plans that are not in the seed data.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report the changes that would be made.",
         )
         parser.add_argument(
             "--category",
@@ -201,36 +208,45 @@ class Command(BaseCommand):
                 f"Warning: The following plans were not found in category '{category}': {sorted(missing)}"
             ))
 
-        if reset and plans.exists():
-            PlanSpec.objects.filter(plan__in=plans).delete()
-            self.stdout.write(self.style.WARNING("Existing PlanSpec rows deleted for matched plans."))
-
-        # Seed per plan
+        # Desired rows for every matched plan, then one diff + bulk write
+        rows = []
         for plan in plans:
-            rows = PLAN_ROWS.get(plan.name, [])
-            if not rows:
+            plan_rows = PLAN_ROWS.get(plan.name, [])
+            if not plan_rows:
                 self.stdout.write(self.style.WARNING(f"Skip: no rows configured for plan '{plan.name}'"))
                 continue
+            for idx, (icon, value) in enumerate(plan_rows, start=1):
+                rows.append({
+                    "plan_id": plan.id,
+                    "label": LABELS[idx - 1],
+                    "value": value if icon == "text" else "",
+                    "icon": icon,
+                    "order": idx * 10,  # 10, 20, 30…
+                })
+
+        result = sync_rows(
+            PlanSpec.objects.filter(plan__in=plans),
+            rows,
+            key=("plan_id", "label"),
+            fields=("value", "icon", "order"),
+            delete_missing=reset,
+            dry_run=opts["dry_run"],
+        )
 
-            created, updated = 0, 0
-            for idx, (icon, value) in enumerate(rows, start=1):
-                label = LABELS[idx - 1]
-                order = idx * 10  # 10, 20, 30…
-
-                obj, was_created = PlanSpec.objects.update_or_create(
-                    plan=plan,
-                    label=label,
-                    defaults={
-                        "value": value if icon == "text" else "",
-                        "icon": icon,
-                        "order": order,
-                    },
-                )
-                created += int(was_created)
-                updated += int(not was_created)
+        if opts["dry_run"]:
+            for line in result.report():
+                self.stdout.write(line)
+            self.stdout.write(self.style.WARNING("Dry run: nothing written."))
+            return
 
+        # Bulk writes bypass the model signals
+        catalog.invalidate()
+        for plan in plans:
+            created = sum(1 for s in result.create if s.plan_id == plan.id)
+            updated = sum(1 for s in result.update if s.plan_id == plan.id)
+            deleted = sum(1 for s in result.delete if s.plan_id == plan.id)
             self.stdout.write(self.style.SUCCESS(
-                f"{plan.name}: {created} created, {updated} updated PlanSpec rows."
+                f"{plan.name}: {created} created, {updated} updated, {deleted} deleted PlanSpec rows."
             ))
 
         self.stdout.write(self.style.SUCCESS("Done."))
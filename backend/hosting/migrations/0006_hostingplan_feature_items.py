@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:41
+
+import re
+
+from django.db import migrations, models
+
+
+def fill_feature_items(apps, schema_editor):
+    # Frozen copy of hosting.models.normalize_features
+    HostingPlan = apps.get_model('hosting', 'HostingPlan')
+    plans = list(HostingPlan.objects.all())
+    for plan in plans:
+        seen, items = set(), []
+        for f in re.split(r"[;\r\n]+", plan.features or ""):
+            f = f.strip()
+            if f and f not in seen:
+                seen.add(f)
+                items.append(f)
+        plan.feature_items = items
+    HostingPlan.objects.bulk_update(plans, ['feature_items'], batch_size=200)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hosting', '0005_planspec'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hostingplan',
+            name='feature_items',
+            field=models.JSONField(blank=True, default=list, editable=False, help_text='Normalized features, derived from "features" on save'),
+        ),
+        migrations.AlterField(
+            model_name='hostingplan',
+            name='features',
+            field=models.TextField(help_text='Semicolon- or newline-separated features'),
+        ),
+        migrations.RunPython(fill_feature_items, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hosting', '0006_hostingplan_feature_items'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DomainSearch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('check', 'Availability check'), ('suggest', 'Suggestions')], max_length=10)),
+                ('sld', models.CharField(help_text='Searched name without TLD, lowercase', max_length=63)),
+                ('tld', models.CharField(blank=True, help_text='Empty when the search named no TLD', max_length=63)),
+                ('created_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['created_at', 'sld'], name='hosting_dom_created_81cae3_idx')],
+            },
+        ),
+    ]
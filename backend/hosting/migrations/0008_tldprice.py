@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:30
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hosting', '0007_domainsearch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TldPrice',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tld', models.CharField(help_text='Lowercase, without the leading dot', max_length=63, unique=True)),
+                ('register_cents', models.PositiveIntegerField()),
+                ('renew_cents', models.PositiveIntegerField()),
+                ('transfer_cents', models.PositiveIntegerField()),
+                ('updated_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['tld'],
+            },
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-18 06:33
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hosting', '0008_tldprice'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DomainCheckJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(blank=True, help_text='Uploaded file name', max_length=255)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('checked', models.PositiveIntegerField(default=0)),
+                ('available', models.PositiveIntegerField(default=0)),
+                ('errors', models.PositiveIntegerField(default=0, help_text='Rows Enom could not answer or that are not domains')),
+                ('error', models.TextField(blank=True, help_text='Why the job failed')),
+                ('claim', models.CharField(blank=True, help_text='Token of the worker holding the job', max_length=32)),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='domain_check_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DomainCheckResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField(help_text='0-based line number in the upload')),
+                ('domain', models.CharField(max_length=255)),
+                ('available', models.BooleanField(null=True)),
+                ('code', models.CharField(blank=True, max_length=10)),
+                ('text', models.CharField(blank=True, max_length=255)),
+                ('error', models.CharField(blank=True, max_length=255)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='results', to='hosting.domaincheckjob')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='domaincheckjob',
+            index=models.Index(fields=['status', 'created_at'], name='hosting_dom_status_dfa20b_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='domaincheckresult',
+            constraint=models.UniqueConstraint(fields=('job', 'position'), name='unique_check_result_position'),
+        ),
+    ]
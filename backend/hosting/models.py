@@ -1,7 +1,27 @@
 # backend/hosting/models.py
+import re
 from django.db import models
 from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
 from django.core.validators import RegexValidator
+from django.utils import timezone
+
+FEATURE_SEPARATORS = re.compile(r"[;\r\n]+")
+FEATURE_MAX_LENGTH = 120
+
+def normalize_features(text):
+    """
+    Split admin/seed feature text on ';' or newlines.
+    Strips whitespace, drops blanks and repeated entries, keeps the original order.
+    """
+    seen = set()
+    out = []
+    for f in FEATURE_SEPARATORS.split(text or ""):
+        f = f.strip()
+        if f and f not in seen:
+            seen.add(f)
+            out.append(f)
+    return out
 
 class HostingPlan(models.Model):
     CATEGORY_CHOICES = [
@@ -16,11 +36,28 @@ class HostingPlan(models.Model):
     price = models.DecimalField(max_digits=8, decimal_places=2)
     billing_cycle = models.CharField(max_length=10, choices=BILLING_CHOICES, default='monthly')
     category = models.CharField(max_length=20, choices=CATEGORY_CHOICES)
-    features = models.TextField(help_text='Semicolon-separated features')
+    features = models.TextField(help_text='Semicolon- or newline-separated features')
+    feature_items = models.JSONField(default=list, blank=True, editable=False,
+                                     help_text='Normalized features, derived from "features" on save')
     is_popular = models.BooleanField(default=False)
 
+    def clean(self):
+        items = normalize_features(self.features)
+        if not items:
+            raise ValidationError({'features': 'Add at least one feature.'})
+        too_long = [f for f in items if len(f) > FEATURE_MAX_LENGTH]
+        if too_long:
+            raise ValidationError({'features': f'Features must be at most {FEATURE_MAX_LENGTH} characters: {too_long[0][:40]}…'})
+
+    def save(self, *args, **kwargs):
+        self.feature_items = normalize_features(self.features)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'features' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'feature_items'}
+        super().save(*args, **kwargs)
+
     def feature_list(self):
-        return [f.strip() for f in self.features.split(';') if f.strip()]
+        return list(self.feature_items)
 
     def __str__(self):
         return f"{self.name} ({self.category})"
@@ -122,4 +159,90 @@ class CustomerProfile(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"{self.user.email} profile"
\ No newline at end of file
+        return f"{self.user.email} profile"
+
+
+class DomainSearch(models.Model):
+    """
+    One domain lookup from the check/suggestion endpoints, written in batches
+    by hosting/searchlog.py; `prewarm_domains` reads the trending seeds back.
+    """
+    KIND_CHOICES = [("check", "Availability check"), ("suggest", "Suggestions")]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    sld = models.CharField(max_length=63, help_text="Searched name without TLD, lowercase")
+    tld = models.CharField(max_length=63, blank=True, help_text="Empty when the search named no TLD")
+    created_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [models.Index(fields=["created_at", "sld"])]
+
+    def __str__(self):
+        return f"{self.kind}: {self.sld}{'.' + self.tld if self.tld else ''}"
+
+
+class TldPrice(models.Model):
+    """
+    Yearly Enom retail prices of one TLD, written in bulk by
+    `manage.py refresh_tld_prices`; hosting/pricing.py serves them from memory.
+    """
+    tld = models.CharField(max_length=63, unique=True, help_text="Lowercase, without the leading dot")
+    register_cents = models.PositiveIntegerField()
+    renew_cents = models.PositiveIntegerField()
+    transfer_cents = models.PositiveIntegerField()
+    updated_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["tld"]
+
+    def __str__(self):
+        return f".{self.tld}: {self.register_cents / 100:.2f}"
+
+
+class DomainCheckJob(models.Model):
+    """
+    Availability check of an uploaded domain list (hosting/checkjobs.py). One
+    DomainCheckResult row per line; `manage.py run_check_jobs` works through
+    them in list order, so rows with position < checked are the finished ones.
+    """
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    ]
+    user = models.ForeignKey(User, related_name="domain_check_jobs", on_delete=models.CASCADE)
+    name = models.CharField(max_length=255, blank=True, help_text="Uploaded file name")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+    total = models.PositiveIntegerField(default=0)
+    checked = models.PositiveIntegerField(default=0)
+    available = models.PositiveIntegerField(default=0)
+    errors = models.PositiveIntegerField(default=0, help_text="Rows Enom could not answer or that are not domains")
+    error = models.TextField(blank=True, help_text="Why the job failed")
+    claim = models.CharField(max_length=32, blank=True, help_text="Token of the worker holding the job")
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "created_at"])]
+
+    def __str__(self):
+        return f"Check job #{self.id} - {self.checked}/{self.total} - {self.status}"
+
+
+class DomainCheckResult(models.Model):
+    job = models.ForeignKey(DomainCheckJob, related_name="results", on_delete=models.CASCADE)
+    position = models.PositiveIntegerField(help_text="0-based line number in the upload")
+    domain = models.CharField(max_length=255)
+    available = models.BooleanField(null=True)
+    code = models.CharField(max_length=10, blank=True)
+    text = models.CharField(max_length=255, blank=True)
+    error = models.CharField(max_length=255, blank=True)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["job", "position"], name="unique_check_result_position")]
+
+    def __str__(self):
+        return f"#{self.job_id}/{self.position}: {self.domain}"
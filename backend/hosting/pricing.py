@@ -0,0 +1,205 @@
+# backend/hosting/pricing.py
+"""
+Server-side cart pricing.
+
+A cart ("plan_<id>" SKUs and domain names) is priced in one pass against the
+cached plan catalog and the TLD price table; no per-item queries and no
+client-supplied amounts. The resulting Quote is handed to the client as a
+signed token, so checkout can reuse it verbatim instead of repricing.
+
+TLD prices come from the TldPrice table (refreshed from Enom by
+`manage.py refresh_tld_prices`) over the DOMAIN_PRICES_CENTS defaults. Each
+worker keeps them in memory, loaded at startup (wsgi.py/asgi.py) and reloaded
+when their version token (hosting/versions.py) changes, like the plan catalog,
+so quotes and suggestion results are priced without a query or an Enom call.
+A refresh from cron reaches the web workers through the shared cache only.
+"""
+from __future__ import annotations
+
+import logging
+import re
+import threading
+from dataclasses import asdict, dataclass
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.db import DatabaseError
+
+from . import catalog, versions
+from .domains import split_domain
+
+logger = logging.getLogger(__name__)
+
+PLAN_SKU_RE = re.compile(r"^plan_(\d+)$")
+MAX_QUANTITY = 10
+QUOTE_SALT = "hosting.pricing.quote"
+PRICES_VERSION_CACHE_KEY = "hosting:tld_prices:version"
+
+_prices_lock = threading.Lock()
+_prices: Optional[Tuple[str, Mapping[str, int]]] = None  # (version, prices)
+
+
+class QuoteError(ValueError):
+    """Cart cannot be priced (unknown SKU, bad quantity, expired token…)."""
+
+
+@dataclass(frozen=True)
+class QuoteLine:
+    item_type: str
+    sku: str
+    name: str
+    quantity: int
+    unit_amount_cents: int
+    currency: str
+
+    @property
+    def line_total_cents(self) -> int:
+        return self.quantity * self.unit_amount_cents
+
+
+@dataclass(frozen=True)
+class Quote:
+    currency: str
+    lines: Tuple[QuoteLine, ...]
+
+    @property
+    def total_amount_cents(self) -> int:
+        return sum(line.line_total_cents for line in self.lines)
+
+    def as_dict(self) -> dict:
+        return {
+            "currency": self.currency,
+            "total_amount_cents": self.total_amount_cents,
+            "lines": [{**asdict(line), "line_total_cents": line.line_total_cents} for line in self.lines],
+        }
+
+
+# ---------- TLD price index ----------
+
+def invalidate_tld_prices() -> None:
+    """Make every worker reload its TLD prices once the current transaction commits."""
+    versions.bump(PRICES_VERSION_CACHE_KEY)
+
+
+def load_tld_prices() -> Dict[str, int]:
+    """DOMAIN_PRICES_CENTS, overridden by the TldPrice table (one query)."""
+    from .models import TldPrice
+
+    prices = {tld.lower(): int(cents) for tld, cents in settings.DOMAIN_PRICES_CENTS.items()}
+    prices.update(TldPrice.objects.values_list("tld", "register_cents"))
+    return prices
+
+
+def _current_prices() -> Tuple[str, Optional[Mapping[str, int]]]:
+    version = versions.get(PRICES_VERSION_CACHE_KEY)
+    loaded = _prices
+    return version, (loaded[1] if loaded is not None and loaded[0] == version else None)
+
+
+def _reload_prices(version: str) -> Mapping[str, int]:
+    global _prices
+    with _prices_lock:
+        if _prices is None or _prices[0] != version:
+            _prices = (version, MappingProxyType(load_tld_prices()))
+        return _prices[1]
+
+
+def tld_prices() -> Mapping[str, int]:
+    """Yearly registration price in cents by TLD."""
+    version, prices = _current_prices()
+    return prices if prices is not None else _reload_prices(version)
+
+
+async def atld_prices() -> Mapping[str, int]:
+    """tld_prices() for async views; only a reload goes to a thread."""
+    version, prices = _current_prices()
+    return prices if prices is not None else await sync_to_async(_reload_prices)(version)
+
+
+def warm() -> None:
+    """Load the TLD prices at worker start, so the first request does not pay for the query."""
+    try:
+        tld_prices()
+    except DatabaseError as e:  # e.g. not migrated yet; loaded on first use instead
+        logger.warning("TLD prices not preloaded: %s", e)
+
+
+def with_price(row: dict, prices: Mapping[str, int]) -> dict:
+    """A suggestion row plus its yearly registration price_cents, if its TLD has one."""
+    cents = prices.get(row["tld"])
+    return row if cents is None else {**row, "price_cents": cents}
+
+
+def with_prices(rows: Iterable[dict], prices: Mapping[str, int]) -> List[dict]:
+    return [with_price(row, prices) for row in rows]
+
+
+# ---------- Quotes ----------
+
+
+def _quantity(raw) -> int:
+    try:
+        qty = int(raw if raw is not None else 1)
+    except (TypeError, ValueError):
+        raise QuoteError("quantity must be an integer")
+    if not 1 <= qty <= MAX_QUANTITY:
+        raise QuoteError(f"quantity must be between 1 and {MAX_QUANTITY}")
+    return qty
+
+
+def build_quote(items: Iterable[Mapping]) -> Quote:
+    """
+    Price cart items: [{"item_type": "plan"|"domain", "sku": "plan_3"|"example.com", "quantity": 1}, …]
+    Plans are priced per billing cycle, domains per year.
+    """
+    snapshot = catalog.get_snapshot()
+    prices = tld_prices()
+    currency = settings.STRIPE_CURRENCY
+
+    lines: List[QuoteLine] = []
+    for it in items:
+        item_type = (it.get("item_type") or "").strip()
+        sku = (it.get("sku") or "").strip()
+        qty = _quantity(it.get("quantity"))
+
+        if item_type == "plan":
+            m = PLAN_SKU_RE.match(sku)
+            plan = snapshot.by_id.get(int(m.group(1))) if m else None
+            if plan is None:
+                raise QuoteError(f"Unknown plan SKU: {sku!r}")
+            lines.append(QuoteLine("plan", sku, plan.name, qty, plan.price_cents, currency))
+        elif item_type == "domain":
+            parts = split_domain(sku)
+            if parts is None:
+                raise QuoteError(f"Invalid domain: {sku!r}")
+            domain = ".".join(parts)
+            if parts[1] not in prices:
+                raise QuoteError(f"No price for .{parts[1]} domains")
+            lines.append(QuoteLine("domain", domain, domain, qty, int(prices[parts[1]]), currency))
+        else:
+            raise QuoteError(f"Unknown item_type: {item_type!r}")
+
+    if not lines:
+        raise QuoteError("Cart is empty")
+    return Quote(currency, tuple(lines))
+
+
+def sign_quote(quote: Quote) -> str:
+    return signing.dumps(
+        {"currency": quote.currency, "lines": [asdict(line) for line in quote.lines]},
+        salt=QUOTE_SALT,
+        compress=True,
+    )
+
+
+def load_quote(token: str) -> Quote:
+    try:
+        data: Dict = signing.loads(token, salt=QUOTE_SALT, max_age=settings.QUOTE_TTL_SECONDS)
+    except signing.SignatureExpired:
+        raise QuoteError("Quote expired, please refresh your cart")
+    except signing.BadSignature:
+        raise QuoteError("Invalid quote")
+    return Quote(data["currency"], tuple(QuoteLine(**line) for line in data["lines"]))
@@ -0,0 +1,374 @@
+# backend/hosting/ratelimit.py
+"""
+Token-bucket rate limiting of Enom calls across every worker process on the
+host, so a traffic spike queues here instead of getting the reseller account
+throttled.
+
+The buckets live in a small memory-mapped state file (ENOM_RATE_STATE_PATH)
+guarded by flock(): one global bucket (ENOM_RATE_LIMIT calls/second,
+ENOM_RATE_BURST deep) plus optional per-command budgets, e.g.
+ENOM_RATE_COMMAND_LIMITS="namespinner:5,getnamesuggestions:5:10" (rate[:burst]).
+A call takes one token from every bucket that applies to it; rates must be
+above 0 (ImproperlyConfigured otherwise, reported by hosting.E002).
+
+Priority classes, highest first:
+
+    interactive  everything not listed below (check_domain, bulk checks)
+    suggest      NameSpinner / GetNameSuggestions (autocomplete)
+    background   cache refreshes, rechecks, pre-warming
+
+A class does not take tokens while a higher class is waiting in any worker,
+and lower classes leave part of each burst (ENOM_RATE_RESERVE, scaled by
+rank) to the classes above them. The class is the one set with priority(),
+else the command's. A call that cannot get its tokens within
+ENOM_RATE_MAX_WAIT seconds fails with RateLimitedError without being sent.
+
+Off while ENOM_RATE_LIMIT is 0 and no command budgets are set.
+"""
+from __future__ import annotations
+
+import asyncio
+import fcntl
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import requests
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from .resilience import LatencyTracker
+
+PRIORITIES = ("interactive", "suggest", "background")
+COMMAND_PRIORITIES = {"namespinner": "suggest", "getnamesuggestions": "suggest"}
+GLOBAL = "*"
+
+MAGIC = b"ERL1"
+MAX_BUCKETS = 32
+HEADER = struct.Struct("<4s")
+CLASS = struct.Struct("<id")  # callers waiting, last heartbeat
+BUCKET = struct.Struct("<24sdd")  # command (empty = free record), tokens, last refill
+CLASSES_AT = HEADER.size
+BUCKETS_AT = CLASSES_AT + len(PRIORITIES) * CLASS.size
+SIZE = BUCKETS_AT + MAX_BUCKETS * BUCKET.size
+
+POLL = 0.05  # longest sleep between attempts; waiting callers refresh their class heartbeat this often
+STALE = 1.0  # waiters that have not polled for this long are gone (crashed worker)
+LOCK_RETRY = 0.001  # aacquire()'s sleep while another call holds the state lock (for microseconds)
+
+_priority: ContextVar[Optional[str]] = ContextVar("enom_priority", default=None)
+
+_thread_lock = threading.Lock()  # flock() does not exclude threads sharing a descriptor
+_state_lock = threading.Lock()
+_state: Optional["_State"] = None
+_limits_cache: Dict[tuple, Dict[str, Tuple[float, float]]] = {}
+
+_stats_lock = threading.Lock()
+# skipped: calls that would not wait (hedges) and found no token
+_stats = {name: {"acquired": 0, "waited": 0, "rejected": 0, "skipped": 0, "queued": 0,
+                 "wait_ms_total": 0.0, "wait_ms_max": 0.0} for name in PRIORITIES}
+_waits = {name: LatencyTracker() for name in PRIORITIES}
+
+
+class RateLimitedError(requests.RequestException):
+    """No rate-limit token within ENOM_RATE_MAX_WAIT; the call was not attempted."""
+
+
+@contextmanager
+def priority(name: str) -> Iterator[None]:
+    """
+    Run Enom calls made in this context (thread or task) under priority class
+    `name`. Commands and cron jobs wrap their Enom work in priority("background")
+    so it queues behind live traffic in the shared rate limit and never takes
+    the part of the burst kept for requests.
+    """
+    if name not in PRIORITIES:
+        raise ValueError(f"Unknown priority class {name!r}; expected one of {', '.join(PRIORITIES)}")
+    token = _priority.set(name)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def _class_of(command: str) -> str:
+    return _priority.get() or COMMAND_PRIORITIES.get(command, "interactive")
+
+
+def _number(item: str, text: str, what: str) -> float:
+    try:
+        value = float(text)
+    except ValueError:
+        value = float("nan")
+    if not value > 0:
+        raise ImproperlyConfigured(
+            f"ENOM_RATE_COMMAND_LIMITS: {item!r} needs a {what} above 0 (command:rate[:burst], e.g. 'namespinner:5')"
+        )
+    return value
+
+
+def limits() -> Dict[str, Tuple[float, float]]:
+    """
+    {bucket: (calls per second, burst)} from settings; "*" is the global bucket.
+    Raises ImproperlyConfigured for a command budget without a positive rate.
+    """
+    key = (settings.ENOM_RATE_LIMIT, settings.ENOM_RATE_BURST, settings.ENOM_RATE_COMMAND_LIMITS)
+    parsed = _limits_cache.get(key)
+    if parsed is None:
+        parsed = {}
+        if settings.ENOM_RATE_LIMIT > 0:
+            parsed[GLOBAL] = (settings.ENOM_RATE_LIMIT, max(float(settings.ENOM_RATE_BURST), 1.0))
+        for item in settings.ENOM_RATE_COMMAND_LIMITS.split(","):
+            if not item.strip():
+                continue
+            command, _, rest = item.strip().lower().partition(":")
+            rate, _, burst = rest.partition(":")
+            if not command:
+                raise ImproperlyConfigured(f"ENOM_RATE_COMMAND_LIMITS: {item.strip()!r} has no command name")
+            rate = _number(item.strip(), rate, "rate")
+            parsed[command] = (rate, max(_number(item.strip(), burst, "burst") if burst else rate, 1.0))
+        _limits_cache[key] = parsed
+    return parsed
+
+
+class _State:
+    """This process's mapping of the shared state file."""
+
+    def __init__(self, path: str):
+        self.pid, self.path = os.getpid(), path
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self.fd).st_size != SIZE:
+                os.ftruncate(self.fd, 0)  # new file or another layout: start from full buckets
+                os.ftruncate(self.fd, SIZE)
+            self.mm = mmap.mmap(self.fd, SIZE)
+            if self.mm[:len(MAGIC)] != MAGIC:
+                self.mm[:] = bytes(SIZE)
+                HEADER.pack_into(self.mm, 0, MAGIC)
+        finally:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        self.offsets: Dict[str, int] = {}
+
+    def bucket(self, name: str) -> int:
+        """Offset of the bucket record for name, claiming a free one if needed (lock held)."""
+        offset = self.offsets.get(name)
+        if offset is not None:
+            return offset
+        key = name.encode()
+        for offset in range(BUCKETS_AT, SIZE, BUCKET.size):
+            stored = self.mm[offset:offset + 24].rstrip(b"\0")
+            if stored == key or not stored:
+                if not stored:
+                    BUCKET.pack_into(self.mm, offset, key, 0.0, 0.0)
+                self.offsets[name] = offset
+                return offset
+        raise RuntimeError("Enom rate-limit state file is out of bucket records")
+
+
+def _get_state() -> _State:
+    global _state
+    state, path = _state, settings.ENOM_RATE_STATE_PATH
+    if state is not None and state.pid == os.getpid() and state.path == path:
+        return state
+    with _state_lock:
+        if _state is None or _state.pid != os.getpid() or _state.path != path:
+            _state = _State(path)
+        return _state
+
+
+@contextmanager
+def _locked(wait: bool = True) -> Iterator[_State]:
+    """The state, locked against every thread and process; with wait False BlockingIOError if it is busy."""
+    state = _get_state()
+    if not _thread_lock.acquire(blocking=wait):
+        raise BlockingIOError("Enom rate-limit state is locked")
+    try:
+        fcntl.flock(state.fd, fcntl.LOCK_EX if wait else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        try:
+            yield state
+        finally:
+            fcntl.flock(state.fd, fcntl.LOCK_UN)
+    finally:
+        _thread_lock.release()
+
+
+def _refill(mm: mmap.mmap, offset: int, rate: float, burst: float, now: float) -> float:
+    _, tokens, last = BUCKET.unpack_from(mm, offset)
+    if last == 0.0:
+        return burst  # a bucket nobody has used yet starts full
+    return min(burst, tokens + max(0.0, now - last) * rate)
+
+
+def _attempt(state: _State, rank: int, buckets: List[Tuple[str, float, float]], waiting: bool) -> float:
+    """Take the tokens (0.0) or return how long to wait before trying again (lock held)."""
+    mm, now = state.mm, time.time()
+    if waiting:  # heartbeat: this class still has live waiters
+        own = CLASSES_AT + rank * CLASS.size
+        CLASS.pack_into(mm, own, CLASS.unpack_from(mm, own)[0], now)
+    for higher in range(rank):
+        count, beat = CLASS.unpack_from(mm, CLASSES_AT + higher * CLASS.size)
+        if count > 0 and now - beat < STALE:
+            return POLL
+
+    share = settings.ENOM_RATE_RESERVE * rank / (len(PRIORITIES) - 1)
+    levels, delay = [], 0.0
+    for name, rate, burst in buckets:
+        offset = state.bucket(name)
+        tokens = _refill(mm, offset, rate, burst, now)
+        need = min(1.0 + burst * share, burst)  # what lower classes leave in the bucket
+        if tokens < need:
+            delay = max(delay, (need - tokens) / rate)
+        levels.append((offset, name, tokens))
+    for offset, name, tokens in levels:
+        BUCKET.pack_into(mm, offset, name.encode(), tokens if delay else tokens - 1.0, now)
+    return delay
+
+
+def _join(state: _State, rank: int, delta: int) -> None:
+    """Add delta to the callers waiting in class rank (lock held)."""
+    offset = CLASSES_AT + rank * CLASS.size
+    count, beat = CLASS.unpack_from(state.mm, offset)
+    now = time.time()
+    if now - beat >= STALE:
+        count = 0  # whoever was counted stopped polling long ago
+    CLASS.pack_into(state.mm, offset, max(0, count + delta), now)
+    with _stats_lock:
+        _stats[PRIORITIES[rank]]["queued"] += delta
+
+
+def _buckets_for(command: str) -> List[Tuple[str, float, float]]:
+    table = limits()
+    return [(name, *table[name]) for name in (GLOBAL, command) if name in table]
+
+
+class _Waiter:
+    """One call's way through the limiter; shared by acquire() and aacquire()."""
+
+    def __init__(self, command: str, block: bool):
+        self.command = command.lower()
+        self.buckets = _buckets_for(self.command)
+        self.name = _class_of(self.command)
+        self.rank = PRIORITIES.index(self.name)
+        self.block = block
+        self.started = time.monotonic()
+        self.deadline = self.started + settings.ENOM_RATE_MAX_WAIT
+        self.waiting = False
+
+    def step(self, wait: bool = True) -> float:
+        """
+        0.0 once the tokens are taken, else seconds to sleep; raises
+        RateLimitedError past the deadline. One trip through the state lock;
+        with wait False raises BlockingIOError instead of queueing for it.
+        """
+        with _locked(wait) as state:
+            delay = _attempt(state, self.rank, self.buckets, self.waiting)
+            give_up = bool(delay) and (not self.block or delay > self.deadline - time.monotonic())
+            if delay and not give_up and not self.waiting:
+                _join(state, self.rank, 1)
+                self.waiting = True
+            elif (not delay or give_up) and self.waiting:
+                _join(state, self.rank, -1)
+                self.waiting = False
+        if not delay:
+            self._done(rejected=False)
+            return 0.0
+        if give_up:
+            self._done(rejected=True)
+            raise RateLimitedError(
+                f"Enom rate limit: no token for {self.command or 'command'} "
+                f"({self.name}) within {settings.ENOM_RATE_MAX_WAIT:g}s"
+            )
+        return min(delay, POLL)
+
+    def abandon(self) -> None:
+        """The caller went away while waiting (cancelled task)."""
+        if self.waiting:
+            self.waiting = False
+            with _locked() as state:
+                _join(state, self.rank, -1)
+
+    def _done(self, rejected: bool) -> None:
+        waited = time.monotonic() - self.started
+        with _stats_lock:
+            stats = _stats[self.name]
+            stats["acquired" if not rejected else "rejected" if self.block else "skipped"] += 1
+            if waited >= 0.001:
+                stats["waited"] += 1
+                stats["wait_ms_total"] += waited * 1000
+                stats["wait_ms_max"] = max(stats["wait_ms_max"], waited * 1000)
+        if not rejected:
+            _waits[self.name].add(waited)
+
+
+def acquire(command: str, block: bool = True) -> None:
+    """Take the tokens for one call of command, waiting up to ENOM_RATE_MAX_WAIT (not at all if block is False)."""
+    if not limits():
+        return
+    waiter = _Waiter(command, block)
+    try:
+        while True:
+            delay = waiter.step()
+            if not delay:
+                return
+            time.sleep(delay)
+    except BaseException:
+        waiter.abandon()
+        raise
+
+
+async def aacquire(command: str) -> None:
+    """
+    Async acquire(); the event loop keeps running while the call waits. The
+    state lock is only tried (LOCK_NB) while queueing, so a worker holding it
+    never stalls the loop; it is waited for only when mapping the state file
+    (once per process) and when a cancelled call gives up its place.
+    """
+    if not limits():
+        return
+    waiter = _Waiter(command, True)
+    try:
+        while True:
+            try:
+                delay = waiter.step(wait=False)
+            except BlockingIOError:
+                delay = LOCK_RETRY
+            if not delay:
+                return
+            await asyncio.sleep(delay)
+    except BaseException:
+        waiter.abandon()
+        raise
+
+
+def snapshot() -> dict:
+    """Per-class counters and wait percentiles for this worker, plus the shared bucket levels and queues."""
+    table = limits()
+    out: dict = {"enabled": bool(table), "limits": {name: {"rate": r, "burst": b} for name, (r, b) in table.items()}}
+    classes = {}
+    with _stats_lock:
+        for name in PRIORITIES:
+            classes[name] = dict(_stats[name])
+    for name, stats in classes.items():
+        p50, p95 = _waits[name].percentile(50), _waits[name].percentile(95)
+        stats["wait_ms_p50"] = round(p50 * 1000, 1) if p50 is not None else None
+        stats["wait_ms_p95"] = round(p95 * 1000, 1) if p95 is not None else None
+        stats["wait_ms_total"] = round(stats["wait_ms_total"], 1)
+        stats["wait_ms_max"] = round(stats["wait_ms_max"], 1)
+    out["classes"] = classes
+    if table:
+        with _locked() as state:
+            now = time.time()
+            out["tokens"] = {name: round(_refill(state.mm, state.bucket(name), rate, burst, now), 2)
+                             for name, (rate, burst) in table.items()}
+            waiting = {}
+            for rank, name in enumerate(PRIORITIES):
+                count, beat = CLASS.unpack_from(state.mm, CLASSES_AT + rank * CLASS.size)
+                waiting[name] = count if now - beat < STALE else 0
+            out["waiting_all_workers"] = waiting
+    return out
@@ -0,0 +1,66 @@
+# backend/hosting/renderers.py
+"""
+Line-oriented formats for the streaming domain endpoints: NDJSON (one JSON
+object per line), Server-Sent Events and CSV. Views stream their rows with
+ndjson_line()/sse_event()/csv_line(); the renderers let DRF negotiate the
+format (Accept header, or ?format=ndjson / ?format=sse / ?format=csv) and
+encode error responses.
+"""
+import csv
+from typing import Iterable
+
+from rest_framework.renderers import BaseRenderer
+
+from . import catalog
+
+
+def ndjson_line(data) -> bytes:
+    return catalog.dumps(data) + b"\n"
+
+
+def sse_event(event: str, data) -> bytes:
+    # catalog.dumps never emits raw newlines, so the payload fits one data: line
+    return b"event: " + event.encode() + b"\ndata: " + catalog.dumps(data) + b"\n\n"
+
+
+class _Echo:
+    """File-like object for csv.writer that hands each encoded row back instead of storing it."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+_csv_writer = csv.writer(_Echo())
+
+
+def csv_line(values: Iterable) -> bytes:
+    return _csv_writer.writerow(values).encode("utf-8")
+
+
+class NDJSONRenderer(BaseRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return b"" if data is None else ndjson_line(data)
+
+
+class EventStreamRenderer(BaseRenderer):
+    media_type = "text/event-stream"
+    format = "sse"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return b"" if data is None else sse_event("error", data)
+
+
+class CSVRenderer(BaseRenderer):
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return csv_line(data.keys()) + csv_line(data.values())
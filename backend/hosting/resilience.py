@@ -0,0 +1,139 @@
+# backend/hosting/resilience.py
+"""
+Circuit breaker and latency tracking for the Enom client (per worker process).
+
+Breaker states:
+
+    closed     calls go through; outcomes land in a rolling time window
+    open       calls fail fast with CircuitOpenError for ENOM_BREAKER_OPEN_SECONDS
+    half_open  up to ENOM_BREAKER_HALF_OPEN_CALLS probes at a time; a good
+               probe closes the circuit, a failed or slow one re-opens it
+
+The circuit opens once the window holds at least ENOM_BREAKER_MIN_CALLS
+outcomes and either the failure rate reaches ENOM_BREAKER_FAILURE_RATE or the
+share of calls slower than ENOM_BREAKER_SLOW_CALL_SECONDS reaches
+ENOM_BREAKER_SLOW_RATE. Only transport errors and 5xx count as failures.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Deque, List, Optional, Tuple
+
+import requests
+from django.conf import settings
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitOpenError(requests.RequestException):
+    """Upstream marked unhealthy; the call was not attempted."""
+
+
+class CircuitBreaker:
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._window: Deque[Tuple[float, bool, bool]] = deque()  # (timestamp, failed, slow)
+        self.stats = {"opened": 0, "rejected": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._advance(time.monotonic())
+            return self._state
+
+    def _advance(self, now: float) -> None:
+        if self._state == OPEN and now - self._opened_at >= settings.ENOM_BREAKER_OPEN_SECONDS:
+            self._state, self._probes = HALF_OPEN, 0
+
+    def _open(self, now: float) -> None:
+        self._state, self._opened_at, self._probes = OPEN, now, 0
+        self._window.clear()
+        self.stats["opened"] += 1
+
+    def acquire(self) -> bool:
+        """
+        Permission for one call; returns True if the call is a half-open probe.
+        Raises CircuitOpenError when the call must not be attempted.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._advance(now)
+            if self._state == CLOSED:
+                return False
+            if self._state == HALF_OPEN and self._probes < settings.ENOM_BREAKER_HALF_OPEN_CALLS:
+                self._probes += 1
+                return True
+            self.stats["rejected"] += 1
+            retry_in = max(0.0, settings.ENOM_BREAKER_OPEN_SECONDS - (now - self._opened_at))
+        raise CircuitOpenError(f"{self.name} circuit open, retry in {retry_in:.0f}s")
+
+    def release(self, probe: bool, failed: bool, elapsed: float) -> None:
+        """Record the outcome of a call allowed by acquire()."""
+        slow = elapsed >= settings.ENOM_BREAKER_SLOW_CALL_SECONDS
+        with self._lock:
+            now = time.monotonic()
+            if probe:
+                self._probes = max(0, self._probes - 1)
+                if self._state == HALF_OPEN:
+                    if failed or slow:
+                        self._open(now)
+                    else:
+                        self._state = CLOSED
+                        self._window.clear()
+                return
+            if self._state != CLOSED:
+                return  # a call that started before the circuit opened
+
+            window = self._window
+            window.append((now, failed, slow))
+            horizon = now - settings.ENOM_BREAKER_WINDOW_SECONDS
+            while window and window[0][0] < horizon:
+                window.popleft()
+            total = len(window)
+            if total < settings.ENOM_BREAKER_MIN_CALLS:
+                return
+            failures = sum(1 for _, f, _ in window if f)
+            slows = sum(1 for _, _, s in window if s)
+            if failures / total >= settings.ENOM_BREAKER_FAILURE_RATE or slows / total >= settings.ENOM_BREAKER_SLOW_RATE:
+                self._open(now)
+
+    def abandon(self, probe: bool) -> None:
+        """A call allowed by acquire() was cancelled before it had an outcome."""
+        if probe:
+            with self._lock:
+                self._probes = max(0, self._probes - 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            self._advance(time.monotonic())
+            return {"state": self._state, "window_calls": len(self._window), **self.stats}
+
+
+class LatencyTracker:
+    """Latencies of the last `size` successful calls, for percentile-based hedging."""
+
+    def __init__(self, size: int = 200):
+        self._lock = threading.Lock()
+        self._recent: Deque[float] = deque(maxlen=size)
+        self._sorted: Optional[List[float]] = None
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._recent.append(seconds)
+            self._sorted = None
+
+    def percentile(self, p: float) -> Optional[float]:
+        """p in 0-100; None until there are enough samples to mean anything."""
+        with self._lock:
+            if len(self._recent) < 20:
+                return None
+            if self._sorted is None:
+                self._sorted = sorted(self._recent)
+            values = self._sorted
+        return values[min(len(values) - 1, int(len(values) * p / 100))]
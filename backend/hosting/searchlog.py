@@ -0,0 +1,122 @@
+# backend/hosting/searchlog.py
+"""
+Search log for pre-warming: the check/suggestion views record() every valid
+lookup, and `manage.py prewarm_domains` refreshes the trending ones before
+visitors ask again.
+
+record() only appends to an in-memory buffer. A background thread per worker
+writes the buffer with bulk_create every SEARCH_LOG_FLUSH_SECONDS, or sooner
+once SEARCH_LOG_BATCH rows are waiting, so a request never waits on the
+database. If the database falls behind, the buffer keeps the newest
+SEARCH_LOG_BUFFER_MAX rows and counts the rest as dropped.
+"""
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import re
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Deque, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import DomainSearch
+
+logger = logging.getLogger(__name__)
+
+LABEL_RE = re.compile(r"^[a-z0-9-]{1,63}$")
+
+_lock = threading.Lock()
+_wake = threading.Event()
+_buffer: Deque[Tuple[str, str, str, datetime]] = deque()
+_flusher = {"thread": None, "pid": None}
+_stats = {"recorded": 0, "written": 0, "dropped": 0, "failed_batches": 0}
+
+
+def record(kind: str, sld: str, tld: str = "") -> None:
+    """Queue one lookup; never blocks on the database. Names that are not a plain label are ignored."""
+    if not settings.SEARCH_LOG:
+        return
+    sld, tld = sld.strip().lower(), tld.strip().lower().lstrip(".")
+    if not LABEL_RE.match(sld) or len(tld) > 63:
+        return
+    with _lock:
+        if len(_buffer) >= settings.SEARCH_LOG_BUFFER_MAX:
+            _buffer.popleft()
+            _stats["dropped"] += 1
+        _buffer.append((kind, sld, tld, timezone.now()))
+        _stats["recorded"] += 1
+        waiting = len(_buffer)
+        _ensure_flusher()
+    if waiting >= settings.SEARCH_LOG_BATCH:
+        _wake.set()
+
+
+def _ensure_flusher() -> None:
+    """Start this process's writer thread (again after a fork); called with _lock held."""
+    pid = os.getpid()
+    if _flusher["thread"] is not None and _flusher["pid"] == pid and _flusher["thread"].is_alive():
+        return
+    thread = threading.Thread(target=_run, name="search-log", daemon=True)
+    _flusher["thread"], _flusher["pid"] = thread, pid
+    thread.start()
+
+
+def _run() -> None:
+    while True:
+        _wake.wait(settings.SEARCH_LOG_FLUSH_SECONDS)
+        _wake.clear()
+        flush()
+        close_old_connections()  # this thread keeps its own connection between batches
+
+
+def flush() -> int:
+    """Write everything buffered so far; returns the number of rows written."""
+    with _lock:
+        rows = list(_buffer)
+        _buffer.clear()
+    if not rows:
+        return 0
+    try:
+        DomainSearch.objects.bulk_create(
+            [DomainSearch(kind=kind, sld=sld, tld=tld, created_at=at) for kind, sld, tld, at in rows],
+            batch_size=settings.SEARCH_LOG_BATCH,
+        )
+    except Exception:
+        logger.exception("Search log: dropping %d rows after a failed write", len(rows))
+        with _lock:
+            _stats["failed_batches"] += 1
+            _stats["dropped"] += len(rows)
+        return 0
+    with _lock:
+        _stats["written"] += len(rows)
+    return len(rows)
+
+
+atexit.register(flush)  # graceful worker shutdown and management commands
+
+
+def stats() -> dict:
+    with _lock:
+        return {**_stats, "buffered": len(_buffer)}
+
+
+def trending(hours: float, limit: int, kinds: Optional[List[str]] = None) -> List[Tuple[str, int]]:
+    """[(sld, searches)] for the most searched names of the last `hours`, most searched first."""
+    rows = DomainSearch.objects.filter(created_at__gte=timezone.now() - timedelta(hours=hours))
+    if kinds:
+        rows = rows.filter(kind__in=kinds)
+    top = rows.values("sld").annotate(searches=Count("id")).order_by("-searches", "sld")[:limit]
+    return [(row["sld"], row["searches"]) for row in top]
+
+
+def prune(days: float) -> int:
+    """Delete rows older than `days`; returns how many."""
+    deleted, _ = DomainSearch.objects.filter(created_at__lt=timezone.now() - timedelta(days=days)).delete()
+    return deleted
@@ -2,7 +2,7 @@
 
 from rest_framework import serializers
 from django.contrib.auth.models import User
-from .models import HostingPlan, PlanSpec, Checkout, Order, OrderItem, Payment, CustomerProfile
+from .models import HostingPlan, PlanSpec, Checkout, Order, OrderItem, Payment, CustomerProfile, DomainCheckJob
 import re
 
 
@@ -24,12 +24,40 @@ class DomainCheckResponseSerializer(serializers.Serializer):
     text = serializers.CharField()
 
 
+class BulkDomainCheckRequestSerializer(serializers.Serializer):
+    domains = serializers.ListField(child=serializers.CharField(max_length=253), allow_empty=False)
+
+
+class BulkDomainCheckLineSerializer(serializers.Serializer):
+    domain = serializers.CharField()
+    available = serializers.BooleanField(required=False)
+    code = serializers.CharField(required=False)
+    text = serializers.CharField(required=False)
+    error = serializers.CharField(required=False)
+    retry = serializers.BooleanField(required=False, help_text="The error was temporary; asking again later may work")
+
+
+class DomainCheckJobRequestSerializer(serializers.Serializer):
+    file = serializers.FileField(required=False, help_text="Text or CSV file, one domain per line (first column)")
+    domains = serializers.ListField(child=serializers.CharField(max_length=255), required=False,
+                                    help_text="Instead of a file")
+
+
+class DomainCheckJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = DomainCheckJob
+        fields = ["id", "name", "status", "total", "checked", "available", "errors", "error",
+                  "created_at", "started_at", "finished_at"]
+        read_only_fields = fields
+
+
 class DomainSuggestionItemSerializer(serializers.Serializer):
     sld = serializers.CharField()
     tld = serializers.CharField()
     domain = serializers.CharField()
     available = serializers.BooleanField(required=False)
     score = serializers.IntegerField()
+    price_cents = serializers.IntegerField(required=False, help_text="Yearly registration price, when the TLD has one")
 
 
 class NameSpinnerResponseSerializer(serializers.Serializer):
@@ -43,6 +71,7 @@ class SimpleSuggestionItemSerializer(serializers.Serializer):
     tld = serializers.CharField()
     domain = serializers.CharField()
     score = serializers.FloatField()
+    price_cents = serializers.IntegerField(required=False, help_text="Yearly registration price, when the TLD has one")
 
 
 class NameSuggestionsResponseSerializer(serializers.Serializer):
@@ -52,19 +81,75 @@ class NameSuggestionsResponseSerializer(serializers.Serializer):
     suggestions = SimpleSuggestionItemSerializer(many=True)
 
 
+class LocalSuggestionItemSerializer(serializers.Serializer):
+    sld = serializers.CharField()
+    tld = serializers.CharField()
+    domain = serializers.CharField()
+    score = serializers.FloatField()
+    source = serializers.ChoiceField(choices=["local", "enom", "both"])
+    available = serializers.BooleanField(required=False, help_text="Only for Enom rows and confirmed candidates")
+    price_cents = serializers.IntegerField(required=False, help_text="Yearly registration price, when the TLD has one")
+
+
+class LocalSuggestionsResponseSerializer(serializers.Serializer):
+    query = serializers.CharField()
+    tlds = serializers.CharField()
+    count = serializers.IntegerField()
+    partial = serializers.BooleanField(help_text="True if merging with Enom was requested but failed")
+    suggestions = LocalSuggestionItemSerializer(many=True)
+
+
+class UnifiedSuggestionItemSerializer(serializers.Serializer):
+    sld = serializers.CharField()
+    tld = serializers.CharField()
+    domain = serializers.CharField()
+    score = serializers.FloatField(help_text="0-1, both Enom rankings merged")
+    source = serializers.ChoiceField(choices=["namespinner", "getnamesuggestions", "both"])
+    available = serializers.BooleanField(required=False, help_text="From NameSpinner, when it returned the domain")
+    price_cents = serializers.IntegerField(required=False, help_text="Yearly registration price, when the TLD has one")
+
+
+class UnifiedSuggestionsResponseSerializer(serializers.Serializer):
+    query = serializers.CharField()
+    tlds = serializers.CharField()
+    count = serializers.IntegerField()
+    partial = serializers.BooleanField(help_text="True if one of the two Enom commands failed")
+    suggestions = UnifiedSuggestionItemSerializer(many=True)
+
+
 class StripeCheckoutItemSerializer(serializers.Serializer):
+    item_type = serializers.ChoiceField(choices=["plan", "domain"])
+    sku = serializers.CharField(max_length=255, help_text='"plan_<id>" or a domain name')
+    quantity = serializers.IntegerField(required=False, default=1)
+
+
+class CreateStripeCheckoutRequestSerializer(serializers.Serializer):
+    quote = serializers.CharField(required=False, help_text="Token from /checkout/quote/ (preferred)")
+    items = StripeCheckoutItemSerializer(many=True, required=False)
+    success_url = serializers.URLField()
+    cancel_url = serializers.URLField()
+
+
+class QuoteRequestSerializer(serializers.Serializer):
+    items = StripeCheckoutItemSerializer(many=True)
+
+
+class QuoteLineSerializer(serializers.Serializer):
     item_type = serializers.CharField()
-    name = serializers.CharField()
     sku = serializers.CharField()
+    name = serializers.CharField()
     quantity = serializers.IntegerField()
     unit_amount_cents = serializers.IntegerField()
     currency = serializers.CharField()
+    line_total_cents = serializers.IntegerField()
 
 
-class CreateStripeCheckoutRequestSerializer(serializers.Serializer):
-    items = StripeCheckoutItemSerializer(many=True)
-    success_url = serializers.URLField()
-    cancel_url = serializers.URLField()
+class QuoteResponseSerializer(serializers.Serializer):
+    quote = serializers.CharField()
+    expires_in = serializers.IntegerField()
+    currency = serializers.CharField()
+    total_amount_cents = serializers.IntegerField()
+    lines = QuoteLineSerializer(many=True)
 
 
 # ---------------- Model serializers ----------------
@@ -110,6 +195,24 @@ class HostingPlanWithSpecsSerializer(serializers.ModelSerializer):
             "specs",
         ]
 
+class PlanMatrixHeaderSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    name = serializers.CharField()
+    price = serializers.DecimalField(max_digits=8, decimal_places=2)
+    billing_cycle = serializers.CharField()
+    is_popular = serializers.BooleanField()
+
+
+class PlanMatrixResponseSerializer(serializers.Serializer):
+    category = serializers.CharField(allow_blank=True)
+    labels = serializers.ListField(child=serializers.CharField())
+    plans = PlanMatrixHeaderSerializer(many=True)
+    # cells[plan][label] -> [icon, value] or null when the plan has no such row
+    cells = serializers.ListField(
+        child=serializers.ListField(child=serializers.ListField(child=serializers.CharField(), allow_null=True))
+    )
+
+
 class CheckoutSerializer(serializers.ModelSerializer):
     class Meta:
         model = Checkout
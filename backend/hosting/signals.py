@@ -0,0 +1,19 @@
+# backend/hosting/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import catalog, pricing
+from .models import HostingPlan, PlanSpec, TldPrice
+
+
+@receiver([post_save, post_delete], sender=HostingPlan)
+@receiver([post_save, post_delete], sender=PlanSpec)
+def invalidate_catalog(sender, **kwargs):
+    # Covers admin edits too: inline PlanSpec rows are saved/deleted one by one.
+    catalog.invalidate()
+
+
+@receiver([post_save, post_delete], sender=TldPrice)
+def invalidate_tld_prices(sender, **kwargs):
+    # Admin edits; refresh_tld_prices bulk-writes and invalidates itself.
+    pricing.invalidate_tld_prices()
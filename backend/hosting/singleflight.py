@@ -0,0 +1,236 @@
+# backend/hosting/singleflight.py
+"""
+Request coalescing: concurrent callers asking for the same key share one call.
+
+    body = flights.do(key, lambda: send(...))          # threads (WSGI)
+    body = await aflights.do(key, lambda: asend(...))  # coroutines (ASGI)
+
+Inside a process the first caller (the leader) runs the call and everybody
+else waiting on the same key gets its result or its exception. Across
+processes the leader also takes a lock in the Django cache and publishes the
+result under the key for ENOM_COALESCE_RESULT_TTL seconds; a worker that finds
+the lock taken polls for that result instead of calling upstream too. A leader
+that fails publishes its exception the same way, so the workers waiting on it
+raise it rather than each repeating the failed call in turn. The lock lives
+for ENOM_COALESCE_LOCK_TTL seconds and is kept alive while the call runs, so
+the lock of a worker that died lapses quickly and a waiting worker takes over.
+Only useful across workers when CACHES points at a shared backend.
+"""
+from __future__ import annotations
+
+import asyncio
+import pickle
+import threading
+import time
+import weakref
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+class _Flight:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _Failed:
+    """Stands in the result slot for the exception a leader raised."""
+
+    __slots__ = ("error",)
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def _failure(error: BaseException) -> Optional[_Failed]:
+    """A picklable marker for `error`, or None if it cannot be shared."""
+    if not isinstance(error, Exception):
+        return None  # cancellation and interpreter exits belong to the leader alone
+    try:
+        marker = _Failed(type(error)(*error.args))  # drops the traceback, request and response
+        pickle.dumps(marker)
+    except Exception:
+        return None
+    return marker
+
+
+def _unwrap(result: Any) -> Any:
+    if isinstance(result, _Failed):
+        raise result.error
+    return result
+
+
+class _LockKeeper:
+    """
+    Extends the shared locks this process holds every third of
+    ENOM_COALESCE_LOCK_TTL while their calls run. The thread only exists while
+    there is a lock to keep and dies with the process, which lets the locks
+    of a killed worker expire.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys: Dict[str, int] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def hold(self, key: str) -> None:
+        with self._lock:
+            self._keys[key] = self._keys.get(key, 0) + 1
+            if self._thread is None or not self._thread.is_alive():  # not alive: we were forked
+                self._thread = threading.Thread(target=self._run, name="singleflight-locks", daemon=True)
+                self._thread.start()
+
+    def drop(self, key: str) -> None:
+        with self._lock:
+            if self._keys.get(key, 0) > 1:
+                self._keys[key] -= 1
+            else:
+                self._keys.pop(key, None)
+
+    def _run(self) -> None:
+        while True:
+            ttl = settings.ENOM_COALESCE_LOCK_TTL
+            time.sleep(ttl / 3)
+            with self._lock:
+                if not self._keys:
+                    self._thread = None
+                    return
+                keys = list(self._keys)
+            for key in keys:
+                try:
+                    cache.touch(key, ttl)
+                except Exception:
+                    pass  # the lock lapses and another worker may call too; no worse than no coalescing
+
+
+_keeper = _LockKeeper()
+
+
+class SingleFlight:
+    """Thread-based coalescing; `on_shared(kind)` is called with "local" or "shared" for every follower."""
+
+    def __init__(self, timeout: Callable[[], float], on_shared: Callable[[str], None] = lambda kind: None):
+        self._timeout = timeout  # longest a leader may take, in seconds
+        self._on_shared = on_shared
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+
+    def do(self, key: str, call: Callable[[], Any]) -> Any:
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            self._on_shared("local")
+            flight.done.wait()  # the leader's own timeouts bound this wait
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = self._shared(key, call)
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def _shared(self, key: str, call: Callable[[], Any]) -> Any:
+        if not settings.ENOM_COALESCE_SHARED:
+            return call()
+        lock_key, result_key = f"{key}:lock", f"{key}:result"
+        deadline = time.monotonic() + self._timeout()
+        while True:
+            result = cache.get(result_key)
+            if result is not None:
+                self._on_shared("shared")
+                return _unwrap(result)
+            if cache.add(lock_key, 1, timeout=settings.ENOM_COALESCE_LOCK_TTL):
+                _keeper.hold(lock_key)
+                try:
+                    result = call()
+                    cache.set(result_key, result, settings.ENOM_COALESCE_RESULT_TTL)
+                    return result
+                except BaseException as e:
+                    marker = _failure(e)
+                    if marker is not None:
+                        cache.set(result_key, marker, settings.ENOM_COALESCE_RESULT_TTL)
+                    raise
+                finally:
+                    _keeper.drop(lock_key)
+                    cache.delete(lock_key)
+            if time.monotonic() >= deadline:
+                return call()
+            time.sleep(settings.ENOM_COALESCE_POLL)
+
+
+class AsyncSingleFlight:
+    """SingleFlight for coroutines; flights are tracked per event loop."""
+
+    def __init__(self, timeout: Callable[[], float], on_shared: Callable[[str], None] = lambda kind: None):
+        self._timeout = timeout
+        self._on_shared = on_shared
+        self._flights: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Future]]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    async def do(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        flights = self._flights.setdefault(loop, {})
+        future = flights.get(key)
+        if future is not None:
+            self._on_shared("local")
+            return await asyncio.shield(future)  # a cancelled follower must not cancel the leader
+
+        future = flights[key] = loop.create_future()
+        try:
+            result = await self._shared(key, call)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved: there may be no followers
+            raise
+        finally:
+            flights.pop(key, None)
+
+    async def _shared(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        if not settings.ENOM_COALESCE_SHARED:
+            return await call()
+        lock_key, result_key = f"{key}:lock", f"{key}:result"
+        deadline = time.monotonic() + self._timeout()
+        while True:
+            result = await cache.aget(result_key)
+            if result is not None:
+                self._on_shared("shared")
+                return _unwrap(result)
+            if await cache.aadd(lock_key, 1, timeout=settings.ENOM_COALESCE_LOCK_TTL):
+                _keeper.hold(lock_key)
+                try:
+                    result = await call()
+                    await cache.aset(result_key, result, settings.ENOM_COALESCE_RESULT_TTL)
+                    return result
+                except BaseException as e:
+                    marker = _failure(e)
+                    if marker is not None:
+                        await cache.aset(result_key, marker, settings.ENOM_COALESCE_RESULT_TTL)
+                    raise
+                finally:
+                    _keeper.drop(lock_key)
+                    await cache.adelete(lock_key)
+            if time.monotonic() >= deadline:
+                return await call()
+            await asyncio.sleep(settings.ENOM_COALESCE_POLL)
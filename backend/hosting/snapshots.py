@@ -0,0 +1,177 @@
+# backend/hosting/snapshots.py
+"""
+Static JSON copies of the plan catalog for Nginx/CDN serving.
+
+Layout under CATALOG_SNAPSHOT_ROOT (one directory per catalog version):
+
+    current -> v-<version>/            symlink, swapped atomically
+    v-<version>/plans/index.json       /api/plans/
+    v-<version>/plans/index.<cat>.json /api/plans/?category=<cat>
+    v-<version>/plans/<id>.json        /api/plans/<id>/
+    v-<version>/plans/specs/...        /api/plans/specs/  (same index naming)
+    v-<version>/plans/matrix/...       /api/plans/matrix/ (same index naming)
+
+Example Nginx wiring (only a bare URL or a lone ?category=<cat> goes to disk;
+any other query string, e.g. ?feature=ssl, falls through to Django):
+
+    map $args $catalog_suffix { ""  ""; "~^category=(?<cat>[a-z]+)$" ".$cat"; default "NOPE"; }
+    location = /api/plans/        { root /srv/catalog/current; try_files /plans/index$catalog_suffix.json @django; }
+    location = /api/plans/specs/  { root /srv/catalog/current; try_files /plans/specs/index$catalog_suffix.json @django; }
+    location = /api/plans/matrix/ { root /srv/catalog/current; try_files /plans/matrix/index$catalog_suffix.json @django; }
+    location ~ ^/api/plans/(\\d+)/$ { root /srv/catalog/current; try_files /plans/$1.json @django; }
+
+Builders in different processes (admin edits in any worker, the management
+command) check and swap 'current' under an flock on <root>/.lock, so an older
+version never replaces a newer one. Old versions are pruned in the order they
+were current (<root>/.history), not by file times.
+"""
+from __future__ import annotations
+
+import fcntl
+import logging
+import os
+import shutil
+import threading
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+from django.conf import settings
+from django.db import connections
+
+from . import catalog
+
+logger = logging.getLogger(__name__)
+
+CURRENT = "current"
+PREFIX = "v-"
+HISTORY = ".history"  # versions on disk, in the order they became current
+MAX_ATTEMPTS = 3  # renders per build() while the catalog keeps changing underneath
+
+_rebuild_lock = threading.Lock()
+_rebuild_state = {"running": False, "dirty": False}
+
+
+def _write(path: Path, body: bytes) -> None:
+    path.parent.mkdir(mode=0o755, parents=True, exist_ok=True)
+    with open(path, "wb") as fh:
+        fh.write(body)
+
+
+@contextmanager
+def _locked(root_dir: Path) -> Iterator[None]:
+    """Excludes every other builder on the host, in any process or thread."""
+    fd = os.open(root_dir / ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        os.close(fd)  # releases the flock
+
+
+def build(root: Optional[str] = None, keep: Optional[int] = None) -> Path:
+    """
+    Render the current catalog version under root and point 'current' at it;
+    returns the version directory 'current' points to. The swap only happens
+    while the rendered version is still the catalog's: after an edit during
+    the render, the new version is rendered instead (up to MAX_ATTEMPTS
+    times, then 'current' is left to the build that edit scheduled).
+    """
+    root_dir = Path(root or settings.CATALOG_SNAPSHOT_ROOT)
+    keep = keep if keep is not None else settings.CATALOG_SNAPSHOT_KEEP
+    root_dir.mkdir(mode=0o755, parents=True, exist_ok=True)
+    for _ in range(MAX_ATTEMPTS):
+        snap = catalog.get_snapshot()
+        final = _render(root_dir, snap)
+        with _locked(root_dir):
+            if not final.is_dir():
+                continue  # pruned by a newer build
+            if catalog.get_version() != snap.version:
+                if (root_dir / CURRENT).resolve() != final.resolve():
+                    shutil.rmtree(final, ignore_errors=True)  # never to be current
+                continue
+            # rename() over an existing symlink is atomic, readers never see a gap
+            link_tmp = root_dir / f".{CURRENT}-{uuid.uuid4().hex}"
+            os.symlink(final.name, link_tmp)
+            os.replace(link_tmp, root_dir / CURRENT)
+            _prune(root_dir, final, keep)
+            return final
+    logger.info("Catalog changed during %d snapshot renders; leaving 'current' to the newer build", MAX_ATTEMPTS)
+    return (root_dir / CURRENT).resolve()
+
+
+def _render(root_dir: Path, snap: catalog.CatalogSnapshot) -> Path:
+    """Write snap's files to <root>/v-<version>/ unless they are already there."""
+    final = root_dir / f"{PREFIX}{snap.version}"
+
+    if not final.exists():
+        staging = root_dir / f".tmp-{uuid.uuid4().hex}"
+        staging.mkdir(mode=0o755, parents=True)
+        try:
+            for category in snap.by_category:
+                suffix = f".{category}" if category else ""
+                _write(staging / "plans" / f"index{suffix}.json", snap.plans_json[category])
+                _write(staging / "plans" / "specs" / f"index{suffix}.json", snap.specs_json[category])
+                _write(staging / "plans" / "matrix" / f"index{suffix}.json", snap.matrix_json[category])
+            for plan_id, body in snap.plan_json.items():
+                _write(staging / "plans" / f"{plan_id}.json", body)
+            _write(staging / "VERSION", snap.version.encode())
+            try:
+                os.rename(staging, final)
+            except OSError:
+                if not final.is_dir():
+                    raise
+                # another build of the same version got there first: same content
+                shutil.rmtree(staging, ignore_errors=True)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+    return final
+
+
+def _prune(root_dir: Path, current: Path, keep: int) -> None:
+    """Keep current and the keep - 1 versions that were current before it (called under _locked())."""
+    history = root_dir / HISTORY
+    try:
+        swapped = history.read_text().split()
+    except FileNotFoundError:
+        swapped = []
+    kept = ([name for name in swapped if name != current.name] + [current.name])[-max(keep, 1):]
+    for path in root_dir.iterdir():
+        if path.name.startswith(PREFIX) and path.is_dir() and path.name not in kept:
+            shutil.rmtree(path, ignore_errors=True)
+    tmp = root_dir / f"{HISTORY}-{uuid.uuid4().hex}"
+    _write(tmp, "\n".join(kept).encode())
+    os.replace(tmp, history)
+
+
+def schedule_rebuild() -> None:
+    """
+    Rebuild in a background thread (called on commit after admin edits).
+    Bursts of edits collapse into at most one extra rebuild.
+    """
+    with _rebuild_lock:
+        if _rebuild_state["running"]:
+            _rebuild_state["dirty"] = True
+            return
+        _rebuild_state["running"] = True
+    # Not a daemon: a management command that edited the catalog waits for it
+    threading.Thread(target=_rebuild_loop, name="catalog-snapshot").start()
+
+
+def _rebuild_loop() -> None:
+    try:
+        while True:
+            try:
+                path = build()
+                logger.info("Catalog snapshot written to %s", path)
+            except Exception:
+                logger.exception("Catalog snapshot rebuild failed")
+            with _rebuild_lock:
+                if not _rebuild_state["dirty"]:
+                    _rebuild_state["running"] = False
+                    return
+                _rebuild_state["dirty"] = False
+    finally:
+        connections.close_all()
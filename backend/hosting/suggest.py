@@ -0,0 +1,297 @@
+# backend/hosting/suggest.py
+"""
+Local domain name suggestions, generated and ranked in process (no Enom call).
+
+    rows = suggest("best coffee", ["com", "io"], limit=20)   # a few milliseconds
+    rows = merge(rows, domains.namespinner(params), limit=20)  # optional re-rank with Enom
+    rows = confirm(rows, 5)                                    # availability for the top 5 only
+
+The query is split into known words (e.g. "bestcoffeeshop" -> best coffee
+shop) using the word index, then candidates are built from it: the plain
+name, prefixes and suffixes ("getbestcoffee", "bestcoffeehq"), related-word
+swaps ("topcoffee"), hyphenation and domain hacks ("bit.ly"). Each candidate
+is scored by strategy, length and TLD, and filtered by per-TLD rules.
+
+The word index (words, related words, prefixes, suffixes) is compiled by
+`manage.py build_suggest_index` into SUGGEST_INDEX_PATH and loaded once per
+process; without it the small built-in vocabulary below is used.
+"""
+from __future__ import annotations
+
+import heapq
+import json
+import logging
+import math
+import re
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from django.conf import settings
+
+from . import domains, taken
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 1
+
+# Built-in vocabulary, most common first (earlier words segment more eagerly)
+WORDS = (
+    "the my get go try use hey hi we you our best top smart quick fast easy simple pure true real "
+    "good great big little new next one first prime bright clear bold open free fresh green blue red "
+    "web net site page host cloud data code dev app apps tech soft ware labs lab hub base stack "
+    "shop store market mart deal deals buy sell trade pay cash money bank fund invest capital "
+    "home house room space place spot land city town world global local zone point line link "
+    "coffee tea food eat cook chef kitchen bake bakery pizza burger bar cafe wine beer drink "
+    "health care fit fitness gym yoga life live love happy kind well doc clinic "
+    "travel trip tour go fly air sea sun star moon sky rain snow wind fire stone rock tree leaf "
+    "pet dog cat paw kid kids baby mom dad family friend team crew club group people "
+    "art design studio photo pic film media news blog post mail chat talk social "
+    "work job career skill learn school class book books read write word words idea ideas "
+    "car auto drive ride move bike motor fix repair build craft make maker works "
+    "music sound audio song play game games fun sport sports ball "
+    "law legal tax finance insure consult agency pro expert group partners solutions services "
+    "shopify online digital cyber hq now today daily"
+).split()
+
+RELATED = {
+    "best": ["top", "prime"], "top": ["best", "peak"], "quick": ["fast", "rapid"], "fast": ["quick", "swift"],
+    "easy": ["simple"], "simple": ["easy", "pure"], "smart": ["clever", "bright"], "new": ["fresh", "next"],
+    "big": ["mega", "grand"], "good": ["great"], "great": ["grand"], "shop": ["store", "mart"],
+    "store": ["shop", "market"], "market": ["mart", "bazaar"], "home": ["house", "nest"], "house": ["home"],
+    "coffee": ["brew", "bean", "espresso"], "tea": ["brew"], "food": ["eats", "kitchen"], "cafe": ["bistro"],
+    "fit": ["fitness", "strong"], "fitness": ["fit", "gym"], "travel": ["trip", "journey"], "trip": ["travel"],
+    "pet": ["paw"], "dog": ["pup", "paw"], "cat": ["kitty"], "kids": ["tots"], "art": ["craft"],
+    "design": ["studio", "craft"], "photo": ["snap", "pic"], "news": ["daily"], "blog": ["journal"],
+    "work": ["works"], "learn": ["study"], "school": ["academy"], "book": ["read"], "car": ["auto"],
+    "auto": ["car", "motor"], "music": ["sound", "tune"], "game": ["play"], "money": ["cash", "coin"],
+    "cloud": ["sky"], "web": ["net", "online"], "code": ["dev"], "tech": ["labs"], "city": ["metro"],
+    "world": ["global", "planet"], "team": ["crew"], "life": ["living"], "love": ["adore"],
+}
+
+PREFIXES = ("get", "try", "my", "go", "the", "use", "hey", "join")
+SUFFIXES = ("hq", "app", "hub", "labs", "now", "online", "co", "ly", "ify", "pro", "works", "studio", "shop")
+
+# Relative weight of each TLD in the ranking; unlisted TLDs get DEFAULT_TLD_WEIGHT
+TLD_WEIGHTS = {"com": 1.0, "io": 0.9, "co": 0.85, "net": 0.8, "org": 0.8, "app": 0.8, "dev": 0.8, "ai": 0.85,
+               "xyz": 0.6, "tv": 0.65, "cc": 0.6}
+DEFAULT_TLD_WEIGHT = 0.7
+
+# Base score per generation strategy
+STRATEGY_WEIGHTS = {"exact": 1.0, "hack": 0.9, "related": 0.8, "suffix": 0.75, "prefix": 0.7, "hyphen": 0.5}
+
+MAX_SLD_LENGTH = 63  # tokens() reads at most this much of a query: segment() is quadratic in its length
+
+UNKNOWN_CHUNK_COST = 4.0  # plus one per letter, for an unknown run; a known word costs ~1-2.5
+
+
+@dataclass(frozen=True)
+class TldRule:
+    min_length: int = 1
+    max_length: int = 63
+    hyphens: bool = True
+    digits: bool = True
+
+
+TLD_RULES: Dict[str, TldRule] = {
+    "com": TldRule(min_length=3),
+    "net": TldRule(min_length=3),
+    "org": TldRule(min_length=3),
+    "io": TldRule(min_length=2),
+    "co": TldRule(min_length=2),
+    "tv": TldRule(min_length=2, hyphens=False),
+    "cc": TldRule(min_length=2, hyphens=False),
+    "ai": TldRule(min_length=3),
+    "app": TldRule(min_length=2),
+    "dev": TldRule(min_length=2),
+}
+DEFAULT_TLD_RULE = TldRule(min_length=2)
+
+
+@dataclass(frozen=True)
+class WordIndex:
+    costs: Mapping[str, float]  # word -> segmentation cost (lower = more common)
+    related: Mapping[str, Sequence[str]]
+    prefixes: Sequence[str]
+    suffixes: Sequence[str]
+    max_word: int
+
+    @classmethod
+    def build(cls, words: Iterable[str], related: Mapping[str, Sequence[str]] = RELATED,
+              prefixes: Sequence[str] = PREFIXES, suffixes: Sequence[str] = SUFFIXES) -> "WordIndex":
+        """Words most common first; the cost grows with the log of the rank."""
+        costs: Dict[str, float] = {}
+        for rank, word in enumerate(w.strip().lower() for w in words):
+            if word.isalnum() and word not in costs:
+                costs[word] = 1.0 + math.log10(rank + 1) / 2
+        return cls(costs=costs, related={k.lower(): list(v) for k, v in related.items()},
+                   prefixes=tuple(prefixes), suffixes=tuple(suffixes), max_word=max(map(len, costs), default=1))
+
+    def as_dict(self) -> dict:
+        return {"version": INDEX_VERSION, "costs": dict(self.costs), "related": dict(self.related),
+                "prefixes": list(self.prefixes), "suffixes": list(self.suffixes)}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "WordIndex":
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported suggest index version {data.get('version')!r}")
+        costs = data["costs"]
+        return cls(costs=costs, related=data["related"], prefixes=tuple(data["prefixes"]),
+                   suffixes=tuple(data["suffixes"]), max_word=max(map(len, costs), default=1))
+
+    def segment(self, text: str) -> List[str]:
+        """Cheapest split of a letter/digit run into known words (unknown runs kept whole)."""
+        n = len(text)
+        best: List[Tuple[float, int]] = [(0.0, 0)] + [(math.inf, 0)] * n  # (cost, start of last piece)
+        for end in range(1, n + 1):
+            for start in range(max(0, end - self.max_word), end):
+                piece = text[start:end]
+                cost = self.costs.get(piece)
+                if cost is not None and best[start][0] + cost < best[end][0]:
+                    best[end] = (best[start][0] + cost, start)
+            # an unknown run: only worth it when nothing known fits
+            for start in range(end):
+                cost = best[start][0] + UNKNOWN_CHUNK_COST + (end - start)
+                if cost < best[end][0]:
+                    best[end] = (cost, start)
+        pieces, end = [], n
+        while end > 0:
+            start = best[end][1]
+            pieces.append(text[start:end])
+            end = start
+        return pieces[::-1]
+
+
+_index_lock = threading.Lock()
+_index: Optional[WordIndex] = None
+
+
+def get_index() -> WordIndex:
+    """The process-wide index: SUGGEST_INDEX_PATH if set, else the built-in vocabulary."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = _load_index(settings.SUGGEST_INDEX_PATH)
+    return _index
+
+
+def _load_index(path: str) -> WordIndex:
+    if path:
+        try:
+            with open(path, encoding="utf-8") as fh:
+                return WordIndex.from_dict(json.load(fh))
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("Cannot load suggest index %s, using the built-in one: %s", path, e)
+    return WordIndex.build(WORDS)
+
+
+def tokens(query: str, index: Optional[WordIndex] = None) -> List[str]:
+    """'Best-Coffee-Shop.com' -> ['best', 'coffee', 'shop']."""
+    index = index or get_index()
+    parts = domains.split_domain(query)
+    sld = (parts[0] if parts else query.lower())[:MAX_SLD_LENGTH]
+    out: List[str] = []
+    for run in re.findall(r"[a-z0-9]+", sld):
+        out += index.segment(run)
+    return out
+
+
+def _allowed(sld: str, tld: str) -> bool:
+    rule = TLD_RULES.get(tld, DEFAULT_TLD_RULE)
+    if not rule.min_length <= len(sld) <= rule.max_length:
+        return False
+    if "-" in sld and (not rule.hyphens or sld.startswith("-") or sld.endswith("-")):
+        return False
+    if not rule.digits and any(ch.isdigit() for ch in sld):
+        return False
+    return domains.split_domain(f"{sld}.{tld}") is not None
+
+
+def _score(strategy: str, sld: str, tld: str) -> float:
+    length_factor = 1.0 / (1.0 + max(0, len(sld) - 8) / 20)
+    return STRATEGY_WEIGHTS[strategy] * length_factor * TLD_WEIGHTS.get(tld, DEFAULT_TLD_WEIGHT)
+
+
+def _candidates(words: List[str], tlds: Sequence[str], index: WordIndex) -> Iterable[Tuple[str, str, str]]:
+    """(strategy, sld, tld) triples, possibly repeated."""
+    joined = "".join(words)
+    slds = [("exact", joined)]
+    if len(words) > 1:
+        slds.append(("hyphen", "-".join(words)))
+    slds += [("prefix", p + joined) for p in index.prefixes if not joined.startswith(p)]
+    slds += [("suffix", joined + s) for s in index.suffixes if not joined.endswith(s)]
+    for i, word in enumerate(words):
+        for alt in index.related.get(word, ()):
+            slds.append(("related", "".join(words[:i] + [alt] + words[i + 1:])))
+    for strategy, sld in slds:
+        for tld in tlds:
+            yield strategy, sld, tld
+    # Domain hacks: the name itself ends with one of the TLDs (bitly -> bit.ly)
+    for tld in tlds:
+        flat = tld.replace(".", "")
+        if len(joined) > len(flat) and joined.endswith(flat):
+            yield "hack", joined[:-len(flat)], tld
+
+
+def suggest(query: str, tlds: Sequence[str], limit: int = 20, index: Optional[WordIndex] = None,
+            words: Optional[List[str]] = None) -> List[dict]:
+    """Best `limit` local candidates, highest score first. Pass `words` when tokens(query) is already known."""
+    index = index or get_index()
+    if words is None:
+        words = tokens(query, index)
+    if not words:
+        return []
+    best: Dict[str, dict] = {}
+    for strategy, sld, tld in _candidates(words, [t.lower().lstrip(".") for t in tlds], index):
+        if not _allowed(sld, tld):
+            continue
+        domain = f"{sld}.{tld}"
+        score = round(_score(strategy, sld, tld), 4)
+        if domain not in best or best[domain]["score"] < score:
+            best[domain] = {"sld": sld, "tld": tld, "domain": domain, "score": score, "source": "local"}
+    return heapq.nlargest(limit, best.values(), key=lambda row: (row["score"], -len(row["domain"])))
+
+
+def merge(local: List[dict], remote: List[dict], limit: int = 20) -> List[dict]:
+    """
+    Re-rank local candidates together with Enom NameSpinner rows. Remote scores
+    are scaled to 0-1; a name both sides came up with gets both contributions
+    (weighted by SUGGEST_MERGE_LOCAL_WEIGHT). Enom's availability flag is kept.
+    """
+    w_local = settings.SUGGEST_MERGE_LOCAL_WEIGHT
+    top_remote = max((row.get("score") or 0 for row in remote), default=0) or 1
+    merged: Dict[str, dict] = {}
+    for row in local:
+        merged[row["domain"]] = {**row, "score": w_local * row["score"]}
+    for row in remote:
+        remote_score = (1 - w_local) * (row.get("score") or 0) / top_remote
+        seen = merged.get(row["domain"])
+        if seen is None:
+            merged[row["domain"]] = {**row, "score": remote_score, "source": "enom"}
+        else:
+            seen["score"] += remote_score
+            seen["source"] = "both"
+            if "available" in row:
+                seen["available"] = row["available"]
+    for row in merged.values():
+        row["score"] = round(row["score"], 4)
+    return heapq.nlargest(limit, merged.values(), key=lambda row: row["score"])
+
+
+def confirm(rows: List[dict], top: int) -> List[dict]:
+    """
+    Fill in "available": False for every known-taken row (local index, no Enom
+    call), then for the first `top` rows still lacking it via one batched Enom check.
+    """
+    for row in rows:
+        if "available" not in row and taken.lookup(row["domain"]) is not None:
+            row["available"] = False
+    pending = {row["domain"]: row for row in rows[:top] if "available" not in row}
+    if not pending:
+        return rows
+    for result in domains.check_many((row["sld"], row["tld"]) for row in pending.values()):
+        row = pending.get(result["domain"])
+        if row is not None and "available" in result:
+            row["available"] = result["available"]
+    return rows
@@ -0,0 +1,342 @@
+# backend/hosting/taken.py
+"""
+Known-taken domains: a memory-mapped file of domains Enom reported as
+registered, shared by every worker on the host, so lookups of names like
+google.com are answered without an Enom call.
+
+    header | Bloom filter | open-addressing table of fixed-size slots
+
+A lookup reads a few Bloom filter bits first (names never seen almost always
+stop there) and only then probes the table. The table holds the names
+themselves, so a Bloom false positive never turns into a wrong "taken".
+
+Entries not confirmed for TAKEN_INDEX_MAX_AGE seconds are ignored.
+domains.check() re-asks Enom in the background for entries older than
+TAKEN_INDEX_RECHECK_AGE, and `manage.py recheck_taken` does the same in bulk
+(from cron) and compacts the file.
+
+Writers serialize on an flock()ed sidecar file (<path>.lock). Growing and
+compacting write a new file and os.replace() it; other processes see the new
+inode within REMAP_INTERVAL seconds and map it. Disabled when
+TAKEN_INDEX_PATH is empty.
+"""
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+
+MAGIC = b"TKN1"
+HEADER = struct.Struct("<4sIIIQ")  # magic, capacity (slots), hash functions, used slots, Bloom filter bits
+HEADER_SIZE = 64
+NAME_MAX = 80  # longer names are not indexed
+SLOT = struct.Struct(f"<QII{NAME_MAX}s")  # fingerprint (0 = empty), first seen, last confirmed (0 = removed), name
+SLOT_BODY = struct.Struct(f"<II{NAME_MAX}s")
+FINGERPRINT = struct.Struct("<Q")
+STAMP = struct.Struct("<I")
+
+HASHES = 7
+BLOOM_BITS_PER_SLOT = 16  # ~21 bits per entry at MAX_LOAD: well under 0.1% false positives
+MAX_LOAD = 0.75
+REMAP_INTERVAL = 2.0  # seconds between checks for a replaced file
+TOUCH_INTERVAL = 3600  # a confirmation newer than this is not rewritten
+
+_lock = threading.RLock()  # flock() does not exclude threads sharing a descriptor
+_state = {"index": None, "pid": None, "path": None, "checked_at": 0.0}
+_stats_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "expired": 0, "writes": 0, "removals": 0, "grows": 0}
+
+
+def _count(name: str, n: int = 1) -> None:
+    with _stats_lock:
+        _stats[name] += n
+
+
+def _hashes(name: bytes) -> Tuple[int, int]:
+    digest = hashlib.blake2b(name, digest_size=16).digest()
+    return int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+
+
+class _Index:
+    """One mapping of the file; replaced as a whole when the file is."""
+
+    def __init__(self, mm: mmap.mmap, inode: Tuple[int, int]):
+        magic, self.capacity, self.hashes, _, self.bloom_bits = HEADER.unpack_from(mm, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a known-taken index file")
+        self.mm = mm
+        self.inode = inode
+        self.slots_at = HEADER_SIZE + self.bloom_bits // 8
+
+    @property
+    def used(self) -> int:
+        return HEADER.unpack_from(self.mm, 0)[3]
+
+    def _bits(self, h1: int, h2: int) -> Iterator[int]:
+        mask = self.bloom_bits - 1
+        return ((h1 + i * h2) & mask for i in range(self.hashes))
+
+    def might_contain(self, h1: int, h2: int) -> bool:
+        mm, mask = self.mm, self.bloom_bits - 1
+        for i in range(self.hashes):  # hot path: a plain loop, stopping at the first clear bit
+            bit = (h1 + i * h2) & mask
+            if not mm[HEADER_SIZE + (bit >> 3)] & (1 << (bit & 7)):
+                return False
+        return True
+
+    def find(self, name: bytes, h1: int) -> Tuple[int, bool]:
+        """(offset, found): the slot holding name, or the empty slot where it would go."""
+        mm, fingerprint, mask = self.mm, h1 or 1, self.capacity - 1
+        i = h1 & mask
+        while True:
+            offset = self.slots_at + i * SLOT.size
+            stored = FINGERPRINT.unpack_from(mm, offset)[0]
+            if stored == 0:
+                return offset, False
+            if stored == fingerprint and mm[offset + 16:offset + 16 + NAME_MAX].rstrip(b"\0") == name:
+                return offset, True
+            i = (i + 1) & mask  # never full: writers keep the load under MAX_LOAD
+
+    def stamps(self, offset: int) -> Tuple[int, int]:
+        return SLOT.unpack_from(self.mm, offset)[1:3]
+
+    def insert(self, name: bytes, h1: int, h2: int, seen: int, confirmed: int) -> None:
+        offset, found = self.find(name, h1)
+        if found:
+            if self.stamps(offset)[1] == 0:
+                STAMP.pack_into(self.mm, offset + 8, seen)
+            STAMP.pack_into(self.mm, offset + 12, confirmed)
+            return
+        # Body before fingerprint: a lock-free reader never matches a half-written slot
+        SLOT_BODY.pack_into(self.mm, offset + 8, seen, confirmed, name)
+        FINGERPRINT.pack_into(self.mm, offset, h1 or 1)
+        for bit in self._bits(h1, h2):
+            self.mm[HEADER_SIZE + (bit >> 3)] |= 1 << (bit & 7)
+        HEADER.pack_into(self.mm, 0, MAGIC, self.capacity, self.hashes, self.used + 1, self.bloom_bits)
+
+    def entries(self) -> Iterator[Tuple[str, int, int]]:
+        """(domain, first seen, last confirmed) of every entry not removed, expired or not."""
+        mm = self.mm
+        for offset in range(self.slots_at, self.slots_at + self.capacity * SLOT.size, SLOT.size):
+            fingerprint, seen, confirmed, name = SLOT.unpack_from(mm, offset)
+            if fingerprint and confirmed:
+                yield name.rstrip(b"\0").decode("ascii"), seen, confirmed
+
+
+def _open(path: str) -> _Index:
+    fd = os.open(path, os.O_RDWR)
+    try:
+        st = os.fstat(fd)
+        mm = mmap.mmap(fd, st.st_size)
+    finally:
+        os.close(fd)  # the mapping stays valid
+    return _Index(mm, (st.st_dev, st.st_ino))
+
+
+def _build(path: str, capacity: int, entries: Iterable[Tuple[str, int, int]]) -> None:
+    """Write a new index file holding entries and atomically put it at path."""
+    capacity = 1 << max(capacity - 1, 1).bit_length()  # power of two, for masking
+    bloom_bits = capacity * BLOOM_BITS_PER_SLOT
+    size = HEADER_SIZE + bloom_bits // 8 + capacity * SLOT.size
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)), suffix=".tmp")
+    try:
+        os.fchmod(fd, 0o644)
+        os.ftruncate(fd, size)
+        with mmap.mmap(fd, size) as mm:
+            HEADER.pack_into(mm, 0, MAGIC, capacity, HASHES, 0, bloom_bits)
+            index = _Index(mm, (0, 0))
+            for domain, seen, confirmed in entries:
+                name = domain.encode("ascii")
+                index.insert(name, *_hashes(name), seen, confirmed)
+            mm.flush()
+        os.replace(tmp, path)  # running workers keep their old mapping until they remap
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    finally:
+        os.close(fd)
+
+
+def _remap(path: str) -> Optional[_Index]:
+    """The index for the file currently at path (None if there is none)."""
+    with _lock:
+        _state["checked_at"], _state["path"] = time.monotonic(), path
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            _state["index"] = None
+            return None
+        index = _state["index"]
+        if index is None or index.inode != (st.st_dev, st.st_ino) or _state["pid"] != os.getpid():
+            index = _state["index"] = _open(path)  # the old mapping is unmapped once unreferenced
+            _state["pid"] = os.getpid()
+        return index
+
+
+def _current() -> Optional[_Index]:
+    """
+    The index to read, without waiting on a writer: while one in this process
+    holds the lock (queued for the flock, or growing the file) readers keep
+    the mapping they have. Never blocks beyond a stat() and mmap() of the file.
+    """
+    path = settings.TAKEN_INDEX_PATH
+    if not path:
+        return None
+    mapped = _state["pid"] == os.getpid() and _state["path"] == path
+    if mapped and time.monotonic() - _state["checked_at"] < REMAP_INTERVAL:
+        return _state["index"]
+    if not _lock.acquire(blocking=False):
+        if mapped:
+            return _state["index"]
+        _lock.acquire()
+    try:
+        return _remap(path)
+    finally:
+        _lock.release()
+
+
+@contextmanager
+def _writing() -> Iterator[_Index]:
+    """The current index, locked against writers in every process (created on first use)."""
+    path = settings.TAKEN_INDEX_PATH
+    with _lock:
+        fd = os.open(path + ".lock", os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            index = _remap(path)
+            if index is None:
+                _build(path, settings.TAKEN_INDEX_CAPACITY, [])
+                index = _remap(path)
+            yield index
+        finally:
+            os.close(fd)  # releases the flock
+
+
+def _name(domain: str) -> Optional[bytes]:
+    name = domain.strip().lower().encode("ascii", "ignore")
+    return name if 0 < len(name) <= NAME_MAX else None
+
+
+def _find(index: _Index, name: bytes) -> Optional[Tuple[int, int]]:
+    """(first seen, last confirmed) of a live entry, without locking."""
+    h1, h2 = _hashes(name)
+    if not index.might_contain(h1, h2):
+        return None
+    offset, found = index.find(name, h1)
+    if not found:
+        return None
+    seen, confirmed = index.stamps(offset)
+    return (seen, confirmed) if confirmed else None
+
+
+# ---------- Public API ----------
+
+def lookup(domain: str) -> Optional[int]:
+    """When Enom last confirmed domain as taken (unix time), or None if it is not known taken."""
+    index, name = _current(), _name(domain)
+    if index is None or name is None:
+        return None
+    entry = _find(index, name)
+    if entry is None:
+        _count("misses")
+        return None
+    if time.time() - entry[1] > settings.TAKEN_INDEX_MAX_AGE:
+        _count("expired")
+        return None
+    _count("hits")
+    return entry[1]
+
+
+def remember(domains: Iterable[str]) -> None:
+    """Record domains Enom just reported as taken."""
+    if not settings.TAKEN_INDEX_PATH:
+        return
+    now = int(time.time())
+    index = _current()
+    names = []
+    for domain in domains:
+        name = _name(domain)
+        if name is None:
+            continue
+        entry = _find(index, name) if index is not None else None
+        if entry is None or now - entry[1] > TOUCH_INTERVAL:
+            names.append(name)
+    if not names:
+        return
+    with _writing() as index:
+        for name in names:
+            if (index.used + 1) > index.capacity * MAX_LOAD:
+                index = _grow(index)
+            index.insert(name, *_hashes(name), now, now)
+    _count("writes", len(names))
+
+
+def _grow(index: _Index) -> _Index:
+    """Rebuild at twice the capacity (called with the write lock held)."""
+    path = settings.TAKEN_INDEX_PATH
+    _build(path, index.capacity * 2, list(index.entries()))
+    _count("grows")
+    return _remap(path)
+
+
+def forget(domains: Iterable[str]) -> None:
+    """Drop domains Enom just reported as available."""
+    index = _current()
+    if index is None:
+        return
+    names = [name for name in map(_name, domains) if name is not None and _find(index, name) is not None]
+    if not names:
+        return
+    with _writing() as index:
+        for name in names:
+            offset, found = index.find(name, _hashes(name)[0])
+            if found:
+                STAMP.pack_into(index.mm, offset + 12, 0)
+    _count("removals", len(names))
+
+
+def due_for_recheck(older_than: float, limit: int) -> List[str]:
+    """Up to limit domains whose last confirmation is older than older_than seconds, oldest first."""
+    index = _current()
+    if index is None:
+        return []
+    cutoff = time.time() - older_than
+    due = sorted((confirmed, domain) for domain, _, confirmed in index.entries() if confirmed < cutoff)
+    return [domain for _, domain in due[:limit]]
+
+
+def compact(capacity: Optional[int] = None) -> Tuple[int, int]:
+    """
+    Rewrite the file without removed and expired entries (which also clears
+    their Bloom filter bits). Returns (kept, dropped).
+    """
+    if not settings.TAKEN_INDEX_PATH:
+        return 0, 0
+    cutoff = time.time() - settings.TAKEN_INDEX_MAX_AGE
+    with _writing() as index:
+        kept = [entry for entry in index.entries() if entry[2] >= cutoff]
+        size = max(capacity or settings.TAKEN_INDEX_CAPACITY, int(len(kept) / MAX_LOAD) + 1)
+        _build(settings.TAKEN_INDEX_PATH, size, kept)
+        dropped = index.used - len(kept)
+        _remap(settings.TAKEN_INDEX_PATH)
+    return len(kept), dropped
+
+
+def stats() -> dict:
+    """Counters for this worker plus the shared file's size."""
+    with _stats_lock:
+        out = dict(_stats)
+    index = _current()
+    out["enabled"] = bool(settings.TAKEN_INDEX_PATH)
+    out["capacity"] = index.capacity if index is not None else 0
+    out["used_slots"] = index.used if index is not None else 0
+    return out
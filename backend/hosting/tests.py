@@ -1,3 +1,1415 @@
-from django.test import TestCase
+import asyncio
+import fcntl
+import importlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+import requests
+import stripe
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured, ValidationError
+from django.core.management import CommandError, call_command
+from django.db import DatabaseError, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from hosting_backend.bulk_sync import diff_rows, sync_rows
+
+from . import (
+    catalog, checkjobs, checks, domains, enom, enom_parse, pricing, ratelimit, resilience, searchlog, singleflight,
+    snapshots, suggest, taken, versions,
+)
+from .models import (
+    DomainCheckJob, DomainSearch, HostingPlan, Order, OrderItem, Payment, PlanSpec, TldPrice, normalize_features,
+)
+
+
+class StripeCheckoutSessionTests(TestCase):
+    url = "/api/checkout/session/"
+
+    def setUp(self):
+        self.plan = HostingPlan.objects.create(name="Starter", price="4.99", category="web", features="1 site")
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user("buyer", "buyer@example.com", "pw"))
+        patcher = mock.patch(
+            "stripe.checkout.Session.create",
+            return_value=SimpleNamespace(id="cs_test", url="https://checkout.stripe.test/cs_test"),
+        )
+        self.session_create = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _checkout(self, domains: int):
+        items = [{"item_type": "plan", "sku": f"plan_{self.plan.id}", "quantity": 1}]
+        items += [{"item_type": "domain", "sku": f"shop{i}.com", "quantity": 1} for i in range(domains)]
+        return self.client.post(self.url, {
+            "items": items,
+            "success_url": "https://example.com/done?order_id={ORDER_ID}",
+            "cancel_url": "https://example.com/cart",
+        }, format="json")
+
+    def test_query_count_does_not_grow_with_cart_size(self):
+        self._checkout(1)  # warm the plan catalog and the TLD price index
+        for domains in (1, 25):
+            with self.assertNumQueries(6):  # savepoint, order, items, release, payment, response items
+                response = self._checkout(domains)
+            self.assertEqual(response.status_code, 201)
+            order = Order.objects.get(pk=response.data["order"]["id"])
+            self.assertEqual(order.items.count(), domains + 1)
+            self.assertEqual(order.total_amount_cents, 499 + domains * 1299)
+            self.assertEqual(len(self.session_create.call_args.kwargs["line_items"]), domains + 1)
+
+    def test_stripe_error_fails_the_order(self):
+        self.session_create.side_effect = stripe.error.APIConnectionError("connection reset")
+        response = self._checkout(2)
+        self.assertEqual(response.status_code, 502)
+        self.assertIn("Payment provider error", response.data["detail"])
+        order = Order.objects.get()
+        self.assertEqual((order.status, order.items.count(), order.total_amount_cents), ("failed", 3, 499 + 2 * 1299))
+        self.assertFalse(Payment.objects.exists())
+
+    def test_failed_item_insert_rolls_the_order_back(self):
+        with mock.patch.object(OrderItem.objects, "bulk_create", side_effect=DatabaseError("disk full")), \
+                self.assertRaises(DatabaseError):
+            self._checkout(2)
+        self.assertFalse(Order.objects.exists())
+        self.session_create.assert_not_called()
+
+    def test_invalid_item_writes_nothing(self):
+        response = self.client.post(self.url, {
+            "items": [{"item_type": "domain", "sku": "shop.com"}, {"item_type": "plan", "sku": "plan_0"}],
+            "success_url": "https://example.com/done",
+            "cancel_url": "https://example.com/cart",
+        }, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(OrderItem.objects.exists())
+        self.assertFalse(Payment.objects.exists())
+        self.session_create.assert_not_called()
+
+    def test_malformed_payloads_are_rejected(self):
+        urls = {"success_url": "https://example.com/done", "cancel_url": "https://example.com/cart"}
+        for url, extra in (("/api/checkout/quote/", {}), (self.url, urls)):
+            for items in (
+                {"item_type": "domain", "sku": "shop.com"},  # a dict instead of a list
+                ["shop.com"],
+                [{"item_type": ["plan"], "sku": "plan_1"}],
+                [{"item_type": "domain", "sku": {"name": "shop.com"}}],
+            ):
+                response = self.client.post(url, {"items": items, **extra}, format="json")
+                self.assertEqual(response.status_code, 400, (url, items))
+            self.assertEqual(self.client.post(url, [{"items": []}], format="json").status_code, 400)
+        self.assertFalse(Order.objects.exists())
+        self.session_create.assert_not_called()
+
+
+@override_settings(QUOTE_TTL_SECONDS=60)
+class QuoteTests(TestCase):
+    def setUp(self):
+        self.plan = HostingPlan.objects.create(name="Starter", price="4.99", category="web", features="1 site")
+        self.items = [
+            {"item_type": "plan", "sku": f"plan_{self.plan.id}", "quantity": 2},
+            {"item_type": "domain", "sku": " Shop.COM ", "unit_amount_cents": 1},  # client amounts are ignored
+        ]
+
+    def test_build_prices_server_side(self):
+        quote = pricing.build_quote(self.items)
+        self.assertEqual([(line.sku, line.quantity, line.unit_amount_cents) for line in quote.lines],
+                         [(f"plan_{self.plan.id}", 2, 499), ("shop.com", 1, 1299)])
+        self.assertEqual(quote.total_amount_cents, 2 * 499 + 1299)
+
+    def test_unpriceable_carts(self):
+        for items, message in (
+            ([], "Cart is empty"),
+            ([{"item_type": "plan", "sku": "plan_0"}], "Unknown plan SKU"),
+            ([{"item_type": "domain", "sku": "shop.zzz"}], "No price for .zzz domains"),
+            ([{"item_type": "domain", "sku": "shop.com", "quantity": 11}], "quantity must be between 1 and 10"),
+            ([{"item_type": "gift", "sku": "x"}], "Unknown item_type"),
+        ):
+            with self.subTest(message=message), self.assertRaisesMessage(pricing.QuoteError, message):
+                pricing.build_quote(items)
+
+    def test_signed_quote_round_trip_tamper_and_expiry(self):
+        quote = pricing.build_quote(self.items)
+        token = pricing.sign_quote(quote)
+        self.assertEqual(pricing.load_quote(token), quote)
+        with self.assertRaisesMessage(pricing.QuoteError, "Invalid quote"):
+            pricing.load_quote(token + "x")
+        with mock.patch("django.core.signing.time.time", return_value=time.time() + 61):
+            with self.assertRaisesMessage(pricing.QuoteError, "Quote expired"):
+                pricing.load_quote(token)
+
+    def test_checkout_charges_the_quoted_prices(self):
+        response = APIClient().post("/api/checkout/quote/", {"items": self.items}, format="json")
+        self.assertEqual((response.status_code, response.data["total_amount_cents"]), (200, 2 * 499 + 1299))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            HostingPlan.objects.filter(pk=self.plan.pk).update(price="9.99")
+            catalog.invalidate()
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user("buyer", "buyer@example.com", "pw"))
+        urls = {"success_url": "https://example.com/done", "cancel_url": "https://example.com/cart"}
+        session = SimpleNamespace(id="cs_test", url="https://checkout.stripe.test/cs_test")
+        with mock.patch("stripe.checkout.Session.create", return_value=session):
+            quoted = client.post("/api/checkout/session/", {"quote": response.data["quote"], **urls}, format="json")
+            repriced = client.post("/api/checkout/session/", {"items": self.items, **urls}, format="json")
+        self.assertEqual(quoted.data["order"]["total_amount_cents"], 2 * 499 + 1299)  # the price the buyer saw
+        self.assertEqual(repriced.data["order"]["total_amount_cents"], 2 * 999 + 1299)
+
+
+class BulkSyncTests(TestCase):
+    def setUp(self):
+        self.plan = HostingPlan.objects.create(name="Starter", price="4.99", category="web", features="1 site")
+        PlanSpec.objects.create(plan=self.plan, label="RAM", value="1GB", order=1)
+        PlanSpec.objects.create(plan=self.plan, label="SSD", value="", order=2)
+        PlanSpec.objects.create(plan=self.plan, label="Old", value="x", order=3)
+
+    def _rows(self, **extra):
+        rows = [
+            {"plan_id": self.plan.id, "label": "RAM", "value": "2GB", "order": 1},
+            {"plan_id": self.plan.id, "label": "SSD", "value": "", "order": 2},
+            {"plan_id": self.plan.id, "label": "CPU", "value": "2 cores", "order": 4},
+            {"plan_id": self.plan.id, "label": "CPU", "value": "ignored duplicate", "order": 5},
+        ]
+        return [{**row, **extra} for row in rows]
+
+    def _specs(self):
+        return dict(PlanSpec.objects.values_list("label", "value"))
+
+    def test_diff_reads_once_and_writes_nothing(self):
+        with self.assertNumQueries(1):
+            plan = diff_rows(PlanSpec.objects.all(), self._rows(), key=("plan_id", "label"),
+                             fields=("value", "order"), delete_missing=True)
+        self.assertEqual([spec.label for spec in plan.create], ["CPU"])
+        self.assertEqual(plan.create[0].value, "2 cores")
+        self.assertEqual([spec.label for spec in plan.update], ["RAM"])
+        self.assertEqual([spec.label for spec in plan.delete], ["Old"])
+        self.assertEqual(plan.unchanged, 1)
+        self.assertEqual(plan.changes, [((self.plan.id, "RAM"), "value", "1GB", "2GB")])
+        self.assertEqual(plan.report()[0], "PlanSpec: 1 to create, 1 to update, 1 to delete, 1 unchanged")
+        self.assertEqual(self._specs(), {"RAM": "1GB", "SSD": "", "Old": "x"})
+
+    def test_fill_fields_only_fill_empty_values(self):
+        rows = [{"plan_id": self.plan.id, "label": label, "value": "new"} for label in ("RAM", "SSD")]
+        plan = sync_rows(PlanSpec.objects.all(), rows, key=("plan_id", "label"), fill_fields=("value",))
+        self.assertEqual([spec.label for spec in plan.update], ["SSD"])
+        self.assertEqual(self._specs(), {"RAM": "1GB", "SSD": "new", "Old": "x"})
+
+    def test_sync_applies_the_plan_and_dry_run_does_not(self):
+        kwargs = dict(key=("plan_id", "label"), fields=("value", "order"), delete_missing=True)
+        sync_rows(PlanSpec.objects.all(), self._rows(), dry_run=True, **kwargs)
+        self.assertEqual(self._specs(), {"RAM": "1GB", "SSD": "", "Old": "x"})
+
+        plan = sync_rows(PlanSpec.objects.all(), self._rows(), **kwargs)
+        self.assertTrue(plan.has_changes)
+        self.assertEqual(self._specs(), {"RAM": "2GB", "SSD": "", "CPU": "2 cores"})
+        self.assertFalse(sync_rows(PlanSpec.objects.all(), self._rows(), **kwargs).has_changes)
+
+
+class EnomParseTests(SimpleTestCase):
+    payloads = Path(enom_parse.__file__).resolve().parent / "enom_payloads"
+
+    def _payload(self, name: str) -> bytes:
+        return (self.payloads / name).read_bytes()
+
+    def _chunked(self, parser, body: bytes, size: int = 7) -> list:
+        rows = []
+        for i in range(0, len(body), size):
+            rows += parser.feed(body[i:i + size])
+        return rows + parser.close()
+
+    def test_check(self):
+        self.assertEqual(
+            enom_parse.check(self._payload("check.xml"), "example.com"),
+            enom_parse.CheckResult("example.com", False, "211", "Domain not available"),
+        )
+        results = enom_parse.check_many(self._payload("check_domainlist_30.xml"))
+        self.assertEqual(len(results), 30)
+        self.assertEqual(results[0], enom_parse.CheckResult("shop0.com", True, "210", "Domain available"))
+        self.assertFalse(results[1].available)
+
+    def test_errors_and_malformed_bodies_raise(self):
+        error = self._payload("error.xml")
+        for parse in (lambda body: enom_parse.check(body, "example.com"), enom_parse.check_many,
+                      enom_parse.retail_prices, enom_parse.namespinner):
+            with self.assertRaisesMessage(enom_parse.EnomResponseError, "Simulated Enom error"):
+                parse(error)
+            with self.assertRaises(enom_parse.EnomResponseError):
+                parse(b"<interface-response><ErrCount>0")
+        with self.assertRaisesMessage(enom_parse.EnomResponseError, "Bad SLD"):
+            enom_parse.name_suggestions(b"SuggestionCount=0\nErrCount=1\nErr1=Bad SLD\n")
+
+    def test_namespinner(self):
+        body = self._payload("namespinner_20.xml")
+        rows = enom_parse.namespinner(body)
+        self.assertEqual(len(rows), 80)  # 20 names x 4 TLDs
+        self.assertEqual(rows[0], enom_parse.Suggestion("coffeesite", "net", "coffeesite.net", 899, False))
+        self.assertEqual([row.score for row in rows], sorted((row.score for row in rows), reverse=True))
+        self.assertEqual({row.tld for row in enom_parse.namespinner(body, ["COM", ".tv", "com"])}, {"com", "tv"})
+        self.assertEqual(len(enom_parse.namespinner(self._payload("namespinner_100_8tlds.xml"))), 800)
+
+    def test_namespinner_odd_scores_count_as_zero(self):
+        body = (b'<interface-response><namespin><domains><domain name="Shop" com="y" comscore="n/a" '
+                b'net="n" netscore="7.5" io="y"/></domains></namespin><ErrCount>0</ErrCount></interface-response>')
+        expected = [enom_parse.Suggestion("shop", tld, f"shop.{tld}", 0, tld != "net") for tld in ("com", "net", "io")]
+        self.assertEqual(enom_parse.namespinner(body), expected)
+        self.assertEqual(self._chunked(enom_parse.NameSpinnerParser(), body), expected)
+
+    def test_namespinner_parser_streams_the_same_rows(self):
+        body = self._payload("namespinner_100_8tlds.xml")
+        streamed = self._chunked(enom_parse.NameSpinnerParser(["com", "io"]), body)
+        self.assertEqual(sorted(streamed), sorted(enom_parse.namespinner(body, ["com", "io"])))
+        with self.assertRaises(enom_parse.EnomResponseError):
+            self._chunked(enom_parse.NameSpinnerParser(), self._payload("error.xml"))
+
+    def test_name_suggestions(self):
+        rows = enom_parse.name_suggestions(self._payload("getnamesuggestions_40.txt"))
+        self.assertEqual(len(rows), 40)
+        self.assertEqual(rows[0], enom_parse.Suggestion("coffee", "com", "coffee.com", 0.938))
+        body = self._payload("getnamesuggestions_600.txt")
+        self.assertEqual(self._chunked(enom_parse.NameSuggestionsParser(), body, 13),
+                         enom_parse.name_suggestions(body))
+        self.assertEqual(len(enom_parse.name_suggestions(body)), 600)
+        unscored = enom_parse.name_suggestions("Sld1=Shop\r\nTld1=.COM\r\nSld2=x\r\n")
+        self.assertEqual(unscored, [enom_parse.Suggestion("shop", "com", "shop.com", 0.0)])
+
+    def test_retail_prices(self):
+        body = (
+            "<interface-response><TLDCount>3</TLDCount>"
+            "<TLD1>.COM</TLD1><RegisterPrice1>12.99</RegisterPrice1><RenewPrice1>14.5</RenewPrice1>"
+            "<TransferPrice1>12.99</TransferPrice1>"
+            "<TLD2>io</TLD2><RegisterPrice2>n/a</RegisterPrice2><RenewPrice2>40</RenewPrice2>"
+            "<TransferPrice2>40</TransferPrice2>"
+            "<TLD3>net</TLD3><RegisterPrice3>-1</RegisterPrice3><RenewPrice3>1</RenewPrice3>"
+            "<TransferPrice3>1</TransferPrice3><ErrCount>0</ErrCount></interface-response>"
+        )
+        self.assertEqual(enom_parse.retail_prices(body), [enom_parse.RetailPrice("com", 1299, 1450, 1299)])
+
+
+class CatalogInvalidationTests(TestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.plan = HostingPlan.objects.create(name="Starter", price="4.99", category="web", features="1 site")
+
+    def test_reads_hit_the_snapshot_until_an_edit_commits(self):
+        snap = catalog.get_snapshot()
+        with self.assertNumQueries(0):
+            self.assertIs(catalog.get_snapshot(), snap)
+            self.assertEqual(catalog.get_plan(self.plan.id).name, "Starter")
+
+        self.plan.name = "Starter Plus"
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            self.plan.save()
+        self.assertIs(catalog.get_snapshot(), snap)  # not committed yet: still the old version
+        for callback in callbacks:
+            callback()
+        self.assertNotEqual(catalog.get_version(), snap.version)
+        self.assertEqual(catalog.get_plan(self.plan.id).name, "Starter Plus")
+        self.assertIn(b"Starter Plus", catalog.plans_json("web"))
+
+    def test_spec_edits_and_rollbacks(self):
+        version = catalog.get_version()
+        try:
+            with transaction.atomic():
+                PlanSpec.objects.create(plan=self.plan, label="RAM", value="1GB")
+                raise RuntimeError("rolled back")
+        except RuntimeError:
+            pass
+        self.assertEqual(catalog.get_version(), version)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            PlanSpec.objects.create(plan=self.plan, label="RAM", value="1GB")
+        self.assertNotEqual(catalog.get_version(), version)
+        self.assertEqual([spec.label for spec in catalog.get_plan(self.plan.id).specs], ["RAM"])
+
+    def test_bulk_writes_need_an_explicit_invalidate(self):
+        catalog.get_snapshot()
+        HostingPlan.objects.filter(pk=self.plan.pk).update(name="Bulk")  # no signals, like the seed commands
+        self.assertEqual(catalog.get_plan(self.plan.id).name, "Starter")
+        with self.captureOnCommitCallbacks(execute=True):
+            catalog.invalidate()
+        self.assertEqual(catalog.get_plan(self.plan.id).name, "Bulk")
+
+    def test_plan_endpoints_answer_304_until_an_edit_commits(self):
+        urls = ("/api/plans/", "/api/plans/?category=web", f"/api/plans/{self.plan.id}/", "/api/plans/specs/",
+                "/api/plans/matrix/?category=web")
+        client = APIClient()
+        etags = [client.get(url)["ETag"] for url in urls]
+        self.assertEqual(len(set(etags)), 1)  # one catalog version
+        for url in urls:
+            self.assertEqual(client.get(url, HTTP_IF_NONE_MATCH=etags[0]).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            PlanSpec.objects.create(plan=self.plan, label="RAM", value="1GB")
+        for url in urls:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etags[0])
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response["ETag"], etags[0])
+
+    def test_process_local_cache_fails_the_deploy_check(self):
+        self.assertFalse(versions.cache_is_shared())
+        self.assertEqual([e.id for e in checks.shared_cache_check(None)], ["hosting.W001"])
+        self.assertEqual([e.id for e in checks.shared_cache_deploy_check(None)], ["hosting.E001"])
+        shared = {"default": {"BACKEND": "django.core.cache.backends.filebased.FileBasedCache", "LOCATION": "/tmp"}}
+        with override_settings(CACHES=shared):
+            self.assertEqual(checks.shared_cache_check(None), [])
+            self.assertEqual(checks.shared_cache_deploy_check(None), [])
+
+
+class SnapshotTests(TestCase):
+    def setUp(self):
+        HostingPlan.objects.create(name="Starter", price="4.99", category="web", features="1 site")
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+
+    def _edit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            catalog.bump_version()
+        return catalog.get_version()
+
+    def _versions(self):
+        return sorted(p.name for p in self.root.iterdir() if p.name.startswith(snapshots.PREFIX))
+
+    def test_build_swaps_current_and_prunes_by_swap_order(self):
+        first = snapshots.build(str(self.root), keep=2)
+        self.assertEqual((self.root / "current").resolve(), first.resolve())
+        self.assertTrue((first / "plans" / "index.web.json").is_file())
+        second = snapshots.build(str(self.root), keep=2)
+        self.assertEqual(second, first)  # same version: nothing re-rendered
+
+        self._edit()
+        second = snapshots.build(str(self.root), keep=2)
+        self._edit()
+        os.utime(first, (0, 2 ** 32))  # an old version with a newer mtime than its last swap
+        third = snapshots.build(str(self.root), keep=2)
+        self.assertEqual(self._versions(), sorted([second.name, third.name]))
+        self.assertEqual((self.root / "current").resolve(), third.resolve())
+
+    def test_an_edit_during_the_render_is_rendered_instead(self):
+        render, edited = snapshots._render, []
+
+        def render_then_edit(root_dir, snap):
+            final = render(root_dir, snap)
+            if not edited:
+                edited.append(self._edit())
+            return final
+
+        with mock.patch.object(snapshots, "_render", render_then_edit):
+            built = snapshots.build(str(self.root), keep=3)
+        self.assertEqual(built.name, f"{snapshots.PREFIX}{edited[0]}")
+        self.assertEqual(self._versions(), [built.name])  # the outdated render was never current
+        self.assertEqual((self.root / "current").resolve(), built.resolve())
+
+    def test_current_is_left_alone_while_the_catalog_keeps_changing(self):
+        before = snapshots.build(str(self.root))
+        render = snapshots._render
+
+        def render_then_edit(root_dir, snap):
+            final = render(root_dir, snap)
+            self._edit()
+            return final
+
+        with mock.patch.object(snapshots, "_render", render_then_edit):
+            self.assertEqual(snapshots.build(str(self.root)), before.resolve())
+        self.assertEqual(self._versions(), [before.name])
+
+
+class FeatureItemsTests(TestCase):
+    def test_normalize_features(self):
+        self.assertEqual(normalize_features(" SSL ;\r\n1 site;;SSL\nDaily backups \n"), ["SSL", "1 site", "Daily backups"])
+        self.assertEqual(normalize_features(""), [])
+        self.assertEqual(normalize_features(None), [])
+
+    def test_saves_keep_feature_items_in_step(self):
+        plan = HostingPlan.objects.create(name="Starter", price="4.99", category="web", features="SSL;1 site")
+        self.assertEqual(plan.feature_items, ["SSL", "1 site"])
+        plan.features = "SSL\nEmail"
+        plan.save(update_fields=["features"])
+        plan.refresh_from_db()
+        self.assertEqual(plan.feature_list(), ["SSL", "Email"])
+
+    def test_clean_rejects_empty_and_overlong_features(self):
+        for features in (" ; \n", "x" * 121):
+            with self.subTest(features=features[:10]), self.assertRaises(ValidationError):
+                HostingPlan(name="Starter", price="4.99", category="web", features=features).clean()
+
+    def test_migration_fills_existing_rows(self):
+        migration = importlib.import_module("hosting.migrations.0006_hostingplan_feature_items")
+        texts = ["SSL;1 site", " A \r\n\nB;A ", ""]
+        for text in texts:
+            HostingPlan.objects.create(name="Plan", price="1.00", category="web", features=text)
+        HostingPlan.objects.update(feature_items=[])  # as before the migration
+        migration.fill_feature_items(apps, None)
+        self.assertEqual(list(HostingPlan.objects.order_by("id").values_list("feature_items", flat=True)),
+                         [normalize_features(text) for text in texts])
+
+
+class PlanMatrixTests(TestCase):
+    def _plan(self, id, specs):
+        return catalog.PlanDTO(id, f"Plan {id}", Decimal("4.5"), "monthly", "web", id == 2, (),
+                               tuple(catalog.SpecDTO(label, value, icon, order) for label, value, icon, order in specs))
+
+    def test_labels_are_deduped_in_display_order(self):
+        plans = [
+            self._plan(1, [("SSD", "10GB", "text", 2), ("Sites", "1", "text", 1)]),
+            self._plan(2, [("Sites", "5", "text", 1), ("SSL", "", "check", 2), ("Backups", "", "times", 0)]),
+        ]
+        matrix = catalog.build_matrix("web", plans)
+        self.assertEqual(matrix["labels"], ["Backups", "Sites", "SSD", "SSL"])  # SSD seen before SSL at order 2
+        self.assertEqual(matrix["cells"], [
+            [None, ["text", "1"], ["text", "10GB"], None],
+            [["times", ""], ["text", "5"], None, ["check", ""]],
+        ])
+        self.assertEqual(matrix["plans"][1], {"id": 2, "name": "Plan 2", "price": "4.50", "billing_cycle": "monthly",
+                                              "is_popular": True})
+        empty = catalog.build_matrix("email", [])
+        self.assertEqual(empty, {"category": "email", "labels": [], "plans": [], "cells": []})
+
+    def test_endpoint_serves_the_matrix_per_category(self):
+        plan = HostingPlan.objects.create(name="Starter", price="4.99", category="web", features="1 site")
+        PlanSpec.objects.create(plan=plan, label="RAM", value="1GB", order=1)
+        HostingPlan.objects.create(name="Mail", price="1.00", category="email", features="1 inbox")
+        response = APIClient().get("/api/plans/matrix/?category=web")
+        self.assertEqual(response.json(), {
+            "category": "web", "labels": ["RAM"], "cells": [[["text", "1GB"]]],
+            "plans": [{"id": plan.id, "name": "Starter", "price": "4.99", "billing_cycle": "monthly",
+                       "is_popular": False}],
+        })
+        self.assertEqual(APIClient().get("/api/plans/matrix/?category=woocommerce").json()["plans"], [])
+
+
+class BenchCommandTests(TestCase):
+    def test_bench_catalog_rejects_unknown_categories(self):
+        with self.assertRaisesMessage(CommandError, "Unknown category 'webb'"):
+            call_command("bench_catalog", category="webb", stdout=io.StringIO())
+
+        HostingPlan.objects.create(name="Starter", price="4.99", category="web", features="1 site")
+        stdout = io.StringIO()
+        call_command("bench_catalog", category="email", iterations=2, stdout=stdout)
+        self.assertIn("0 plans, 2 iterations", stdout.getvalue())
+        self.assertIn("identical to serializer output: True", stdout.getvalue())
+
+    def test_bench_domain_leaves_shared_state_alone(self):
+        with tempfile.TemporaryDirectory() as tmp, override_settings(
+            TAKEN_INDEX_PATH=f"{tmp}/taken", ENOM_RATE_STATE_PATH=f"{tmp}/ratelimit", SEARCH_LOG=True,
+        ):
+            base_url = settings.ENOM_BASE_URL
+            cache.set("bench:sentinel", 1)
+            self.addCleanup(cache.clear)
+            recorded, stdout = searchlog.stats()["recorded"], io.StringIO()
+            call_command("bench_domain", routes="check", requests=4, concurrency=2, latency="fixed:0", seed=1,
+                         stdout=stdout)
+            self.assertRegex(stdout.getvalue(), r"check .* 200: 4")
+            self.assertEqual(cache.get("bench:sentinel"), 1)
+            self.assertEqual(os.listdir(tmp), [])
+            self.assertEqual(settings.ENOM_BASE_URL, base_url)
+            self.assertEqual(searchlog.stats()["recorded"], recorded)
+            taken._state.update(index=None, path=None)
+
+
+@override_settings(
+    ENOM_BREAKER_WINDOW_SECONDS=30, ENOM_BREAKER_MIN_CALLS=4, ENOM_BREAKER_FAILURE_RATE=0.5,
+    ENOM_BREAKER_SLOW_CALL_SECONDS=2, ENOM_BREAKER_SLOW_RATE=0.75, ENOM_BREAKER_OPEN_SECONDS=10,
+    ENOM_BREAKER_HALF_OPEN_CALLS=1,
+)
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch("hosting.resilience.time.monotonic", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = resilience.CircuitBreaker("enom")
+
+    def _call(self, failed=False, elapsed=0.1):
+        probe = self.breaker.acquire()
+        self.breaker.release(probe, failed, elapsed)
+        return probe
+
+    def _trip(self):
+        for failed in (False, False, True, True):
+            self._call(failed)
+        self.assertEqual(self.breaker.state, resilience.OPEN)
+
+    def test_opens_on_failure_rate_once_the_window_has_enough_calls(self):
+        for _ in range(3):
+            self._call(failed=True)
+        self.assertEqual(self.breaker.state, resilience.CLOSED)  # below ENOM_BREAKER_MIN_CALLS
+        self._call(failed=True)
+        self.assertEqual(self.breaker.state, resilience.OPEN)
+        with self.assertRaises(resilience.CircuitOpenError):
+            self.breaker.acquire()
+        self.assertEqual(self.breaker.snapshot()["rejected"], 1)
+
+    def test_old_outcomes_leave_the_window(self):
+        for _ in range(2):
+            self._call(failed=True)
+        self.now += 31
+        for _ in range(3):
+            self._call()
+        self._call(failed=True)  # 1 failure in 4 calls within the window
+        self.assertEqual(self.breaker.state, resilience.CLOSED)
+
+    def test_opens_on_slow_call_rate(self):
+        for _ in range(3):
+            self._call(elapsed=2.5)
+        self._call()
+        self.assertEqual(self.breaker.state, resilience.OPEN)
+
+    def test_half_open_probe_closes_or_reopens(self):
+        self._trip()
+        self.now += 10
+        self.assertEqual(self.breaker.state, resilience.HALF_OPEN)
+        self.assertTrue(self.breaker.acquire())
+        with self.assertRaises(resilience.CircuitOpenError):
+            self.breaker.acquire()  # one probe at a time
+        self.breaker.release(True, True, 0.1)
+        self.assertEqual(self.breaker.state, resilience.OPEN)
+        self.assertEqual(self.breaker.snapshot()["opened"], 2)
+
+        self.now += 10
+        self.assertTrue(self._call(elapsed=0.1))
+        self.assertEqual(self.breaker.state, resilience.CLOSED)
+        self.assertEqual(self.breaker.snapshot()["window_calls"], 0)
+
+    def test_abandoned_probe_frees_its_slot(self):
+        self._trip()
+        self.now += 10
+        self.breaker.abandon(self.breaker.acquire())
+        self.assertTrue(self.breaker.acquire())
+
+    def test_calls_started_before_opening_are_ignored(self):
+        started = self.breaker.acquire()
+        self._trip()
+        self.breaker.release(started, False, 0.1)
+        self.assertEqual(self.breaker.state, resilience.OPEN)
+
+
+@override_settings(ENOM_COALESCE_SHARED=True, ENOM_COALESCE_RESULT_TTL=2, ENOM_COALESCE_LOCK_TTL=1, ENOM_COALESCE_POLL=0.01)
+class SingleFlightTests(SimpleTestCase):
+    """Each SingleFlight stands for one worker; they only meet through the cache."""
+
+    key = "test:flight"
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.shared = []
+        self.calls = 0
+
+    def _worker(self):
+        return singleflight.SingleFlight(lambda: 5, self.shared.append)
+
+    def _aworker(self):
+        return singleflight.AsyncSingleFlight(lambda: 5, self.shared.append)
+
+    def _fail(self):
+        self.calls += 1
+        raise resilience.CircuitOpenError("enom circuit open")
+
+    def _succeed(self):
+        self.calls += 1
+        return "<xml/>"
+
+    async def _afail(self):
+        return self._fail()
+
+    def test_result_is_shared_across_workers(self):
+        self.assertEqual(self._worker().do(self.key, self._succeed), "<xml/>")
+        self.assertEqual(self._worker().do(self.key, self._succeed), "<xml/>")
+        self.assertEqual((self.calls, self.shared), (1, ["shared"]))
+
+    def test_leader_failure_is_raised_by_followers(self):
+        for _ in range(2):
+            with self.assertRaisesMessage(resilience.CircuitOpenError, "enom circuit open"):
+                self._worker().do(self.key, self._fail)
+        self.assertEqual((self.calls, self.shared), (1, ["shared"]))
+        self.assertIsNone(cache.get(f"{self.key}:lock"))
+
+    def test_async_leader_failure_is_raised_by_followers(self):
+        async def run():
+            for _ in range(2):
+                with self.assertRaises(resilience.CircuitOpenError):
+                    await self._aworker().do(self.key, self._afail)
+
+        asyncio.run(run())
+        self.assertEqual((self.calls, self.shared), (1, ["shared"]))
+
+    def test_unshareable_failures_are_not_published(self):
+        class Unpicklable(Exception):
+            def __init__(self):
+                super().__init__(lambda: None)
+
+        def fail():
+            raise Unpicklable()
+
+        with self.assertRaises(Unpicklable):
+            self._worker().do(self.key, fail)
+        self.assertIsNone(cache.get(f"{self.key}:result"))
+
+    def test_dead_leaders_lock_lapses(self):
+        hung = threading.Event()
+        with mock.patch.object(singleflight, "_keeper"):  # the leader's worker no longer renews its lock
+            leader = threading.Thread(target=self._worker().do, args=(self.key, hung.wait))
+            leader.start()
+            self.addCleanup(leader.join)
+            self.addCleanup(hung.set)
+            while cache.get(f"{self.key}:lock") is None:
+                time.sleep(0.01)
+            started = time.monotonic()
+            self.assertEqual(self._worker().do(self.key, self._succeed), "<xml/>")
+        self.assertLess(time.monotonic() - started, 3)  # ENOM_COALESCE_LOCK_TTL, not the 5s call bound
+
+    def test_live_leaders_lock_is_kept(self):
+        def slow():
+            time.sleep(1.5)  # past ENOM_COALESCE_LOCK_TTL
+            return cache.get(f"{self.key}:lock")
+
+        self.assertEqual(self._worker().do(self.key, slow), 1)
+
+
+@override_settings(ENOM_MERGE_SPINNER_WEIGHT=0.5)
+class SuggestionsTests(SimpleTestCase):
+    spins = [
+        {"domain": "shop.com", "score": 10, "available": True},
+        {"domain": "shopping.com", "score": 5, "available": False},
+    ]
+    names = [{"domain": "shop.com", "score": 0.5}, {"domain": "shopnow.com", "score": 1.0}]
+
+    def test_merge_scales_weights_and_combines(self):
+        rows = domains._merge_suggestions(self.spins, self.names, 10)
+        self.assertEqual([(r["domain"], r["score"], r["source"]) for r in rows], [
+            ("shop.com", 0.75, "both"), ("shopnow.com", 0.5, "getnamesuggestions"),
+            ("shopping.com", 0.25, "namespinner"),
+        ])
+        self.assertTrue(rows[0]["available"])
+
+    def test_merge_limit_and_ties_prefer_shorter_names(self):
+        names = [{"domain": "shopnow.com", "score": 1.0}, {"domain": "shop.io", "score": 1.0}]
+        self.assertEqual([r["domain"] for r in domains._merge_suggestions([], names, 1)], ["shop.io"])
+        self.assertEqual(domains._merge_suggestions([], [], 5), [])
+
+    def test_namespinner_runs_outside_the_bulk_pool(self):
+        threads = []
+
+        def spin(params):
+            threads.append(threading.current_thread().name)
+            return self.spins
+
+        with mock.patch.object(domains, "namespinner", spin), \
+                mock.patch.object(domains, "name_suggestions", return_value=self.names), \
+                mock.patch.object(domains, "_get_fanout_pool", side_effect=AssertionError("bulk pool used")):
+            rows, errors = domains.suggestions({}, {}, 10)
+        self.assertEqual((len(rows), errors), (3, {}))
+        self.assertTrue(threads[0].startswith("enom-suggest"))
+
+    def test_one_failed_command_is_reported_both_raise(self):
+        failed = domains.UpstreamError("Upstream error contacting Enom: timeout", transient=True)
+        with mock.patch.object(domains, "namespinner", side_effect=failed), \
+                mock.patch.object(domains, "name_suggestions", return_value=self.names):
+            rows, errors = domains.suggestions({}, {}, 10)
+        self.assertEqual(([r["domain"] for r in rows], list(errors)), (["shopnow.com", "shop.com"], ["namespinner"]))
+        with mock.patch.object(domains, "namespinner", side_effect=failed), \
+                mock.patch.object(domains, "name_suggestions", side_effect=failed):
+            with self.assertRaises(domains.UpstreamError):
+                domains.suggestions({}, {}, 10)
+
+
+@override_settings(ENOM_CACHE_STALE_TTL=600, ENOM_CACHE_ERROR_TTL=30)
+class ResultsCacheTests(SimpleTestCase):
+    params = {"command": "NameSpinner", "SLD": "shop", "TLDList": "com,net"}
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.now = 1000.0
+        for patcher in (
+            mock.patch("hosting.domains.time.time", lambda: self.now),
+            mock.patch.object(domains, "_refresh_pool", SimpleNamespace(submit=lambda fn, *args: fn(*args))),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.answers = []
+
+    def _fetch(self):
+        answer = self.answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    def _get(self, params=None):
+        return domains.cached(params or self.params, self._fetch, lambda value: 60)
+
+    def test_fresh_entries_are_served_without_a_call(self):
+        self.answers = [["shop.com"]]
+        self.assertEqual(self._get(), ["shop.com"])
+        self.assertEqual(self._get({"command": "namespinner", "SLD": " SHOP", "TLDList": "net, com"}), ["shop.com"])
+        self.assertEqual(self.answers, [])
+
+    def test_stale_entries_are_served_while_refreshing(self):
+        self.answers = [["old.com"], ["new.com"]]
+        self._get()
+        self.now += 61
+        self.assertEqual(self._get(), ["old.com"])  # served stale, refreshed behind it
+        self.assertEqual(self._get(), ["new.com"])
+        self.assertIsNone(cache.get(domains.cache_key(self.params) + ":refresh"))
+
+    def test_enom_errors_are_cached_briefly(self):
+        self.answers = [domains.UpstreamError("Enom says no"), ["late.com"]]
+        for _ in range(2):
+            with self.assertRaisesMessage(domains.UpstreamError, "Enom says no") as raised:
+                self._get()
+            self.assertFalse(raised.exception.transient)
+        self.assertEqual(len(self.answers), 1)
+        entry = cache.get(domains.cache_key(self.params))
+        self.assertEqual(entry["fresh_until"], self.now + 30)
+
+    def test_calls_refused_before_sending_are_not_cached(self):
+        for refusal in (resilience.CircuitOpenError("open"), ratelimit.RateLimitedError("no token")):
+            try:
+                raise domains.UpstreamError("Upstream error contacting Enom", transient=True) from refusal
+            except domains.UpstreamError as e:
+                self.answers = [e, ["shop.com"]]
+            with self.assertRaises(domains.UpstreamError):
+                self._get()
+            self.assertEqual(self._get(), ["shop.com"])
+            cache.clear()
+
+    def test_async_entries_match(self):
+        async def fetch():
+            return self._fetch()
+
+        self.answers = [domains.UpstreamError("Enom timed out", transient=True)]
+        for _ in range(2):
+            with self.assertRaises(domains.UpstreamError) as raised:
+                asyncio.run(domains.acached(self.params, fetch, lambda value: 60))
+            self.assertTrue(raised.exception.transient)
+        with self.assertRaises(domains.UpstreamError):
+            self._get()  # the sync path reads the same entry
+
+
+@override_settings(ENOM_CHECK_BATCH=30, ENOM_BULK_MAX_DOMAINS=5, TAKEN_INDEX_PATH="", SEARCH_LOG=False)
+class BulkCheckTests(TestCase):
+    url = "/api/domain/check/bulk/"
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        body = (Path(enom_parse.__file__).resolve().parent / "enom_payloads" / "check_domainlist_30.xml").read_bytes()
+
+        def upstream(params, response_type, error_prefix):
+            if "DomainList" in params:
+                return body
+            raise domains.UpstreamError(f"{error_prefix}: timed out", transient=True)
+
+        patcher = mock.patch.object(domains, "_upstream", side_effect=upstream)
+        self.upstream = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _lines(self, names):
+        response = APIClient().post(self.url, {"domains": names}, format="json")
+        self.assertEqual((response.status_code, response["Content-Type"]), (200, "application/x-ndjson"))
+        return [json.loads(line) for line in b"".join(response.streaming_content).splitlines()]
+
+    def test_one_line_per_domain(self):
+        lines = self._lines(["shop0.com", "SHOP1.com", "not a domain", "shop99.com", "shop0.com"])
+        self.assertEqual(lines, [
+            {"domain": "not a domain", "error": "Invalid domain format"},
+            {"domain": "shop0.com", "available": True, "code": "210", "text": "Domain available"},
+            {"domain": "shop1.com", "available": False, "code": "211", "text": "Domain not available"},
+            {"domain": "shop99.com", "error": "Upstream error contacting Enom: timed out", "retry": True},
+        ])
+        self.assertEqual(self.upstream.call_count, 2)  # one DomainList call, one single check for the gap
+
+    def test_cached_answers_skip_enom(self):
+        self._lines(["shop0.com", "shop1.com"])
+        self.upstream.reset_mock()
+        self.assertEqual([line["domain"] for line in self._lines(["shop1.com", "shop0.com"])], ["shop1.com", "shop0.com"])
+        self.upstream.assert_not_called()
+
+    def test_limits(self):
+        response = APIClient().post(self.url, {"domains": [f"shop{i}.com" for i in range(6)]}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(APIClient().post(self.url, {"domains": "shop0.com"}, format="json").status_code, 400)
+
+
+@override_settings(TAKEN_INDEX_PATH="", SEARCH_LOG=False)
+class SuggestionStreamTests(TestCase):
+    url = "/api/domain/suggest/stream/?q=coffee.com"
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.body = (Path(enom_parse.__file__).resolve().parent / "enom_payloads" / "namespinner_20.xml").read_bytes()
+
+    def _chunks(self, fail=False):
+        half = len(self.body) // 2
+        yield self.body[:half]
+        if fail:
+            raise requests.ConnectionError("connection reset")
+        yield self.body[half:]
+
+    def _get(self, url, chunks):
+        with mock.patch("hosting.enom.stream", return_value=chunks) as stream:
+            response = self.client.get(url)
+            content = b"".join(response.streaming_content) if response.streaming else response.content
+        return response, content, stream
+
+    def test_ndjson_rows_carry_prices(self):
+        response, content, _ = self._get(self.url, self._chunks())
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(rows), 80)
+        com = next(row for row in rows if row["tld"] == "com")
+        self.assertEqual(com["price_cents"], pricing.tld_prices()["com"])
+
+        # The complete answer was cached: the next request replays it without Enom
+        response, content, stream = self._get(self.url, iter(()))
+        self.assertEqual(len(content.splitlines()), 80)
+        stream.assert_not_called()
+
+    def test_sse_ends_with_done(self):
+        response, content, _ = self._get(self.url + "&format=sse", self._chunks())
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        events = content.split(b"\n\n")[:-1]
+        self.assertEqual(len(events), 81)
+        self.assertTrue(all(event.startswith(b"event: suggestion\n") for event in events[:-1]))
+        self.assertEqual(events[-1], b'event: done\ndata: {"count":80}')
+
+    def test_mid_stream_failure_is_a_last_error_row(self):
+        response, content, _ = self._get(self.url, self._chunks(fail=True))
+        lines = [json.loads(line) for line in content.splitlines()]
+        self.assertTrue(lines[:-1] and all("sld" in line for line in lines[:-1]))
+        self.assertEqual(lines[-1], {"error": "Upstream error contacting Enom: connection reset"})
+
+    def test_failure_before_the_first_row_is_a_502(self):
+        def chunks():
+            raise requests.ConnectionError("connection refused")
+            yield b""
+
+        response, _, _ = self._get(self.url, chunks())
+        self.assertEqual(response.status_code, 502)
+
+
+class LocalSuggestTests(SimpleTestCase):
+    index = suggest.WordIndex.build(suggest.WORDS)
+
+    def test_segment(self):
+        self.assertEqual(self.index.segment("bestcoffeeshop"), ["best", "coffee", "shop"])
+        self.assertEqual(self.index.segment("zqxcoffee"), ["zqx", "coffee"])
+        self.assertEqual(self.index.segment(""), [])
+
+    def test_tokens(self):
+        self.assertEqual(suggest.tokens("Best-Coffee-shop.com", self.index), ["best", "coffee", "shop"])
+        self.assertEqual(sum(map(len, suggest.tokens("coffee" * 50, self.index))), suggest.MAX_SLD_LENGTH)
+
+    def test_suggest_ranks_and_filters(self):
+        rows = suggest.suggest("bestcoffee.com", ["com", "tv"], limit=50, index=self.index)
+        self.assertEqual(rows[0], {"sld": "bestcoffee", "tld": "com", "domain": "bestcoffee.com", "score": 0.9091,
+                                   "source": "local"})
+        domains_ = [row["domain"] for row in rows]
+        self.assertEqual(len(domains_), len(set(domains_)))
+        self.assertIn("best-coffee.com", domains_)
+        self.assertNotIn("best-coffee.tv", domains_)  # no hyphens on .tv
+        self.assertIn("topcoffee.com", domains_)
+        self.assertEqual(rows, sorted(rows, key=lambda row: (-row["score"], len(row["domain"]))))
+        self.assertEqual(len(suggest.suggest("bestcoffee.com", ["com", "tv"], limit=3, index=self.index)), 3)
+
+    def test_suggest_reuses_known_words_and_finds_hacks(self):
+        with mock.patch.object(suggest, "tokens") as tokens:
+            rows = suggest.suggest("ignored", ["ly"], limit=50, index=self.index, words=["bitly"])
+        tokens.assert_not_called()
+        self.assertIn({"sld": "bit", "tld": "ly", "domain": "bit.ly", "score": 0.63, "source": "local"}, rows)
+        self.assertEqual(suggest.suggest("...", ["com"], index=self.index), [])
+
+    @override_settings(SUGGEST_MERGE_LOCAL_WEIGHT=0.5)
+    def test_merge(self):
+        local = [{"domain": "shop.com", "sld": "shop", "tld": "com", "score": 1.0, "source": "local"},
+                 {"domain": "shop.io", "sld": "shop", "tld": "io", "score": 0.2, "source": "local"}]
+        remote = [{"domain": "shop.com", "sld": "shop", "tld": "com", "score": 50, "available": False},
+                  {"domain": "store.com", "sld": "store", "tld": "com", "score": 100, "available": True}]
+        self.assertEqual(suggest.merge(local, remote, limit=3), [
+            {"domain": "shop.com", "sld": "shop", "tld": "com", "score": 0.75, "source": "both", "available": False},
+            {"domain": "store.com", "sld": "store", "tld": "com", "score": 0.5, "available": True, "source": "enom"},
+            {"domain": "shop.io", "sld": "shop", "tld": "io", "score": 0.1, "source": "local"},
+        ])
+        self.assertEqual([row["domain"] for row in suggest.merge(local, [], limit=1)], ["shop.com"])
+        self.assertEqual(local[0]["score"], 1.0)  # inputs are not modified
+
+
+class TakenIndexTests(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        overrides = override_settings(TAKEN_INDEX_PATH=f"{tmp.name}/taken", TAKEN_INDEX_CAPACITY=8,
+                                      TAKEN_INDEX_MAX_AGE=1000)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.addCleanup(taken._state.update, index=None, path=None, pid=None, checked_at=0.0)
+        self.now = 1_700_000_000
+        patcher = mock.patch("hosting.taken.time.time", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_remember_and_lookup(self):
+        taken.remember(["Google.com", "x" * 90 + ".com"])
+        self.assertEqual(taken.lookup("google.com"), self.now)
+        self.assertIsNone(taken.lookup("bing.com"))
+        self.assertIsNone(taken.lookup("x" * 90 + ".com"))  # too long to index
+        self.assertEqual(taken.stats()["used_slots"], 1)
+
+        # A recent confirmation is not rewritten; an old one is
+        writes = taken.stats()["writes"]
+        self.now += 60
+        taken.remember(["google.com"])
+        self.assertEqual(taken.stats()["writes"], writes)
+        self.now += taken.TOUCH_INTERVAL
+        taken.remember(["google.com"])
+        self.assertEqual(taken.lookup("google.com"), self.now)
+
+    def test_forget_leaves_a_tombstone(self):
+        taken.remember(["google.com", "bing.com"])
+        taken.forget(["google.com", "never-seen.com"])
+        self.assertIsNone(taken.lookup("google.com"))
+        self.assertIsNotNone(taken.lookup("bing.com"))
+        self.assertEqual(taken.stats()["used_slots"], 2)  # the slot keeps later probes intact
+
+        taken.remember(["google.com"])  # revived in place
+        self.assertEqual(taken.lookup("google.com"), self.now)
+        self.assertEqual(taken.stats()["used_slots"], 2)
+
+    def test_grows_past_the_load_factor(self):
+        names = [f"shop{i}.com" for i in range(20)]
+        grows = taken.stats()["grows"]
+        taken.remember(names[:3])
+        taken.remember(names[3:])
+        stats = taken.stats()
+        self.assertEqual((stats["capacity"], stats["used_slots"]), (32, 20))
+        self.assertEqual(stats["grows"] - grows, 2)
+        self.assertTrue(all(taken.lookup(name) == self.now for name in names))
+
+    def test_expiry_recheck_and_compact(self):
+        taken.remember(["old.com", "gone.com"])
+        taken.forget(["gone.com"])
+        self.now += 600
+        taken.remember(["new.com"])
+        self.assertEqual(taken.due_for_recheck(300, 10), ["old.com"])
+
+        self.now += 600
+        self.assertIsNone(taken.lookup("old.com"))  # unconfirmed for longer than TAKEN_INDEX_MAX_AGE
+        self.assertEqual(taken.compact(), (1, 2))
+        self.assertEqual(taken.lookup("new.com"), self.now - 600)
+        self.assertEqual(taken.stats()["used_slots"], 1)
+
+    @override_settings(TAKEN_INDEX_PATH="")
+    def test_disabled(self):
+        taken.remember(["google.com"])
+        self.assertIsNone(taken.lookup("google.com"))
+        self.assertEqual(taken.compact(), (0, 0))
+
+
+@override_settings(SEARCH_LOG=True, SEARCH_LOG_BATCH=3, SEARCH_LOG_BUFFER_MAX=4)
+class SearchLogTests(TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(searchlog, "_ensure_flusher")  # flush() is called directly instead
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        searchlog._buffer.clear()
+        self.addCleanup(searchlog._buffer.clear)
+        searchlog._wake.clear()
+        self.addCleanup(searchlog._wake.clear)
+
+    def test_record_buffers_until_flush(self):
+        searchlog.record("check", " Coffee ", ".COM")
+        searchlog.record("suggest", "not a label")
+        searchlog.record("suggest", "coffee")
+        self.assertFalse(DomainSearch.objects.exists())
+        self.assertEqual(searchlog.stats()["buffered"], 2)
+
+        self.assertEqual(searchlog.flush(), 2)
+        self.assertEqual(list(DomainSearch.objects.order_by("id").values_list("kind", "sld", "tld")),
+                         [("check", "coffee", "com"), ("suggest", "coffee", "")])
+        self.assertEqual(searchlog.flush(), 0)
+
+    def test_full_batch_wakes_the_writer_and_overflow_drops_the_oldest(self):
+        dropped = searchlog.stats()["dropped"]
+        for i in range(2):
+            searchlog.record("check", f"shop{i}", "com")
+        self.assertFalse(searchlog._wake.is_set())
+        for i in range(2, 6):
+            searchlog.record("check", f"shop{i}", "com")
+        self.assertTrue(searchlog._wake.is_set())
+        self.assertEqual(searchlog.stats()["dropped"] - dropped, 2)
+        searchlog.flush()
+        self.assertEqual(sorted(DomainSearch.objects.values_list("sld", flat=True)), [f"shop{i}" for i in range(2, 6)])
+
+    def test_failed_write_is_dropped(self):
+        searchlog.record("check", "coffee", "com")
+        failed = searchlog.stats()["failed_batches"]
+        with mock.patch.object(DomainSearch.objects, "bulk_create", side_effect=RuntimeError("db down")), \
+                self.assertLogs("hosting.searchlog", "ERROR"):
+            self.assertEqual(searchlog.flush(), 0)
+        self.assertEqual(searchlog.stats()["failed_batches"] - failed, 1)
+        self.assertEqual(searchlog.stats()["buffered"], 0)
+
+    @override_settings(SEARCH_LOG=False)
+    def test_disabled(self):
+        searchlog.record("check", "coffee", "com")
+        self.assertEqual(searchlog.stats()["buffered"], 0)
+
+    def test_trending(self):
+        now = timezone.now()
+        rows = [("check", "coffee", now), ("suggest", "coffee", now), ("check", "tea", now),
+                ("check", "tea", now - timedelta(hours=1)), ("check", "tea", now - timedelta(hours=30)),
+                ("suggest", "cake", now)]
+        DomainSearch.objects.bulk_create(DomainSearch(kind=kind, sld=sld, created_at=at) for kind, sld, at in rows)
+        self.assertEqual(searchlog.trending(24, 10), [("coffee", 2), ("tea", 2), ("cake", 1)])
+        self.assertEqual(searchlog.trending(24, 1, kinds=["check"]), [("tea", 2)])
+        self.assertEqual(searchlog.trending(0.5, 10, kinds=["check"]), [("coffee", 1), ("tea", 1)])
+
+
+@override_settings(DOMAIN_PRICES_CENTS={"com": 1299, "net": 1499})
+class TldPriceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def test_loaded_once_per_version(self):
+        TldPrice.objects.create(tld="io", register_cents=4999, renew_cents=4999, transfer_cents=4999)
+        with self.captureOnCommitCallbacks(execute=True):
+            pass
+        with self.assertNumQueries(1):
+            prices = pricing.tld_prices()
+            self.assertIs(pricing.tld_prices(), prices)
+        self.assertEqual(dict(prices), {"com": 1299, "net": 1499, "io": 4999})
+        self.assertEqual(asyncio.run(pricing.atld_prices()), prices)
+
+    def test_edits_reload_after_commit(self):
+        prices = pricing.tld_prices()
+        with self.captureOnCommitCallbacks(execute=True):
+            TldPrice.objects.create(tld="com", register_cents=999, renew_cents=1599, transfer_cents=999)
+            self.assertEqual(pricing.tld_prices()["com"], 1299)  # not before the commit
+        self.assertEqual(pricing.tld_prices()["com"], 999)
+        self.assertEqual(prices["com"], 1299)  # a mapping handed out earlier is never changed
+
+        # Another process bumping the shared version is enough
+        with self.captureOnCommitCallbacks(execute=True):
+            TldPrice.objects.filter(tld="com").update(register_cents=1099)
+            versions.bump(pricing.PRICES_VERSION_CACHE_KEY)
+        self.assertEqual(pricing.tld_prices()["com"], 1099)
+
+    def test_refresh_command_keeps_prices_of_failed_batches(self):
+        TldPrice.objects.create(tld="io", register_cents=4999, renew_cents=4999, transfer_cents=4999)
+
+        def retail_prices(batch):
+            if "io" in batch:
+                raise domains.UpstreamError("Upstream error contacting Enom: timed out", transient=True)
+            return [enom_parse.RetailPrice(tld, 1000, 1100, 1200) for tld in batch]
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        with mock.patch.object(domains, "retail_prices", side_effect=retail_prices) as fetch, \
+                self.captureOnCommitCallbacks(execute=True), self.assertRaisesMessage(CommandError, "1 TLDs"):
+            call_command("refresh_tld_prices", batch=1, workers=2, stdout=stdout, stderr=stderr)
+        self.assertEqual(sorted(call.args[0] for call in fetch.call_args_list), [["com"], ["io"], ["net"]])
+        self.assertEqual(dict(TldPrice.objects.values_list("tld", "register_cents")),
+                         {"com": 1000, "io": 4999, "net": 1000})
+        self.assertEqual(dict(pricing.tld_prices()), {"com": 1000, "io": 4999, "net": 1000})
+        self.assertIn("Refreshed 2 of 3 TLDs in 3 calls", stdout.getvalue())
+        self.assertIn("io: Upstream error", stderr.getvalue())
+
+
+class EnomStreamTests(SimpleTestCase):
+    def setUp(self):
+        self.release = threading.Event()
+        release = self.release
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                self.send_response(200)
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for part in (b"<first/>", b"<second/>"):
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(part), part))
+                    self.wfile.flush()
+                    release.wait(5)  # the second part only once the first was read
+                self.wfile.write(b"0\r\n\r\n")
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.addCleanup(self.release.set)
+        overrides = override_settings(ENOM_BASE_URL=f"http://127.0.0.1:{server.server_port}")
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        for patcher in (mock.patch.object(enom, "breaker"), mock.patch.object(enom.ratelimit, "acquire")):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_yields_each_part_as_it_arrives(self):
+        chunks = enom.stream({"command": "NameSpinner"})
+        self.assertEqual(next(chunks), b"<first/>")  # would block until the end on a full-chunk read
+        self.release.set()
+        self.assertEqual(b"".join(chunks), b"<second/>")
+        enom.breaker.release.assert_called_once_with(mock.ANY, False, mock.ANY)
+
+
+class AsyncEnomTests(SimpleTestCase):
+    def test_any_error_frees_the_breaker_slot(self):
+        session = mock.Mock()
+        session.get.side_effect = ValueError("not a response")
+        with mock.patch.object(enom, "breaker") as breaker, \
+                mock.patch.object(enom, "get_async_session", return_value=session):
+            breaker.acquire.return_value = True  # a half-open probe
+            with self.assertRaises(ValueError):
+                asyncio.run(enom._aget("https://enom.test/interface.asp", "check"))
+        breaker.release.assert_called_once_with(True, True, mock.ANY)
+        breaker.abandon.assert_not_called()
+
+    def test_taken_lookup_does_not_wait_for_a_writer(self):
+        with tempfile.TemporaryDirectory() as tmp, override_settings(TAKEN_INDEX_PATH=f"{tmp}/taken"):
+            taken.remember(["google.com"])
+            writing, done = threading.Event(), threading.Event()
+
+            def writer():
+                with taken._lock:  # e.g. queued for the flock or growing the file
+                    writing.set()
+                    done.wait(5)
+
+            thread = threading.Thread(target=writer)
+            thread.start()
+            try:
+                writing.wait()
+                taken._state["checked_at"] = 0.0  # due for a remap
+                started = time.monotonic()
+                self.assertIsNotNone(taken.lookup("google.com"))
+                self.assertLess(time.monotonic() - started, 1)
+            finally:
+                done.set()
+                thread.join()
+            taken._state.update(index=None, path=None)
+
+
+class RateLimitTests(SimpleTestCase):
+    def setUp(self):
+        state_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(state_dir.cleanup)
+        overrides = override_settings(
+            ENOM_RATE_LIMIT=1, ENOM_RATE_BURST=4, ENOM_RATE_COMMAND_LIMITS="namespinner:0.5:1",
+            ENOM_RATE_MAX_WAIT=0, ENOM_RATE_RESERVE=0.5, ENOM_RATE_STATE_PATH=f"{state_dir.name}/state",
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+        self.now = 1000.0
+        patcher = mock.patch("hosting.ratelimit.time.time", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        ratelimit._state = None  # map this test's state file
+        self.addCleanup(setattr, ratelimit, "_state", None)
+
+    def _take(self, command="check", klass=None) -> bool:
+        """One non-blocking call; False when it found no token."""
+        try:
+            if klass is None:
+                ratelimit.acquire(command, block=False)
+            else:
+                with ratelimit.priority(klass):
+                    ratelimit.acquire(command, block=False)
+        except ratelimit.RateLimitedError:
+            return False
+        return True
+
+    def test_limits(self):
+        self.assertEqual(ratelimit.limits(), {"*": (1.0, 4.0), "namespinner": (0.5, 1.0)})
+
+    def test_burst_then_refill(self):
+        self.assertEqual([self._take() for _ in range(5)], [True, True, True, True, False])
+        self.now += 1
+        self.assertEqual([self._take(), self._take()], [True, False])
+        self.assertEqual(ratelimit.snapshot()["tokens"]["*"], 0.0)
+
+    def test_command_budget_and_global_bucket_both_apply(self):
+        self.assertTrue(self._take("namespinner"))
+        self.assertFalse(self._take("namespinner"))  # its own bucket is empty
+        self.assertEqual(ratelimit.snapshot()["tokens"], {"*": 3.0, "namespinner": 0.0})
+        self.assertTrue(self._take("check"))
+        self.now += 2
+        self.assertTrue(self._take("NameSpinner"))
+
+    def test_lower_classes_leave_a_reserve(self):
+        # background keeps 1 + 4 * 0.5 tokens in the bucket, suggest 1 + 4 * 0.25
+        self.assertEqual([self._take(klass="background") for _ in range(3)], [True, True, False])
+        self.assertEqual([self._take(klass="suggest") for _ in range(2)], [True, False])
+        self.assertEqual([self._take() for _ in range(2)], [True, False])
+
+    def test_waiting_higher_class_holds_back_lower_ones(self):
+        with ratelimit._locked() as state:
+            ratelimit._join(state, ratelimit.PRIORITIES.index("interactive"), 1)
+        self.assertFalse(self._take(klass="background"))
+        self.now += ratelimit.STALE  # the waiter stopped polling: no longer counted
+        self.assertTrue(self._take(klass="background"))
+
+    def test_blocking_call_gives_up_after_max_wait(self):
+        for _ in range(4):
+            ratelimit.acquire("check")
+        with self.assertRaisesMessage(ratelimit.RateLimitedError, "no token for check (interactive)"):
+            ratelimit.acquire("check")
+
+    def test_command_budgets_need_a_positive_rate(self):
+        for value in ("namespinner:0", "namespinner", "namespinner:-1", "namespinner:n/a", "namespinner:5:0", ":5"):
+            with self.subTest(value=value), override_settings(ENOM_RATE_COMMAND_LIMITS=value):
+                with self.assertRaises(ImproperlyConfigured):
+                    ratelimit.limits()
+                self.assertEqual([e.id for e in checks.rate_limit_check(None)], ["hosting.E002"])
+        self.assertEqual(checks.rate_limit_check(None), [])
+
+    def test_async_acquire_does_not_block_the_loop_on_the_state_lock(self):
+        ratelimit.acquire("check")  # map the state file
+        other = os.open(settings.ENOM_RATE_STATE_PATH, os.O_RDWR)  # another worker, mid-attempt
+        self.addCleanup(os.close, other)
+        fcntl.flock(other, fcntl.LOCK_EX)
+
+        async def run():
+            task = asyncio.create_task(ratelimit.aacquire("check"))
+            await asyncio.sleep(0.05)  # only runs if aacquire() yields while the lock is taken
+            self.assertFalse(task.done())
+            fcntl.flock(other, fcntl.LOCK_UN)
+            await asyncio.wait_for(task, 1)
+
+        asyncio.run(run())
+        self.assertEqual(ratelimit.snapshot()["tokens"]["*"], 2.0)
+
+    def test_unknown_priority_class(self):
+        with self.assertRaises(ValueError):
+            with ratelimit.priority("checkout"):
+                pass
+
+
+@override_settings(CHECK_JOB_CHUNK=2, CHECK_JOB_MAX_ATTEMPTS=3, CHECK_JOB_RETRY_BACKOFF=0, CHECK_JOB_STALE_SECONDS=120)
+class CheckJobTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("reseller", "reseller@example.com", "pw")
+        self.down = set()  # domains Enom cannot answer right now
+        self.calls = []
+        patcher = mock.patch.object(checkjobs.domains, "check_many", side_effect=self._check_many)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _check_many(self, names):
+        names = [".".join(name) for name in names]
+        self.calls.append(names)
+        for domain in names:
+            if domain in self.down:
+                yield {"domain": domain, "error": "Upstream error contacting Enom: 503", "retry": True}
+            elif domain.startswith("bad"):
+                yield {"domain": domain, "error": "Enom says no"}
+            else:
+                yield {"domain": domain, "available": not domain.startswith("taken"), "code": "210", "text": "ok"}
+
+    def _job(self, lines=("Domain", "a.com", "taken.com", "# comment", "", "b.com,notes", "not a domain", "bad.com")):
+        return checkjobs.create_job(self.user, list(lines), "list.csv")
+
+    def test_create_job(self):
+        job = self._job()
+        self.assertEqual(job.total, 5)
+        self.assertEqual(list(job.results.order_by("position").values_list("domain", flat=True)),
+                         ["a.com", "taken.com", "b.com", "not a domain", "bad.com"])
+        with self.assertRaisesMessage(checkjobs.JobError, "No domains"):
+            checkjobs.create_job(self.user, ["domain", "# nothing"])
+        with override_settings(CHECK_JOB_MAX_DOMAINS=2), self.assertRaisesMessage(checkjobs.JobError, "At most 2"):
+            checkjobs.create_job(self.user, ["a.com", "b.com", "c.com"])
+        self.assertEqual(DomainCheckJob.objects.count(), 1)  # the failed uploads left nothing behind
+
+    def test_run_and_results(self):
+        job = self._job()
+        claimed = checkjobs.claim()
+        self.assertEqual((claimed.pk, claimed.status), (job.pk, "running"))
+        self.assertIsNone(checkjobs.claim())  # nothing else waiting
+        checkjobs.run(claimed)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.checked, job.available, job.errors), ("done", 5, 2, 2))
+        self.assertEqual([checkjobs.as_csv(row) for row in checkjobs.results(job)], [
+            ("a.com", "true", "210", "ok", ""),
+            ("taken.com", "false", "210", "ok", ""),
+            ("b.com", "true", "210", "ok", ""),
+            ("not a domain", "", "", "", "Invalid domain format"),
+            ("bad.com", "", "", "", "Enom says no"),
+        ])
+        self.assertEqual(checkjobs.as_dict(list(checkjobs.results(job))[4]), {"domain": "bad.com", "error": "Enom says no"})
+
+    def test_stale_job_is_resumed_at_its_first_unchecked_row(self):
+        job = self._job()
+        first = checkjobs.claim()
+        rows = list(first.results.order_by("position")[:2])
+        self.assertEqual(checkjobs._check_rows(rows), [])
+        self.assertTrue(checkjobs._save_chunk(first, rows))  # then the worker dies
+        self.assertIsNone(checkjobs.claim())  # still heartbeating recently
+
+        with override_settings(CHECK_JOB_STALE_SECONDS=-1):
+            second = checkjobs.claim()
+        self.assertEqual((second.pk, second.checked), (job.pk, 2))
+        self.calls.clear()
+        checkjobs.run(second)
+        self.assertNotIn("a.com", sum(self.calls, []))
+        self.assertFalse(checkjobs._save_chunk(first, rows))  # the old claim is void
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.checked), ("done", 5))
+
+    def test_transient_failures_are_retried_not_saved(self):
+        job = self._job(["a.com", "b.com", "c.com"])
+        self.down = {"b.com"}
+        original = self._check_many
+
+        def recovers(names):
+            if len(self.calls) == 2:
+                self.down.clear()  # Enom is back for the third call
+            return original(names)
+
+        checkjobs.domains.check_many.side_effect = recovers
+        checkjobs.run(checkjobs.claim())
+        self.assertEqual(self.calls[:3], [["a.com", "b.com"], ["b.com"], ["b.com"]])
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.checked, job.errors), ("done", 3, 0))
+
+    def test_job_fails_after_max_attempts_keeping_earlier_chunks(self):
+        job = self._job(["a.com", "b.com", "c.com", "d.com"])
+        self.down = {"c.com"}
+        claimed = checkjobs.claim()
+        with self.assertRaisesMessage(domains.UpstreamError, "1 domains still failing after 3 attempts"):
+            checkjobs.run(claimed)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.checked), ("running", 2))  # run_check_jobs then calls fail()
+        self.assertEqual(job.results.exclude(error="").count(), 0)
+
+    def test_results_follow_a_running_job(self):
+        job = self._job(["a.com", "b.com", "c.com"])
+        claimed = checkjobs.claim()
+        rows = list(claimed.results.order_by("position")[:2])
+        checkjobs._check_rows(rows)
+        checkjobs._save_chunk(claimed, rows)
+        self.assertEqual([row[1] for row in checkjobs.results(job)], ["a.com", "b.com"])
+
+        def finish(seconds):
+            checkjobs.run(claimed)
+
+        with mock.patch.object(checkjobs.time, "sleep", side_effect=finish) as sleep:
+            self.assertEqual([row[1] for row in checkjobs.results(job, follow=True)], ["a.com", "b.com", "c.com"])
+        sleep.assert_called_once()
@@ -1,22 +1,37 @@
 # backend/hosting/urls.py
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
+
+# Domain lookups: coroutine views when served by an ASGI server (see async_views.py)
+domain_views = async_views if settings.DOMAIN_VIEWS_ASYNC else views
 
 urlpatterns = [
     # Plans & checkout
     path('plans/', views.get_hosting_plans, name='get_hosting_plans'),
     path('plans/<int:plan_id>/', views.get_hosting_plan_detail, name='get_hosting_plan_detail'),
     path('plans/specs/', views.get_plan_specs, name='get_plan_specs'),
+    path('plans/matrix/', views.get_plan_matrix, name='get_plan_matrix'),
     path('checkout/', views.create_checkout, name='create_checkout'),
 
     # Stripe (optional / keep if you already use)
+    path('checkout/quote/', views.create_quote, name='create_quote'),
     path('checkout/session/', views.create_stripe_checkout_session, name='create_stripe_checkout_session'),
     path('checkout/stripe/webhook/', views.stripe_webhook, name='stripe_webhook'),
 
     # Domain (Enom)
-    path('domain/check/', views.check_domain, name='check_domain'),
-    path('domain/suggest/', views.namespinner_suggest, name='namespinner_suggest'),
-    path('domain/suggest2/', views.get_name_suggestions, name='get_name_suggestions'),
+    path('domain/check/', domain_views.check_domain, name='check_domain'),
+    path('domain/check/bulk/', views.check_domains_bulk, name='check_domains_bulk'),
+    path('domain/suggest/', domain_views.namespinner_suggest, name='namespinner_suggest'),
+    path('domain/suggest2/', domain_views.get_name_suggestions, name='get_name_suggestions'),
+    path('domain/suggestions/', domain_views.unified_suggest, name='unified_suggest'),
+    path('domain/suggest/local/', views.local_suggest, name='local_suggest'),
+    path('domain/suggest/stream/', domain_views.namespinner_suggest_stream, name='namespinner_suggest_stream'),
+    path('domain/suggest2/stream/', domain_views.get_name_suggestions_stream, name='get_name_suggestions_stream'),
+    path('domain/jobs/', views.create_check_job, name='create_check_job'),
+    path('domain/jobs/<int:job_id>/', views.get_check_job, name='get_check_job'),
+    path('domain/jobs/<int:job_id>/results/', views.check_job_results, name='check_job_results'),
+    path('domain/metrics/', views.enom_metrics, name='enom_metrics'),
 
     # 🔐 Auth (manual)
     path('register/', views.RegisterView.as_view(), name='register'), 
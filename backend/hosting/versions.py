@@ -0,0 +1,38 @@
+# backend/hosting/versions.py
+"""
+Version tokens for the per-worker in-memory indexes (plan catalog, TLD prices).
+
+A worker keeps its compiled copy while the token under the index's key in
+CACHES["default"] is unchanged; writers bump the token after commit and every
+worker rebuilds on its next read. That only reaches other processes (Gunicorn
+workers, cron commands) through a shared cache, so a process-local backend is
+a system check warning (hosting.W001) and a `check --deploy` error (hosting.E001).
+"""
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+PROCESS_LOCAL_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def get(key: str) -> str:
+    """Current token under `key` (created on first use)."""
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid.uuid4().hex, timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump(key: str) -> None:
+    """Give `key` a new token once the current transaction commits."""
+    transaction.on_commit(lambda: cache.set(key, uuid.uuid4().hex, timeout=None))
+
+
+def cache_is_shared() -> bool:
+    return settings.CACHES["default"]["BACKEND"] not in PROCESS_LOCAL_BACKENDS
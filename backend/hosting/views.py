@@ -1,37 +1,51 @@
 # backend/hosting/views.py
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
+from rest_framework.permissions import IsAdminUser, IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework import status
 from django.contrib.auth.password_validation import validate_password
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
 from django.db.models import Q
-from typing import Optional
-from .models import HostingPlan, PlanSpec, Checkout, Order, OrderItem, Payment
+from itertools import chain
+from typing import Iterator, Mapping, Optional, Tuple
+from .models import HostingPlan, PlanSpec, Checkout, Order, OrderItem, Payment, DomainCheckJob
+from . import catalog, checkjobs, domains, enom, pricing, searchlog, suggest, taken
+from .domains import DOMAIN_RE
+from .renderers import CSVRenderer, EventStreamRenderer, NDJSONRenderer, csv_line, ndjson_line, sse_event
 from .serializers import (
     HostingPlanSerializer,
     HostingPlanWithSpecsSerializer,
+    PlanMatrixResponseSerializer,
     CheckoutSerializer,
     OrderSerializer,
     RegisterResponseSerializer,
     RegisterSerializer,
     CreateCheckoutRequestSerializer,
+    BulkDomainCheckRequestSerializer,
+    BulkDomainCheckLineSerializer,
     DomainCheckResponseSerializer,
+    DomainCheckJobRequestSerializer,
+    DomainCheckJobSerializer,
+    DomainSuggestionItemSerializer,
     NameSpinnerResponseSerializer,
     NameSuggestionsResponseSerializer,
+    SimpleSuggestionItemSerializer,
+    LocalSuggestionsResponseSerializer,
+    UnifiedSuggestionsResponseSerializer,
     CreateStripeCheckoutRequestSerializer,
     CreateStripeCheckoutResponseSerializer,
+    QuoteRequestSerializer,
+    QuoteResponseSerializer,
 )
 from rest_framework.views import APIView
-import re
-import requests
-import xml.etree.ElementTree as ET
-from urllib.parse import urlencode
 from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+import logging
 import stripe
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import condition
 from drf_spectacular.utils import (
     extend_schema,
     OpenApiParameter,
@@ -39,14 +53,27 @@ from drf_spectacular.utils import (
     OpenApiTypes,
 )
 
+logger = logging.getLogger(__name__)
+
 
 # ---------------- Plans ----------------
 
+def _catalog_etag(request, *args, **kwargs):
+    # Any plan/spec change bumps the catalog version, so it is a strong validator.
+    return f"catalog-{catalog.get_version()}"
+
+def _catalog_response(body: bytes) -> HttpResponse:
+    # Pre-encoded by hosting.catalog; bypasses DRF rendering on purpose.
+    return HttpResponse(body, content_type="application/json")
+
+@condition(etag_func=_catalog_etag)
 @extend_schema(
     tags=["Plans"],
     parameters=[
         OpenApiParameter(name="category", type=OpenApiTypes.STR, required=False, location=OpenApiParameter.QUERY,
-                         description="Filter by plan category (e.g. web, wordpress, woocommerce, email)")
+                         description="Filter by plan category (e.g. web, wordpress, woocommerce, email)"),
+        OpenApiParameter(name="feature", type=OpenApiTypes.STR, required=False, location=OpenApiParameter.QUERY,
+                         description="Only plans listing this exact feature (case-insensitive)"),
     ],
     responses={200: HostingPlanSerializer(many=True)},
     summary="List hosting plans",
@@ -54,12 +81,9 @@ from drf_spectacular.utils import (
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_hosting_plans(request):
-    category = request.GET.get('category')
-    qs = HostingPlan.objects.all()
-    if category:
-        qs = qs.filter(category=category)
-    return Response(HostingPlanSerializer(qs, many=True).data)
+    return _catalog_response(catalog.plans_json(request.GET.get('category'), request.GET.get('feature')))
 
+@condition(etag_func=_catalog_etag)
 @extend_schema(
     tags=["Plans"],
     summary="Get comparison specs for plans (by category)",
@@ -70,24 +94,37 @@ def get_hosting_plans(request):
 def get_plan_specs(request):
     """
     Returns all plans within an optional ?category=… along with their PlanSpec rows.
-    Frontend can build the left column by deduping labels across all specs in 'order'.
+    For the comparison table prefer /plans/matrix/, which ships the deduped label column pre-built.
     """
-    category = request.GET.get('category')
-    qs = HostingPlan.objects.all()
-    if category:
-        qs = qs.filter(category=category)
-    qs = qs.prefetch_related("specs")
-    data = HostingPlanWithSpecsSerializer(qs, many=True).data
-    return Response(data)
+    return _catalog_response(catalog.specs_json(request.GET.get('category')))
 
+@condition(etag_func=_catalog_etag)
+@extend_schema(
+    tags=["Plans"],
+    parameters=[
+        OpenApiParameter(name="category", type=OpenApiTypes.STR, required=False, location=OpenApiParameter.QUERY,
+                         description="Plan category (e.g. web, wordpress)")
+    ],
+    summary="Get the plan comparison matrix (by category)",
+    responses={200: PlanMatrixResponseSerializer},
+)
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_plan_matrix(request):
+    """
+    Pivoted comparison table: deduped 'labels' in display order, plan headers,
+    and cells[plan][label] = [icon, value] (null where the plan has no such row).
+    """
+    return _catalog_response(catalog.matrix_json(request.GET.get('category')))
+
+@condition(etag_func=_catalog_etag)
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_hosting_plan_detail(request, plan_id):
-    try:
-        plan = HostingPlan.objects.get(id=plan_id)
-    except HostingPlan.DoesNotExist:
+    body = catalog.plan_json(plan_id)
+    if body is None:
         return Response({'error': 'Plan not found'}, status=status.HTTP_404_NOT_FOUND)
-    return Response(HostingPlanSerializer(plan).data)
+    return _catalog_response(body)
 
 @extend_schema(
     tags=["Plans"],
@@ -109,23 +146,89 @@ def create_checkout(request):
     checkout = Checkout.objects.create(user=request.user, plan=plan)
     return Response(CheckoutSerializer(checkout).data, status=201)
 
-# ---------- Helpers (unchanged) ----------
+# ---------------- Domain ----------------
 
-DOMAIN_RE = re.compile(r"^(?P<sld>[a-z0-9-]{1,63})\.(?P<tld>[a-z0-9.-]{2,63})$", re.I)
-RRP_AVAILABLE = "210"
+# Query parsing shared with the async views (hosting/async_views.py); ValueError -> 400
 
-def _enom_get(params: dict, response_type: str = "xml"):
-    base = settings.ENOM_BASE_URL.rstrip("/")
-    p = {
-        **params,
-        "uid": settings.ENOM_UID,
-        "pw": settings.ENOM_TOKEN,
-        "responsetype": response_type,
+def _check_query(query) -> Tuple[str, str]:
+    q = (query.get("q") or "").strip().lower()
+    if not q:
+        raise ValueError("Missing ?q (e.g. ?q=example.com)")
+    m = DOMAIN_RE.match(q)
+    if not m:
+        raise ValueError("Invalid domain format")
+    return m.group("sld"), m.group("tld")
+
+
+def _namespinner_query(query) -> Tuple[str, str, dict]:
+    q = (query.get("q") or "").strip().lower()
+    if not q:
+        raise ValueError("Missing ?q")
+    m = DOMAIN_RE.match(q)
+    if not m:
+        raise ValueError("Invalid domain format")
+
+    tld_list = (query.get("tlds") or "com,net,tv,cc").lower()
+    params = {
+        "command": "NameSpinner",
+        "SLD": m.group("sld"),
+        "TLD": m.group("tld"),
+        "TLDList": tld_list,
+        "MaxResults": query.get("max", "20"),
+        "UseHyphens": str(query.get("hyphens", "false")).capitalize(),
+        "UseNumbers": str(query.get("numbers", "true")).capitalize(),
+        "Basic": query.get("basic", "Medium"),
+        "Related": query.get("related", "High"),
+        "Similar": query.get("similar", "Medium"),
+        "Topical": query.get("topical", "Medium"),
     }
-    url = f"{base}/interface.asp?{urlencode(p)}"
-    return requests.get(url, timeout=getattr(settings, "ENOM_TIMEOUT", 10))
+    return q, tld_list, params
+
+
+def _suggestions_query(query) -> Tuple[str, str, dict]:
+    search_term = (query.get("q") or "").strip().lower()
+    if not search_term:
+        raise ValueError("Missing ?q")
+    tld_list = (query.get("tlds") or "com,net,org,io,co,xyz").lower()
+    params = {
+        "command": "GetNameSuggestions",
+        "SearchTerm": search_term.split(".", 1)[0],
+        "TldList": tld_list,
+        "MaxResult": query.get("max", "40"),
+        "SpinType": query.get("spinType", "0"),
+        "Premium": query.get("premium", "false"),
+        "AllGA": query.get("allga", "true"),
+        "Adult": query.get("adult", "false"),
+    }
+    return search_term, tld_list, params
+
+
+def _unified_query(query) -> Tuple[str, str, dict, dict, int]:
+    """(q, tlds, NameSpinner params, GetNameSuggestions params, limit) for domain/suggestions/."""
+    q = (query.get("q") or "").strip().lower()
+    if not q:
+        raise ValueError("Missing ?q")
+    tld_list = (query.get("tlds") or "com,net,org,io,co").lower()
+    tlds = [t.strip().lstrip(".") for t in tld_list.split(",") if t.strip()]
+    if not tlds:
+        raise ValueError("Missing TLDs in ?tlds")
+    try:
+        limit = min(max(int(query.get("max", "20")), 1), 100)
+    except ValueError:
+        raise ValueError("max must be an integer")
+    # NameSpinner wants a domain, GetNameSuggestions a term; both get the same TLDs and size
+    seed = q if "." in q else f"{q}.{tlds[0]}"
+    _, _, spin_params = _namespinner_query({"q": seed, "tlds": tld_list, "max": str(limit)})
+    _, _, name_params = _suggestions_query({"q": q, "tlds": tld_list, "max": str(limit)})
+    return q, tld_list, spin_params, name_params, limit
+
+
+def _log_suggestion_search(params: dict) -> None:
+    if params["command"] == "NameSpinner":
+        searchlog.record("suggest", params["SLD"], params["TLD"])
+    else:
+        searchlog.record("suggest", params["SearchTerm"])
 
-# ---------------- Domain ----------------
 
 @extend_schema(
     tags=["Domain"],
@@ -139,38 +242,52 @@ def _enom_get(params: dict, response_type: str = "xml"):
 @api_view(["GET"])
 @permission_classes([AllowAny])
 def check_domain(request):
-    q = (request.GET.get("q") or "").strip().lower()
-    if not q:
-        return Response({"error": "Missing ?q (e.g. ?q=example.com)"}, status=400)
-
-    m = DOMAIN_RE.match(q)
-    if not m:
-        return Response({"error": "Invalid domain format"}, status=400)
-
-    params = {
-        "command": "check",
-        "SLD": m.group("sld"),
-        "TLD": m.group("tld"),
-        "Version": "1",
-    }
     try:
-        r = _enom_get(params, response_type="xml")
-        r.raise_for_status()
-    except requests.RequestException as e:
-        return Response({"error": f"Upstream error contacting Enom: {e}"}, status=502)
-
+        sld, tld = _check_query(request.GET)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+    searchlog.record("check", sld, tld)
     try:
-        root = ET.fromstring(r.text)
-        code = (root.findtext("RRPCode") or "").strip()
-        text = (root.findtext("RRPText") or "").strip()
-        return Response({
-            "domain": q,
-            "available": code == RRP_AVAILABLE,
-            "code": code,
-            "text": text,
-        })
-    except ET.ParseError:
-        return Response({"error": "Failed to parse Enom XML response"}, status=502)
+        return Response(domains.check(sld, tld))
+    except domains.UpstreamError as e:
+        return Response({"error": str(e)}, status=502)
+
+@extend_schema(
+    tags=["Domain"],
+    request=BulkDomainCheckRequestSerializer,
+    responses={
+        (200, "application/x-ndjson"): BulkDomainCheckLineSerializer,
+        400: OpenApiResponse(description="Invalid input"),
+    },
+    summary="Check many domains at once (NDJSON, one line per domain as it resolves)",
+)
+@api_view(["POST"])
+@permission_classes([AllowAny])
+def check_domains_bulk(request):
+    ser = BulkDomainCheckRequestSerializer(data=request.data)
+    if not ser.is_valid():
+        return Response({"error": ser.errors}, status=400)
+    names = ser.validated_data["domains"]
+    if len(names) > settings.ENOM_BULK_MAX_DOMAINS:
+        return Response({"error": f"At most {settings.ENOM_BULK_MAX_DOMAINS} domains per request"}, status=400)
+
+    valid, invalid = [], []
+    for name in names:
+        parts = domains.split_domain(name)
+        if parts is None:
+            invalid.append({"domain": name, "error": "Invalid domain format"})
+        else:
+            valid.append(parts)
+
+    def lines():
+        for row in invalid:
+            yield catalog.dumps(row) + b"\n"
+        for row in domains.check_many(valid):
+            yield catalog.dumps(row) + b"\n"
+
+    response = StreamingHttpResponse(lines(), content_type="application/x-ndjson")
+    response["X-Accel-Buffering"] = "no"  # let Nginx pass lines through as they resolve
+    return response
 
 @extend_schema(
     tags=["Domain"],
@@ -191,56 +308,17 @@ def check_domain(request):
 @api_view(["GET"])
 @permission_classes([AllowAny])
 def namespinner_suggest(request):
-    q = (request.GET.get("q") or "").strip().lower()
-    if not q:
-        return Response({"error": "Missing ?q"}, status=400)
-    m = DOMAIN_RE.match(q)
-    if not m:
-        return Response({"error": "Invalid domain format"}, status=400)
-
-    sld, tld = m.group("sld"), m.group("tld")
-    tld_list = (request.GET.get("tlds") or "com,net,tv,cc").lower()
-    params = {
-        "command": "NameSpinner",
-        "SLD": sld,
-        "TLD": tld,
-        "TLDList": tld_list,
-        "MaxResults": request.GET.get("max", "20"),
-        "UseHyphens": str(request.GET.get("hyphens", "false")).capitalize(),
-        "UseNumbers": str(request.GET.get("numbers", "true")).capitalize(),
-        "Basic": request.GET.get("basic", "Medium"),
-        "Related": request.GET.get("related", "High"),
-        "Similar": request.GET.get("similar", "Medium"),
-        "Topical": request.GET.get("topical", "Medium"),
-    }
     try:
-        r = _enom_get(params, response_type="xml")
-        r.raise_for_status()
-    except requests.RequestException as e:
-        return Response({"error": f"Upstream error contacting Enom: {e}"}, status=502)
-
+        q, tld_list, params = _namespinner_query(request.GET)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+    _log_suggestion_search(params)
     try:
-        root = ET.fromstring(r.text)
-        if int(root.findtext("ErrCount") or "0") > 0:
-            return Response({"error": root.findtext(".//errors/Err1") or "NameSpinner failed"}, status=502)
-
-        suggestions = []
-        for d in root.findall(".//namespin/domains/domain"):
-            name = (d.get("name") or "").lower()
-            for k in ["com", "net", "tv", "cc"]:
-                if k not in tld_list.replace(" ", "").split(","):
-                    continue
-                suggestions.append({
-                    "sld": name,
-                    "tld": k,
-                    "domain": f"{name}.{k}",
-                    "available": (d.get(k) or "").lower() == "y",
-                    "score": int(d.get(f"{k}score") or "0"),
-                })
-        suggestions.sort(key=lambda x: x["score"], reverse=True)
-        return Response({"query": q, "tlds": tld_list, "suggestions": suggestions})
-    except ET.ParseError:
-        return Response({"error": "Failed to parse Enom XML response"}, status=502)
+        suggestions = domains.namespinner(params)
+    except domains.UpstreamError as e:
+        return Response({"error": str(e)}, status=502)
+    suggestions = pricing.with_prices(suggestions, pricing.tld_prices())
+    return Response({"query": q, "tlds": tld_list, "suggestions": suggestions})
 
 @extend_schema(
     tags=["Domain"],
@@ -259,59 +337,287 @@ def namespinner_suggest(request):
 @api_view(["GET"])
 @permission_classes([AllowAny])
 def get_name_suggestions(request):
-    search_term = (request.GET.get("q") or "").strip().lower()
-    if not search_term:
+    try:
+        search_term, tld_list, params = _suggestions_query(request.GET)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+    _log_suggestion_search(params)
+    try:
+        sugs = domains.name_suggestions(params)
+    except domains.UpstreamError as e:
+        return Response({"error": str(e)}, status=502)
+    sugs = pricing.with_prices(sugs, pricing.tld_prices())
+
+    return Response({"query": search_term, "tlds": tld_list, "count": len(sugs), "suggestions": sugs})
+
+@extend_schema(
+    tags=["Domain"],
+    parameters=[
+        OpenApiParameter(name="q", type=OpenApiTypes.STR, required=True, location=OpenApiParameter.QUERY, description="Keywords or domain (e.g. best coffee, bestcoffee.com)"),
+        OpenApiParameter(name="tlds", type=OpenApiTypes.STR, required=False, location=OpenApiParameter.QUERY, description="Comma list of TLDs (default: com,net,org,io,co,xyz)"),
+        OpenApiParameter(name="max", type=OpenApiTypes.INT, required=False, location=OpenApiParameter.QUERY, description="Max results (default: 20, at most 100)"),
+        OpenApiParameter(name="merge", type=OpenApiTypes.BOOL, required=False, location=OpenApiParameter.QUERY, description="Also ask Enom NameSpinner and re-rank both together (default: false)"),
+        OpenApiParameter(name="confirm", type=OpenApiTypes.INT, required=False, location=OpenApiParameter.QUERY, description="Check availability of the top N with Enom (default: 0)"),
+    ],
+    responses={200: LocalSuggestionsResponseSerializer, 400: OpenApiResponse(description="Invalid input")},
+    summary="Instant domain suggestions generated locally, optionally merged with Enom",
+)
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def local_suggest(request):
+    q = (request.GET.get("q") or "").strip().lower()[:253]  # a full domain name at most; tokens() reads 63
+    if not q:
         return Response({"error": "Missing ?q"}, status=400)
     tld_list = (request.GET.get("tlds") or "com,net,org,io,co,xyz").lower()
-
+    tlds = [t.strip().lstrip(".") for t in tld_list.split(",") if t.strip()]
     try:
-        r = _enom_get({
-            "command": "GetNameSuggestions",
-            "SearchTerm": search_term.split(".", 1)[0],
-            "TldList": tld_list,
-            "MaxResult": request.GET.get("max", "40"),
-            "SpinType": request.GET.get("spinType", "0"),
-            "Premium": request.GET.get("premium", "false"),
-            "AllGA": request.GET.get("allga", "true"),
-            "Adult": request.GET.get("adult", "false"),
-        }, response_type="text")
-        r.raise_for_status()
-    except requests.RequestException as e:
-        return Response({"error": f"Enom GetNameSuggestions error: {e}"}, status=502)
-
-    pairs = {}
-    for line in r.text.splitlines():
-        if "=" in line:
-            k, v = line.split("=", 1)
-            pairs[k.strip()] = v.strip()
-
-    def collect(prefix):
-        out = {}
-        for k, v in pairs.items():
-            if k.startswith(prefix) and k[len(prefix):].isdigit():
-                out[int(k[len(prefix):])] = v
-        return out
-
-    slds = collect("Sld")
-    tlds = collect("Tld")
-    scores = collect("Score")
-
-    sugs = []
-    for i in sorted(set(slds) & set(tlds)):
-        sld = (slds[i] or "").lower()
-        tld = (tlds[i] or "").lower().lstrip(".")
+        limit = min(max(int(request.GET.get("max", "20")), 1), 100)
+        top = min(max(int(request.GET.get("confirm", "0")), 0), settings.SUGGEST_CONFIRM_MAX)
+    except ValueError:
+        return Response({"error": "max and confirm must be integers"}, status=400)
+
+    merge = str(request.GET.get("merge", "false")).lower() == "true"
+    words = suggest.tokens(q)  # once per request: segmentation is the expensive part
+    seed = "".join(words)
+    searchlog.record("suggest", seed)
+    # When merging, a wider local pool lets names Enom also proposes meet and rank up
+    rows = suggest.suggest(q, tlds, limit * 3 if merge else limit, words=words)
+    partial = False
+    if merge and rows:
         try:
-            score = float(scores.get(i, "0") or "0")
-        except ValueError:
-            score = 0.0
-        sugs.append({"sld": sld, "tld": tld, "domain": f"{sld}.{tld}", "score": score})
+            _, _, params = _namespinner_query({"q": f"{seed}.{tlds[0]}", "tlds": tld_list, "max": str(limit)})
+            rows = suggest.merge(rows, domains.namespinner(params), limit)
+        except (ValueError, domains.UpstreamError) as e:
+            logger.info("Local suggestions served without Enom for %r: %s", q, e)
+            partial = True
+    rows = pricing.with_prices(suggest.confirm(rows[:limit], top), pricing.tld_prices())
+    return Response({"query": q, "tlds": tld_list, "count": len(rows), "partial": partial, "suggestions": rows})
 
-    return Response({"query": search_term, "tlds": tld_list, "count": len(sugs), "suggestions": sugs})
+@extend_schema(
+    tags=["Domain"],
+    parameters=[
+        OpenApiParameter(name="q", type=OpenApiTypes.STR, required=True, location=OpenApiParameter.QUERY, description="Search term or domain (e.g. example, example.com)"),
+        OpenApiParameter(name="tlds", type=OpenApiTypes.STR, required=False, location=OpenApiParameter.QUERY, description="Comma list of TLDs (default: com,net,org,io,co)"),
+        OpenApiParameter(name="max", type=OpenApiTypes.INT, required=False, location=OpenApiParameter.QUERY, description="Max results (default: 20, at most 100)"),
+    ],
+    responses={200: UnifiedSuggestionsResponseSerializer, 400: OpenApiResponse(description="Invalid input"), 502: OpenApiResponse(description="Upstream error")},
+    summary="Domain suggestions from NameSpinner and GetNameSuggestions at once, merged into one ranking",
+)
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def unified_suggest(request):
+    try:
+        q, tld_list, spin_params, name_params, limit = _unified_query(request.GET)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+    _log_suggestion_search(spin_params)
+    try:
+        rows, errors = domains.suggestions(spin_params, name_params, limit)
+    except domains.UpstreamError as e:
+        return Response({"error": str(e)}, status=502)
+    if errors:
+        logger.info("Merged suggestions for %r without %s", q, ", ".join(f"{k} ({v})" for k, v in errors.items()))
+    rows = pricing.with_prices(rows, pricing.tld_prices())
+    return Response({"query": q, "tlds": tld_list, "count": len(rows), "partial": bool(errors), "suggestions": rows})
+
+def _suggestion_lines(rows: Iterator[dict], sse: bool, prices: Mapping[str, int]) -> Iterator[bytes]:
+    """Encode suggestion rows as NDJSON lines or SSE events; an upstream failure mid-stream becomes a last error row."""
+    count = 0
+    try:
+        for row in rows:
+            count += 1
+            row = pricing.with_price(row, prices)
+            yield sse_event("suggestion", row) if sse else ndjson_line(row)
+    except domains.UpstreamError as e:
+        yield sse_event("error", {"error": str(e)}) if sse else ndjson_line({"error": str(e)})
+        return
+    if sse:
+        yield sse_event("done", {"count": count})  # EventSource reconnects on a plain EOF
+
+
+def _suggestion_stream(request, rows: Iterator[dict]):
+    # Wait for the first row so an unreachable Enom is still a plain 502
+    try:
+        first = next(rows, None)
+    except domains.UpstreamError as e:
+        return Response({"error": str(e)}, status=502)
+    rows = chain([first], rows) if first is not None else iter(())
+    sse = request.accepted_renderer.format == EventStreamRenderer.format
+    lines = _suggestion_lines(rows, sse, pricing.tld_prices())
+    response = StreamingHttpResponse(lines, content_type=request.accepted_renderer.media_type)
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+@extend_schema(
+    tags=["Domain"],
+    parameters=[
+        OpenApiParameter(name="q", type=OpenApiTypes.STR, required=True, location=OpenApiParameter.QUERY, description="Seed domain (e.g. example.com)"),
+        OpenApiParameter(name="tlds", type=OpenApiTypes.STR, required=False, location=OpenApiParameter.QUERY, description="Comma list of TLDs (default: com,net,tv,cc)"),
+        OpenApiParameter(name="max", type=OpenApiTypes.INT, required=False, location=OpenApiParameter.QUERY, description="Max results (default: 20)"),
+    ],
+    responses={
+        (200, "application/x-ndjson"): DomainSuggestionItemSerializer,
+        (200, "text/event-stream"): OpenApiTypes.STR,
+        400: OpenApiResponse(description="Invalid input"),
+        502: OpenApiResponse(description="Upstream error"),
+    },
+    summary="Stream NameSpinner suggestions as they are parsed (NDJSON, or SSE with ?format=sse)",
+    description="Same parameters as /domain/suggest/. Rows arrive in upstream order, not sorted by score. "
+                "SSE events: suggestion, error, done.",
+)
+@api_view(["GET"])
+@permission_classes([AllowAny])
+@renderer_classes([NDJSONRenderer, EventStreamRenderer])
+def namespinner_suggest_stream(request):
+    try:
+        _, _, params = _namespinner_query(request.GET)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+    _log_suggestion_search(params)
+    return _suggestion_stream(request, domains.stream_namespinner(params))
+
+@extend_schema(
+    tags=["Domain"],
+    parameters=[
+        OpenApiParameter(name="q", type=OpenApiTypes.STR, required=True, location=OpenApiParameter.QUERY, description="Search term or domain (e.g. example)"),
+        OpenApiParameter(name="tlds", type=OpenApiTypes.STR, required=False, location=OpenApiParameter.QUERY, description="Comma list of TLDs (default: com,net,org,io,co,xyz)"),
+        OpenApiParameter(name="max", type=OpenApiTypes.INT, required=False, location=OpenApiParameter.QUERY, description="Max results (default: 40)"),
+    ],
+    responses={
+        (200, "application/x-ndjson"): SimpleSuggestionItemSerializer,
+        (200, "text/event-stream"): OpenApiTypes.STR,
+        400: OpenApiResponse(description="Invalid input"),
+        502: OpenApiResponse(description="Upstream error"),
+    },
+    summary="Stream GetNameSuggestions results as they are parsed (NDJSON, or SSE with ?format=sse)",
+    description="Same parameters as /domain/suggest2/. SSE events: suggestion, error, done.",
+)
+@api_view(["GET"])
+@permission_classes([AllowAny])
+@renderer_classes([NDJSONRenderer, EventStreamRenderer])
+def get_name_suggestions_stream(request):
+    try:
+        _, _, params = _suggestions_query(request.GET)
+    except ValueError as e:
+        return Response({"error": str(e)}, status=400)
+    _log_suggestion_search(params)
+    return _suggestion_stream(request, domains.stream_name_suggestions(params))
+
+@extend_schema(
+    tags=["Domain"],
+    request={"multipart/form-data": DomainCheckJobRequestSerializer, "application/json": DomainCheckJobRequestSerializer},
+    responses={201: DomainCheckJobSerializer, 400: OpenApiResponse(description="Empty, too long or missing list")},
+    summary="Start a background availability check of a domain list",
+    description="Upload a text/CSV file (one domain per line, first column) or send a JSON list. "
+                "Follow progress at /domain/jobs/{id}/ and stream results from /domain/jobs/{id}/results/.",
+)
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def create_check_job(request):
+    ser = DomainCheckJobRequestSerializer(data=request.data)
+    if not ser.is_valid():
+        return Response({"error": ser.errors}, status=400)
+    upload = ser.validated_data.get("file")
+    if upload is not None:
+        lines, name = upload, upload.name  # read line by line from memory or the temporary upload file
+    elif ser.validated_data.get("domains"):
+        lines, name = ser.validated_data["domains"], ""
+    else:
+        return Response({"error": "Send a file or a domains list"}, status=400)
+    try:
+        job = checkjobs.create_job(request.user, lines, name)
+    except checkjobs.JobError as e:
+        return Response({"error": str(e)}, status=400)
+    return Response(DomainCheckJobSerializer(job).data, status=201)
+
+@extend_schema(
+    tags=["Domain"],
+    responses={200: DomainCheckJobSerializer, 404: OpenApiResponse(description="No such job")},
+    summary="Progress of a background domain check",
+)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def get_check_job(request, job_id):
+    job = DomainCheckJob.objects.filter(pk=job_id, user=request.user).first()
+    if job is None:
+        return Response({"error": "Job not found"}, status=404)
+    return Response(DomainCheckJobSerializer(job).data)
+
+@extend_schema(
+    tags=["Domain"],
+    parameters=[
+        OpenApiParameter(name="follow", type=OpenApiTypes.BOOL, required=False, location=OpenApiParameter.QUERY,
+                         description="Keep the stream open for new rows until the job finishes, at most "
+                                     "CHECK_JOB_STREAM_TIMEOUT seconds (default: false)"),
+    ],
+    responses={
+        (200, "text/csv"): OpenApiTypes.STR,
+        (200, "application/x-ndjson"): BulkDomainCheckLineSerializer,
+        404: OpenApiResponse(description="No such job"),
+    },
+    summary="Stream the results of a background domain check (CSV, or NDJSON with ?format=ndjson)",
+    description="Rows checked so far, in list order. Poll /domain/jobs/<id>/ for progress, or pass ?follow=true "
+                "to keep receiving rows while the job runs. CSV columns: domain, available, code, text, error.",
+)
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+@renderer_classes([CSVRenderer, NDJSONRenderer])
+def check_job_results(request, job_id):
+    job = DomainCheckJob.objects.filter(pk=job_id, user=request.user).first()
+    if job is None:
+        return Response({"error": "Job not found"}, status=404)
+    rows = checkjobs.results(job, follow=str(request.GET.get("follow", "false")).lower() == "true")
+    if request.accepted_renderer.format == NDJSONRenderer.format:
+        lines = (ndjson_line(checkjobs.as_dict(row)) for row in rows)
+    else:
+        lines = chain([csv_line(checkjobs.CSV_COLUMNS)], (csv_line(checkjobs.as_csv(row)) for row in rows))
+    response = StreamingHttpResponse(lines, content_type=request.accepted_renderer.media_type)
+    if request.accepted_renderer.format == CSVRenderer.format:
+        response["Content-Disposition"] = f'attachment; filename="domain-check-{job.pk}.csv"'
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+@extend_schema(
+    tags=["Domain"],
+    responses={200: OpenApiTypes.OBJECT},
+    summary="Enom client, results-cache, known-taken index and search-log metrics for this worker (staff only)",
+)
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def enom_metrics(request):
+    return Response({**enom.metrics(), "results_cache": domains.cache_stats(), "taken_index": taken.stats(),
+                     "search_log": searchlog.stats()})
 
 # ---------------- Stripe/Orders ----------------
 
 stripe.api_key = settings.STRIPE_SECRET_KEY
 
+@extend_schema(
+    tags=["Plans"],
+    request=QuoteRequestSerializer,
+    responses={200: QuoteResponseSerializer, 400: OpenApiResponse(description="Unknown SKU or invalid cart")},
+    auth=[],
+    summary="Price a cart server-side",
+    description="Resolves plan and domain prices from the catalog and TLD price table. "
+                "Pass the returned 'quote' token to /checkout/session/ to check out at exactly these prices.",
+)
+@api_view(["POST"])
+@permission_classes([AllowAny])
+def create_quote(request):
+    ser = QuoteRequestSerializer(data=request.data)
+    if not ser.is_valid():
+        return Response({"error": ser.errors}, status=400)
+    try:
+        quote = pricing.build_quote(ser.validated_data["items"])
+    except pricing.QuoteError as e:
+        return Response({"detail": str(e)}, status=400)
+    return Response({
+        "quote": pricing.sign_quote(quote),
+        "expires_in": settings.QUOTE_TTL_SECONDS,
+        **quote.as_dict(),
+    })
+
 def _get_user_ref(request):
     email = getattr(request.user, "email", None)
     if email:
@@ -323,48 +629,60 @@ def _get_user_ref(request):
 @extend_schema(
     tags=["Plans"],
     request=CreateStripeCheckoutRequestSerializer,
-    responses={201: CreateStripeCheckoutResponseSerializer, 400: OpenApiResponse(description="Bad payload")},
+    responses={201: CreateStripeCheckoutResponseSerializer, 400: OpenApiResponse(description="Bad payload"),
+               502: OpenApiResponse(description="Stripe error")},
     summary="Create Stripe Checkout Session (protected)",
 )
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def create_stripe_checkout_session(request):
     """
-    Payload example:
+    Payload example (prices are always resolved server-side, see /checkout/quote/):
     {
-      "items": [
-        {"item_type":"plan","name":"Web Basic","sku":"plan_3","quantity":1,"unit_amount_cents":299,"currency":"usd"},
-        {"item_type":"domain","name":"amirmz.com","sku":"amirmz.com","quantity":1,"unit_amount_cents":999,"currency":"usd"}
+      "quote": "<token from /checkout/quote/>",          # preferred, reused as-is
+      "items": [                                          # used when no quote is sent
+        {"item_type":"plan","sku":"plan_3","quantity":1},
+        {"item_type":"domain","sku":"amirmz.com","quantity":1}
       ],
       "success_url": "http://localhost:3000/checkout?success=1&order_id={ORDER_ID}",
       "cancel_url": "http://localhost:3000/cart?canceled=1"
     }
     """
-    data = request.data
-    items = data.get("items", [])
-    success_url = data.get("success_url")
-    cancel_url = data.get("cancel_url")
-    if not items or not success_url or not cancel_url:
-        return Response({"detail": "items, success_url, cancel_url required"}, status=400)
-
-    user_ref = _get_user_ref(request)
-    order = Order.objects.create(user_ref=user_ref, currency=settings.STRIPE_CURRENCY, status="pending")
-    total = 0
-    for it in items:
-        qty = int(it.get("quantity", 1))
-        amt = int(it.get("unit_amount_cents"))
-        OrderItem.objects.create(
-            order=order,
-            item_type=it.get("item_type"),
-            name=it.get("name"),
-            sku=it.get("sku"),
-            quantity=qty,
-            unit_amount_cents=amt,
-            currency=it.get("currency", settings.STRIPE_CURRENCY),
+    ser = CreateStripeCheckoutRequestSerializer(data=request.data)
+    if not ser.is_valid():
+        return Response({"error": ser.errors}, status=400)
+    token = ser.validated_data.get("quote")
+    items = ser.validated_data.get("items")
+    success_url = ser.validated_data["success_url"]
+    cancel_url = ser.validated_data["cancel_url"]
+    if not (token or items):
+        return Response({"detail": "quote or items required"}, status=400)
+
+    try:
+        quote = pricing.load_quote(token) if token else pricing.build_quote(items)
+    except pricing.QuoteError as e:
+        return Response({"detail": str(e)}, status=400)
+
+    # Every line is validated and priced by now: build the items and the total in
+    # one pass, then write the order and all its items together.
+    order_items, total = [], 0
+    for line in quote.lines:
+        order_items.append(OrderItem(
+            item_type=line.item_type,
+            name=line.name,
+            sku=line.sku,
+            quantity=line.quantity,
+            unit_amount_cents=line.unit_amount_cents,
+            currency=line.currency,
+        ))
+        total += line.line_total_cents
+    with transaction.atomic():
+        order = Order.objects.create(
+            user_ref=_get_user_ref(request), currency=quote.currency, status="pending", total_amount_cents=total
         )
-        total += qty * amt
-    order.total_amount_cents = total
-    order.save()
+        for oi in order_items:
+            oi.order = order
+        OrderItem.objects.bulk_create(order_items)
 
     line_items = [
         {
@@ -375,16 +693,21 @@ def create_stripe_checkout_session(request):
                 "unit_amount": oi.unit_amount_cents,
             },
         }
-        for oi in order.items.all()
+        for oi in order_items
     ]
 
-    session = stripe.checkout.Session.create(
-        mode="payment",
-        line_items=line_items,
-        success_url=success_url.replace("{ORDER_ID}", str(order.id)),
-        cancel_url=cancel_url,
-        metadata={"order_id": str(order.id)},
-    )
+    # Outside the transaction: no database locks held while Stripe answers
+    try:
+        session = stripe.checkout.Session.create(
+            mode="payment",
+            line_items=line_items,
+            success_url=success_url.replace("{ORDER_ID}", str(order.id)),
+            cancel_url=cancel_url,
+            metadata={"order_id": str(order.id)},
+        )
+    except stripe.error.StripeError as e:
+        Order.objects.filter(pk=order.pk).update(status="failed")
+        return Response({"detail": f"Payment provider error: {e.user_message or e}"}, status=502)
     Payment.objects.create(order=order, provider_session_id=session.id, status="pending", amount_cents=total)
     return Response({"checkout_url": session.url, "order": OrderSerializer(order).data}, status=status.HTTP_201_CREATED)
 
@@ -14,3 +14,7 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hosting_backend.settings')
 
 application = get_asgi_application()
+
+from hosting import pricing  # noqa: E402  (needs the app registry)
+
+pricing.warm()
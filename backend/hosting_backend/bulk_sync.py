@@ -0,0 +1,143 @@
+# backend/hosting_backend/bulk_sync.py
+"""
+Diff-based bulk upsert shared by the seed commands.
+
+    plan = sync_rows(PlanSpec.objects.filter(plan__in=plans), rows,
+                     key=("plan_id", "label"), fields=("value", "icon", "order"))
+    for line in plan.report():
+        print(line)
+
+One query loads the current rows, the diff is computed in memory, and the
+changes are applied with one filtered delete, bulk_create and bulk_update in a single
+transaction. Rows use attnames ("plan_id", not "plan"). Bulk writes skip
+save() and signals, so callers must fill derived fields themselves and
+invalidate any caches afterwards.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from django.db import models, transaction
+
+Key = Tuple[Any, ...]
+
+
+@dataclass
+class SyncPlan:
+    model: type
+    fields: Tuple[str, ...]
+    create: List[models.Model] = field(default_factory=list)
+    update: List[models.Model] = field(default_factory=list)
+    delete: List[models.Model] = field(default_factory=list)
+    unchanged: int = 0
+    changes: List[Tuple[Key, str, Any, Any]] = field(default_factory=list)  # (key, field, old, new)
+    keys: Dict[int, Key] = field(default_factory=dict)  # id(obj) -> key, for reporting
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.create or self.update or self.delete)
+
+    def summary(self, applied: bool = False) -> str:
+        verbs = ("created", "updated", "deleted") if applied else ("to create", "to update", "to delete")
+        counts = (len(self.create), len(self.update), len(self.delete))
+        parts = [f"{n} {verb}" for n, verb in zip(counts, verbs)]
+        return f"{self.model.__name__}: {', '.join(parts)}, {self.unchanged} unchanged"
+
+    def report(self) -> List[str]:
+        lines = [self.summary()]
+        lines += [f"  + {self.keys[id(obj)]}" for obj in self.create]
+        lines += [f"  ~ {key} {name}: {old!r} -> {new!r}" for key, name, old, new in self.changes]
+        lines += [f"  - {self.keys[id(obj)]}" for obj in self.delete]
+        return lines
+
+
+def _key(values: Mapping[str, Any], key: Sequence[str]) -> Key:
+    return tuple(values[k] for k in key)
+
+
+def diff_rows(
+    queryset: models.QuerySet,
+    rows: Iterable[Mapping[str, Any]],
+    key: Sequence[str],
+    fields: Sequence[str] = (),
+    fill_fields: Sequence[str] = (),
+    delete_missing: bool = False,
+    touch: Optional[Mapping[str, Any]] = None,
+) -> SyncPlan:
+    """
+    Compare desired rows against queryset (one query) without writing anything.
+
+    fields      always synced to the desired value
+    fill_fields set on create, and on update only while the stored value is empty
+    touch       extra values written on every created/updated row (e.g. updated_at,
+                which bulk_update does not maintain)
+    """
+    model = queryset.model
+    meta = model._meta
+    fields, fill_fields = tuple(fields), tuple(fill_fields)
+    touch = dict(touch or {})
+    update_fields = fields + fill_fields + tuple(f for f in touch if f not in fields + fill_fields)
+    plan = SyncPlan(model=model, fields=update_fields)
+
+    existing: Dict[Key, models.Model] = {}
+    for obj in queryset.only(*{"pk", *key, *fields, *fill_fields}):
+        existing[tuple(getattr(obj, k) for k in key)] = obj
+
+    seen = set()
+    for row in rows:
+        k = _key(row, key)
+        if k in seen:
+            continue
+        seen.add(k)
+        values = {name: meta.get_field(name).to_python(row[name]) for name in (*fields, *fill_fields) if name in row}
+        obj = existing.get(k)
+        if obj is None:
+            new = model(**{**dict(zip(key, k)), **values, **touch})
+            plan.create.append(new)
+            plan.keys[id(new)] = k
+            continue
+
+        changed = False
+        for name, new_value in values.items():
+            old_value = getattr(obj, name)
+            if name in fill_fields and old_value not in (None, ""):
+                continue
+            if old_value != new_value:
+                plan.changes.append((k, name, old_value, new_value))
+                setattr(obj, name, new_value)
+                changed = True
+        if changed:
+            for name, value in touch.items():
+                setattr(obj, name, value)
+            plan.update.append(obj)
+        else:
+            plan.unchanged += 1
+
+    if delete_missing:
+        for k, obj in existing.items():
+            if k not in seen:
+                plan.delete.append(obj)
+                plan.keys[id(obj)] = k
+    return plan
+
+
+def apply_plan(plan: SyncPlan, batch_size: int = 500) -> None:
+    """Write a SyncPlan: deletes, then inserts, then updates, in one transaction."""
+    manager = plan.model._default_manager
+    with transaction.atomic():
+        if plan.delete:
+            manager.filter(pk__in=[obj.pk for obj in plan.delete]).delete()
+        if plan.create:
+            manager.bulk_create(plan.create, batch_size=batch_size)
+        if plan.update and plan.fields:
+            manager.bulk_update(plan.update, plan.fields, batch_size=batch_size)
+
+
+def sync_rows(queryset: models.QuerySet, rows: Iterable[Mapping[str, Any]], key: Sequence[str],
+              dry_run: bool = False, batch_size: int = 500, **kwargs) -> SyncPlan:
+    """diff_rows() + apply_plan(); with dry_run=True only the diff is computed."""
+    plan = diff_rows(queryset, rows, key, **kwargs)
+    if not dry_run:
+        apply_plan(plan, batch_size=batch_size)
+    return plan
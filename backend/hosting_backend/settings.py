@@ -11,6 +11,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import json
 import os
 from pathlib import Path
 from decouple import config
@@ -100,6 +101,20 @@ DATABASES = {
 
 
 
+# Cache
+# Shared by every Gunicorn worker in production (catalog and TLD price versions,
+# Enom results), so point CACHE_BACKEND/CACHE_LOCATION at a file-based or Redis
+# cache there: a process-local backend fails `manage.py check --deploy`
+# (hosting.E001) and warns on every other check run (hosting.W001).
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -159,10 +174,89 @@ REST_FRAMEWORK = {
 ENOM_UID = os.getenv("ENOM_UID", "")
 ENOM_TOKEN = os.getenv("ENOM_TOKEN", "")  # use API Token, not your password
 ENOM_ENV = os.getenv("ENOM_ENV", "test")  # "test" or "live"
-ENOM_BASE_URL = (
+ENOM_BASE_URL = os.getenv("ENOM_BASE_URL") or (  # override for a local stand-in
     "https://resellertest.enom.com" if ENOM_ENV == "test" else "https://reseller.enom.com"
 )
-ENOM_TIMEOUT = int(os.getenv("ENOM_TIMEOUT", "10"))
+ENOM_TIMEOUT = int(os.getenv("ENOM_TIMEOUT", "10"))  # read timeout (seconds)
+ENOM_CONNECT_TIMEOUT = float(os.getenv("ENOM_CONNECT_TIMEOUT", "3.05"))
+ENOM_POOL_SIZE = int(os.getenv("ENOM_POOL_SIZE", "10"))  # keep-alive connections per worker
+ENOM_RETRIES = int(os.getenv("ENOM_RETRIES", "2"))  # read-only commands only
+ENOM_RETRY_BACKOFF = float(os.getenv("ENOM_RETRY_BACKOFF", "0.2"))  # seconds, doubled per attempt
+ENOM_ASYNC_POOL_SIZE = int(os.getenv("ENOM_ASYNC_POOL_SIZE", "100"))  # connections per event loop (ASGI)
+# Single-flight: identical read-only commands in flight share one upstream call
+ENOM_COALESCE = os.getenv("ENOM_COALESCE", "True") == "True"
+ENOM_COALESCE_SHARED = os.getenv("ENOM_COALESCE_SHARED", "True") == "True"  # across workers, via CACHES
+ENOM_COALESCE_RESULT_TTL = int(os.getenv("ENOM_COALESCE_RESULT_TTL", "2"))  # seconds a shared result or error is kept
+ENOM_COALESCE_LOCK_TTL = int(os.getenv("ENOM_COALESCE_LOCK_TTL", "3"))  # seconds a dead worker's lock outlives it
+ENOM_COALESCE_POLL = float(os.getenv("ENOM_COALESCE_POLL", "0.05"))  # seconds between checks while waiting
+# Circuit breaker (per worker): fail fast while Enom is erroring or slow
+ENOM_BREAKER_WINDOW_SECONDS = int(os.getenv("ENOM_BREAKER_WINDOW_SECONDS", "30"))
+ENOM_BREAKER_MIN_CALLS = int(os.getenv("ENOM_BREAKER_MIN_CALLS", "10"))  # before the rates mean anything
+ENOM_BREAKER_FAILURE_RATE = float(os.getenv("ENOM_BREAKER_FAILURE_RATE", "0.5"))
+ENOM_BREAKER_SLOW_CALL_SECONDS = float(os.getenv("ENOM_BREAKER_SLOW_CALL_SECONDS", "4"))
+ENOM_BREAKER_SLOW_RATE = float(os.getenv("ENOM_BREAKER_SLOW_RATE", "0.8"))
+ENOM_BREAKER_OPEN_SECONDS = int(os.getenv("ENOM_BREAKER_OPEN_SECONDS", "15"))
+ENOM_BREAKER_HALF_OPEN_CALLS = int(os.getenv("ENOM_BREAKER_HALF_OPEN_CALLS", "1"))  # concurrent probes
+# Hedged requests for read-only commands (off by default: they add upstream load)
+ENOM_HEDGE = os.getenv("ENOM_HEDGE", "False") == "True"
+ENOM_HEDGE_PERCENTILE = float(os.getenv("ENOM_HEDGE_PERCENTILE", "95"))
+ENOM_HEDGE_MIN_DELAY = float(os.getenv("ENOM_HEDGE_MIN_DELAY", "0.2"))  # seconds
+ENOM_HEDGE_MAX_INFLIGHT = int(os.getenv("ENOM_HEDGE_MAX_INFLIGHT", "4"))  # hedged calls at once per worker
+# Token-bucket rate limit shared by all workers on the host (see hosting/ratelimit.py); 0 and no budgets = off
+ENOM_RATE_LIMIT = float(os.getenv("ENOM_RATE_LIMIT", "0"))  # Enom calls per second, all commands
+ENOM_RATE_BURST = int(os.getenv("ENOM_RATE_BURST", "20"))
+ENOM_RATE_COMMAND_LIMITS = os.getenv("ENOM_RATE_COMMAND_LIMITS", "")  # e.g. "namespinner:5,getnamesuggestions:5:10"
+ENOM_RATE_MAX_WAIT = float(os.getenv("ENOM_RATE_MAX_WAIT", "5"))  # seconds a call may queue for a token
+ENOM_RATE_RESERVE = float(os.getenv("ENOM_RATE_RESERVE", "0.5"))  # burst share the lowest class leaves to higher ones
+ENOM_RATE_STATE_PATH = os.getenv("ENOM_RATE_STATE_PATH") or (
+    "/dev/shm/enom-ratelimit" if os.path.isdir("/dev/shm") else str(BASE_DIR / "enom-ratelimit")
+)
+# Serve the domain lookup URLs with the async views; only worth it under an ASGI server (uvicorn)
+DOMAIN_VIEWS_ASYNC = os.getenv("DOMAIN_VIEWS_ASYNC", "False") == "True"
+# Results cache for check/suggestion lookups (seconds), stored in CACHES["default"]
+ENOM_CACHE_TTL_AVAILABLE = int(os.getenv("ENOM_CACHE_TTL_AVAILABLE", "60"))  # may be registered any moment
+ENOM_CACHE_TTL_TAKEN = int(os.getenv("ENOM_CACHE_TTL_TAKEN", "3600"))
+ENOM_CACHE_TTL_SUGGESTIONS = int(os.getenv("ENOM_CACHE_TTL_SUGGESTIONS", "600"))
+ENOM_CACHE_STALE_TTL = int(os.getenv("ENOM_CACHE_STALE_TTL", "300"))  # served while refreshing
+ENOM_CACHE_ERROR_TTL = int(os.getenv("ENOM_CACHE_ERROR_TTL", "10"))  # negative caching
+ENOM_STREAM_CACHE_MAX_RESULTS = int(os.getenv("ENOM_STREAM_CACHE_MAX_RESULTS", "500"))  # larger streams go uncached
+# domain/suggestions/: NameSpinner's share of the merged score (GetNameSuggestions gets the rest)
+ENOM_MERGE_SPINNER_WEIGHT = float(os.getenv("ENOM_MERGE_SPINNER_WEIGHT", "0.5"))
+ENOM_SUGGEST_WORKERS = int(os.getenv("ENOM_SUGGEST_WORKERS", "4"))  # NameSpinner calls at once per worker process
+# Bulk availability check
+ENOM_BULK_MAX_DOMAINS = int(os.getenv("ENOM_BULK_MAX_DOMAINS", "50"))  # per request
+ENOM_BULK_WORKERS = int(os.getenv("ENOM_BULK_WORKERS", "8"))  # concurrent Enom calls per worker process
+ENOM_CHECK_BATCH = int(os.getenv("ENOM_CHECK_BATCH", "30"))  # domains per multi-domain check, 1 disables it
+# Local suggestions (hosting/suggest.py)
+SUGGEST_INDEX_PATH = os.getenv("SUGGEST_INDEX_PATH", "")  # from build_suggest_index; built-in words if unset
+SUGGEST_MERGE_LOCAL_WEIGHT = float(os.getenv("SUGGEST_MERGE_LOCAL_WEIGHT", "0.5"))  # vs Enom NameSpinner, 0-1
+SUGGEST_CONFIRM_MAX = int(os.getenv("SUGGEST_CONFIRM_MAX", "10"))  # availability checks per request
+
+# Known-taken domains answered without Enom (see hosting/taken.py). Empty = disabled.
+TAKEN_INDEX_PATH = os.getenv("TAKEN_INDEX_PATH", "")
+TAKEN_INDEX_CAPACITY = int(os.getenv("TAKEN_INDEX_CAPACITY", "65536"))  # initial slots, doubled when 3/4 full
+TAKEN_INDEX_MAX_AGE = int(os.getenv("TAKEN_INDEX_MAX_AGE", str(30 * 86400)))  # unconfirmed entries ignored after
+TAKEN_INDEX_RECHECK_AGE = int(os.getenv("TAKEN_INDEX_RECHECK_AGE", str(7 * 86400)))  # re-asked in the background after
+
+# Search log and pre-warming (see hosting/searchlog.py, manage.py prewarm_domains)
+SEARCH_LOG = os.getenv("SEARCH_LOG", "True") == "True"
+SEARCH_LOG_FLUSH_SECONDS = float(os.getenv("SEARCH_LOG_FLUSH_SECONDS", "5"))
+SEARCH_LOG_BATCH = int(os.getenv("SEARCH_LOG_BATCH", "500"))  # rows per bulk insert; a full batch flushes early
+SEARCH_LOG_BUFFER_MAX = int(os.getenv("SEARCH_LOG_BUFFER_MAX", "10000"))  # per worker; oldest dropped beyond this
+SEARCH_LOG_RETENTION_DAYS = int(os.getenv("SEARCH_LOG_RETENTION_DAYS", "30"))
+PREWARM_TLDS = os.getenv("PREWARM_TLDS", "com,net,org,io,co")
+# Bulk check jobs (hosting/checkjobs.py, `manage.py run_check_jobs`)
+CHECK_JOB_MAX_DOMAINS = int(os.getenv("CHECK_JOB_MAX_DOMAINS", "100000"))  # per uploaded list
+CHECK_JOB_CHUNK = int(os.getenv("CHECK_JOB_CHUNK", "500"))  # rows checked and saved together
+CHECK_JOB_STALE_SECONDS = int(os.getenv("CHECK_JOB_STALE_SECONDS", "120"))  # silent worker -> job claimed again
+CHECK_JOB_MAX_ATTEMPTS = int(os.getenv("CHECK_JOB_MAX_ATTEMPTS", "5"))  # per chunk, for transient Enom failures
+CHECK_JOB_RETRY_BACKOFF = float(os.getenv("CHECK_JOB_RETRY_BACKOFF", "2"))  # seconds, doubled per attempt
+CHECK_JOB_POLL_SECONDS = float(os.getenv("CHECK_JOB_POLL_SECONDS", "2"))  # worker idle / results follow interval
+CHECK_JOB_STREAM_TIMEOUT = int(os.getenv("CHECK_JOB_STREAM_TIMEOUT", "60"))  # longest ?follow=true holds a worker
+
+# Static plan catalog for Nginx (see hosting/snapshots.py). Empty = disabled.
+CATALOG_SNAPSHOT_ROOT = os.getenv("CATALOG_SNAPSHOT_ROOT", "")
+CATALOG_SNAPSHOT_KEEP = int(os.getenv("CATALOG_SNAPSHOT_KEEP", "3"))
 
 NEXTAUTH_SECRET = os.getenv("NEXTAUTH_SECRET", "")
 
@@ -170,6 +264,15 @@ STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY", "")
 STRIPE_WEBHOOK_SECRET = os.getenv("STRIPE_WEBHOOK_SECRET", "")
 STRIPE_CURRENCY = os.getenv("STRIPE_CURRENCY", "usd")
 
+# Cart pricing (hosting/pricing.py). Yearly domain price in cents by TLD;
+# set DOMAIN_PRICES_CENTS to a JSON object to override the defaults. Rows in
+# the TldPrice table (`manage.py refresh_tld_prices`) take precedence.
+DOMAIN_PRICES_CENTS = json.loads(os.getenv("DOMAIN_PRICES_CENTS", "null") or "null") or {
+    "com": 1299, "net": 1499, "org": 1399, "io": 4999, "co": 2999,
+    "xyz": 299, "tv": 3499, "cc": 1299, "my": 5900, "com.my": 5900,
+}
+QUOTE_TTL_SECONDS = int(os.getenv("QUOTE_TTL_SECONDS", "1800"))
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Hosting API",
     "DESCRIPTION": "OpenAPI schema for plans, checkout, blog, domain, and builder endpoints.",
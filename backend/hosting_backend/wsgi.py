@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'hosting_backend.settings')
 
 application = get_wsgi_application()
+
+from hosting import pricing  # noqa: E402  (needs the app registry)
+
+pricing.warm()